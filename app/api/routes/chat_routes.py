@@ -1,4 +1,5 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from db.connection.database import get_db
 from services.chat.chat_service import ChatService
@@ -105,7 +106,9 @@ async def websocket_endpoint(
                 continue
 
             # 채팅 서비스에서 메시지 처리 (DB 세션 전달)
-            response = chat_service.process_message(
+            # 번역/검색/LLM 생성은 블로킹 작업이므로 스레드풀에서 실행해 다른 연결을 막지 않음
+            response = await run_in_threadpool(
+                chat_service.process_message,
                 message=user_message,
                 user_id=user_id,
                 chat_id=chat_id,
@@ -0,0 +1,212 @@
+# cache/disk_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+import msgpack
+import numpy as np
+
+# msgpack 확장 타입 코드
+_NDARRAY_EXT_CODE = 1
+
+def _encode_default(obj: Any) -> Any:
+    """msgpack이 직접 처리하지 못하는 타입 변환 (numpy 배열은 float32 바이트로 압축 저장)"""
+    if isinstance(obj, np.ndarray):
+        array = obj.astype(np.float32) if obj.dtype.kind == 'f' else obj
+        array = np.ascontiguousarray(array)
+        header = msgpack.packb([array.dtype.str, list(array.shape)])
+        return msgpack.ExtType(_NDARRAY_EXT_CODE, header + array.tobytes())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    return str(obj)
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    if code == _NDARRAY_EXT_CODE:
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(data)
+        dtype, shape = unpacker.unpack()
+        offset = unpacker.tell()
+        return np.frombuffer(data, dtype=np.dtype(dtype), offset=offset).reshape(shape)
+    return msgpack.ExtType(code, data)
+
+def pack(value: Any) -> bytes:
+    """값을 msgpack 바이트로 직렬화"""
+    return msgpack.packb(value, default=_encode_default, use_bin_type=True)
+
+def unpack(data: bytes) -> Any:
+    """msgpack 바이트를 값으로 역직렬화"""
+    return msgpack.unpackb(data, ext_hook=_decode_ext, raw=False, strict_map_key=False)
+
+def iter_unpack(file) -> Iterator[Any]:
+    """pack 결과를 이어 붙인 파일에서 값을 하나씩 역직렬화"""
+    yield from msgpack.Unpacker(file, ext_hook=_decode_ext, raw=False, strict_map_key=False)
+
+class DiskCache:
+    def __init__(self,
+                 directory: str = ".cache",
+                 namespace_ttls: Optional[Dict[str, int]] = None,
+                 default_ttl: int = 86400,
+                 filename: str = "cache.sqlite3"):
+        """
+        재시작 후에도 유지되는 SQLite 기반 2차(L2) 캐시
+
+        네임스페이스(search, translation, embedding 등)별로 TTL을 따로 두며,
+        값은 msgpack으로 직렬화하고 numpy 배열은 float32 바이트로 저장한다.
+        DB 파일은 첫 사용 시점에 지연 로딩된다.
+
+        Args:
+            directory: 캐시 파일을 저장할 디렉터리
+            namespace_ttls: 네임스페이스별 유효시간 (초)
+            default_ttl: namespace_ttls에 없는 네임스페이스의 기본 유효시간 (초)
+            filename: SQLite 파일 이름
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, filename)
+        self.namespace_ttls = namespace_ttls or {}
+        self.default_ttl = default_ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+        # 통계 카운터
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """SQLite 연결 지연 생성 (lock 보유 상태에서 호출)"""
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def ttl_for(self, namespace: str) -> int:
+        """네임스페이스의 유효시간 반환"""
+        return self.namespace_ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """캐시된 값 가져오기 (만료된 항목은 None)"""
+        entry = self.get_entry(namespace, key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """캐시된 값과 만료 시각(epoch 초) 가져오기 (만료된 항목은 None)"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None or row[1] <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return unpack(row[0]), row[1]
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """여러 키를 한 번에 조회 (적중한 항목만 반환)"""
+        if not keys:
+            return {}
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # SQLite 바인딩 변수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i+500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM cache_entries WHERE namespace = ? AND key IN ({placeholders}) AND expires_at > ?",
+                    (namespace, *batch, now)
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = value
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return {key: unpack(value) for key, value in found.items()}
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """값을 캐시에 저장"""
+        self.set_many(namespace, {key: value}, ttl)
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """여러 값을 하나의 트랜잭션으로 저장"""
+        if not items:
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl_for(namespace))
+        rows = [(namespace, key, pack(value), expires_at) for key, value in items.items()]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+            self.writes += len(rows)
+
+    def delete(self, namespace: str, key: str) -> None:
+        """캐시 항목 삭제"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        """만료된 항목 일괄 삭제"""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            return cursor.rowcount
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """캐시 비우기 (네임스페이스 지정 시 해당 네임스페이스만)"""
+        with self._lock:
+            conn = self._connection()
+            if namespace is None:
+                conn.execute("DELETE FROM cache_entries")
+            else:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            conn.commit()
+
+    def close(self) -> None:
+        """SQLite 연결 종료"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            entries = {}
+            if self._conn is not None:
+                rows = self._conn.execute(
+                    "SELECT namespace, COUNT(*) FROM cache_entries GROUP BY namespace"
+                ).fetchall()
+                entries = {namespace: count for namespace, count in rows}
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "loaded": self._conn is not None,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "namespace_ttls": self.namespace_ttls
+            }
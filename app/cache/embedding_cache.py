@@ -0,0 +1,244 @@
+# cache/embedding_cache.py
+import fcntl
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+import numpy as np
+from cache.disk_cache import DiskCache
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위한 텍스트 정규화 (NFC, 공백 정리)"""
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+class MmapEmbeddingStore:
+    def __init__(self, directory: str, dim: int):
+        """
+        메모리 맵 기반 float32 임베딩 저장소 (추가 전용)
+
+        embeddings.f32에는 벡터를 행 단위로 이어 붙이고, keys.txt에는 같은 순서로 키를 기록한다.
+        여러 프로세스(uvicorn 워커 등)가 같은 디렉터리를 쓸 수 있으므로 추가와 손상 복구는
+        store.lock 파일 잠금(fcntl) 안에서 하고, 잠금을 잡은 뒤 다른 프로세스가 추가한 키를 먼저 반영한다.
+
+        Args:
+            directory: 저장 디렉터리
+            dim: 임베딩 차원
+        """
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, "embeddings.f32")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.lock_path = os.path.join(directory, "store.lock")
+        self._index: Optional[Dict[str, int]] = None
+        self._row_count = 0
+        self._keys_offset = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """프로세스 간 배타적 파일 잠금"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """키 인덱스 지연 로딩 (lock 보유 상태에서 호출)"""
+        if self._index is not None:
+            return
+        with self._file_lock():
+            self._sync()
+
+    def _sync(self) -> None:
+        """
+        마지막으로 읽은 위치 이후 추가된 키를 인덱스에 반영 (lock과 파일 잠금 보유 상태에서 호출)
+
+        기록 도중 중단된 경우를 대비해 두 파일을 같은 행 수로 정리한다.
+        파일 잠금을 잡고 있으므로 다른 프로세스가 기록 중인 행을 잘라낼 일은 없다.
+        """
+        if self._index is None:
+            self._index, self._row_count, self._keys_offset = {}, 0, 0
+        row_bytes = 4 * self.dim
+        rows_on_disk = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+
+        # 새 키와 각 줄의 끝 위치 읽기 (개행 없는 마지막 줄은 기록 중단으로 간주)
+        new_keys: List[Tuple[str, int]] = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    new_keys.append((line[:-1].decode("utf-8"), f.tell()))
+
+        new_keys = new_keys[:max(0, rows_on_disk - self._row_count)]
+        keys_end = new_keys[-1][1] if new_keys else self._keys_offset
+        rows = self._row_count + len(new_keys)
+        if os.path.exists(self.keys_path) and os.path.getsize(self.keys_path) != keys_end:
+            with open(self.keys_path, "r+b") as f:
+                f.truncate(keys_end)
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != rows * row_bytes:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+
+        for key, _ in new_keys:
+            self._index.setdefault(key, self._row_count)
+            self._row_count += 1
+        self._keys_offset = keys_end
+
+    def _rows(self) -> np.memmap:
+        """현재 파일 크기에 맞는 메모리 맵 반환 (lock 보유 상태에서 호출)"""
+        rows = self._row_count
+        if self._mmap is None or self._mmap.shape[0] < rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """저장된 벡터 조회 (있는 키만 반환)"""
+        with self._lock:
+            self._load()
+            rows = {key: self._index[key] for key in keys if key in self._index}
+            if not rows:
+                return {}
+            vectors = self._rows()
+            return {key: np.array(vectors[row]) for key, row in rows.items()}
+
+    def add_many(self, items: Dict[str, np.ndarray]) -> None:
+        """새 벡터 추가 (이미 있는 키는 무시, 다른 프로세스와는 파일 잠금으로 직렬화)"""
+        with self._lock, self._file_lock():
+            self._sync()
+            new_items = [(key, vector) for key, vector in items.items() if key not in self._index]
+            if not new_items:
+                return
+            matrix = np.ascontiguousarray(np.vstack([vector for _, vector in new_items]), dtype=np.float32)
+            with open(self.vectors_path, "ab") as f:
+                f.write(matrix.tobytes())
+            with open(self.keys_path, "ab") as f:
+                for key, _ in new_items:
+                    self._index[key] = self._row_count
+                    self._row_count += 1
+                    f.write((key + "\n").encode("utf-8"))
+                self._keys_offset = f.tell()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._index)
+
+class EmbeddingCache:
+    def __init__(self,
+                 model_name: str,
+                 max_entries: int = 100000,
+                 mmap_store: Optional[MmapEmbeddingStore] = None,
+                 disk_cache: Optional[DiskCache] = None,
+                 namespace: str = "embedding"):
+        """
+        (모델 이름, 정규화된 텍스트) 해시를 키로 하는 임베딩 캐시
+
+        메모리(LRU) 뒤에 디스크 계층을 하나 둔다. mmap_store가 있으면 그것을, 없으면 영구 2차 캐시(DiskCache)의
+        embedding 네임스페이스(float32 배열을 msgpack으로 저장)를 사용한다.
+
+        Args:
+            model_name: 임베딩 모델 이름 (키에 포함)
+            max_entries: 메모리 캐시 최대 항목 수 (LRU)
+            mmap_store: 디스크 메모리 맵 저장소 (선택 사항)
+            disk_cache: mmap_store가 없을 때 사용할 영구 2차 캐시 (선택 사항)
+            namespace: 2차 캐시에서 사용할 네임스페이스
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.mmap_store = mmap_store
+        self.disk_cache = disk_cache
+        self.namespace = namespace
+        self.cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        # 통계 카운터
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, text: str) -> str:
+        """캐시 키 생성"""
+        return hashlib.sha1(f"{self.model_name}\x1f{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """여러 키 조회 (메모리 → 디스크 순, 디스크 적중은 메모리로 승격)"""
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                vector = self.cache.get(key)
+                if vector is not None:
+                    self.cache.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing.append(key)
+            self.hits += len(found)
+
+        if missing and (self.mmap_store is not None or self.disk_cache is not None):
+            if self.mmap_store is not None:
+                disk_found = self.mmap_store.get_many(missing)
+            else:
+                disk_found = self.disk_cache.get_many(self.namespace, missing)
+            if disk_found:
+                self._put_memory(disk_found)
+                found.update(disk_found)
+                with self._lock:
+                    self.hits += len(disk_found)
+                    self.disk_hits += len(disk_found)
+
+        with self._lock:
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, np.ndarray]) -> None:
+        """새로 계산한 임베딩 저장"""
+        items = {key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()}
+        self._put_memory(items)
+        if self.mmap_store is not None:
+            self.mmap_store.add_many(items)
+        elif self.disk_cache is not None:
+            self.disk_cache.set_many(self.namespace, items)
+
+    def _put_memory(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self.cache[key] = vector
+                self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """메모리 캐시 비우기"""
+        with self._lock:
+            self.cache = OrderedDict()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_name": self.model_name,
+                "entries": len(self.cache),
+                "max_entries": self.max_entries,
+                "disk_entries": len(self.mmap_store) if self.mmap_store is not None else None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -1,39 +1,169 @@
 # cache/query_cache.py
 import hashlib
 import json
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 import time
+from cache.disk_cache import DiskCache
 
 class QueryCache:
-    def __init__(self, ttl: int = 3600):  # 기본 캐시 유효시간 1시간
-        self.cache = {}
+    def __init__(self,
+                 ttl: int = 3600,  # 기본 캐시 유효시간 1시간
+                 max_entries: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 sweep_interval: int = 60,
+                 disk_cache: Optional[DiskCache] = None,
+                 namespace: str = "search"):
+        """
+        크기 제한이 있는 LRU + TTL 쿼리 캐시
+
+        Args:
+            ttl: 캐시 항목 유효시간 (초)
+            max_entries: 최대 캐시 항목 수
+            max_bytes: 캐시 결과의 최대 추정 크기 (바이트)
+            sweep_interval: 만료 항목 일괄 정리 주기 (초, set 호출 시 분할 상환 방식으로 실행)
+            disk_cache: 메모리 캐시 뒤에 두는 영구 2차 캐시 (선택 사항)
+            namespace: 2차 캐시에서 사용할 네임스페이스
+        """
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.ttl = ttl
-    
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+        self.disk_cache = disk_cache
+        self.namespace = namespace
+
+        # 통계 카운터
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.current_bytes = 0
+        self.disk_hits = 0
+
     def _generate_key(self, query: str) -> str:
         """쿼리 문자열에서 캐시 키 생성"""
         return hashlib.md5(query.encode('utf-8')).hexdigest()
-    
+
+    def _estimate_size(self, results: Any) -> int:
+        """캐시 결과의 메모리 사용량 추정 (직렬화 크기 기준)"""
+        try:
+            return len(json.dumps(results, default=str, ensure_ascii=False).encode('utf-8'))
+        except (TypeError, ValueError):
+            return len(str(results).encode('utf-8'))
+
+    def _remove(self, key: str) -> None:
+        """캐시 항목 제거 및 크기 갱신 (lock 보유 상태에서 호출)"""
+        cache_entry = self.cache.pop(key, None)
+        if cache_entry is not None:
+            self.current_bytes -= cache_entry['size']
+
+    def _sweep_expired(self, now: float) -> None:
+        """만료된 캐시 항목 일괄 삭제 (lock 보유 상태에서 호출)"""
+        expired_keys = [key for key, entry in self.cache.items() if entry['expires_at'] <= now]
+        for key in expired_keys:
+            self._remove(key)
+        self.expirations += len(expired_keys)
+        self._last_sweep = now
+
+    def _evict(self) -> None:
+        """항목 수/크기 예산을 초과하면 가장 오래 사용되지 않은 항목부터 제거 (lock 보유 상태에서 호출)"""
+        while self.cache and (len(self.cache) > self.max_entries or self.current_bytes > self.max_bytes):
+            key = next(iter(self.cache))
+            self._remove(key)
+            self.evictions += 1
+
     def get(self, query: str) -> Optional[Dict[str, Any]]:
         """쿼리에 대한 캐시된 결과 가져오기"""
         key = self._generate_key(query)
-        if key in self.cache:
-            cache_entry = self.cache[key]
-            # 캐시 만료 확인
-            if time.time() < cache_entry['expires_at']:
-                return cache_entry['results']
-            else:
-                # 만료된 캐시 항목 삭제
-                del self.cache[key]
+        with self._lock:
+            cache_entry = self.cache.get(key)
+            if cache_entry is not None:
+                # 캐시 만료 확인
+                if time.time() < cache_entry['expires_at']:
+                    # 최근 사용 항목으로 이동 (LRU)
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return cache_entry['results']
+                else:
+                    # 만료된 캐시 항목 삭제
+                    self._remove(key)
+                    self.expirations += 1
+
+        # 메모리 캐시 미스 시 2차 캐시 확인 후 메모리로 승격 (디스크 항목의 남은 유효시간을 넘지 않도록)
+        if self.disk_cache is not None:
+            entry = self.disk_cache.get_entry(self.namespace, key)
+            if entry is not None:
+                results, disk_expires_at = entry
+                self._store(key, results, expires_at=disk_expires_at)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return results
+
+        with self._lock:
+            self.misses += 1
         return None
-    
+
     def set(self, query: str, results: Dict[str, Any]) -> None:
         """쿼리 결과를 캐시에 저장"""
         key = self._generate_key(query)
-        self.cache[key] = {
-            'results': results,
-            'expires_at': time.time() + self.ttl
-        }
-    
+        self._store(key, results)
+
+        # 2차 캐시에 함께 기록 (write-through)
+        if self.disk_cache is not None:
+            self.disk_cache.set(self.namespace, key, results)
+
+    def _store(self, key: str, results: Any, expires_at: Optional[float] = None) -> None:
+        """메모리 캐시에 항목 저장 및 예산 초과 시 제거 (expires_at이 주어지면 만료 시각을 그 이전으로 제한)"""
+        size = self._estimate_size(results)
+
+        with self._lock:
+            now = time.time()
+
+            # 주기적으로 만료 항목 정리 (분할 상환)
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep_expired(now)
+
+            # 단일 항목이 전체 예산보다 크면 캐싱하지 않음
+            if size > self.max_bytes:
+                self._remove(key)
+                return
+
+            self._remove(key)
+            self.cache[key] = {
+                'results': results,
+                'expires_at': now + self.ttl if expires_at is None else min(now + self.ttl, expires_at),
+                'size': size
+            }
+            self.current_bytes += size
+            self._evict()
+
     def clear(self) -> None:
-        """캐시 전체 비우기"""
-        self.cache = {}
\ No newline at end of file
+        """캐시 전체 비우기 (2차 캐시의 같은 네임스페이스 포함)"""
+        with self._lock:
+            self.cache = OrderedDict()
+            self.current_bytes = 0
+        if self.disk_cache is not None:
+            self.disk_cache.clear(self.namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.cache),
+                "max_entries": self.max_entries,
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "disk_hits": self.disk_hits,
+                "ttl": self.ttl
+            }
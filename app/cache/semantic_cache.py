@@ -0,0 +1,175 @@
+# cache/semantic_cache.py
+import threading
+import time
+from typing import Dict, Any, Optional
+import numpy as np
+
+class SemanticQueryCache:
+    def __init__(self,
+                 max_distance: float = 0.08,
+                 ttl: int = 3600,
+                 max_entries_per_scope: int = 512,
+                 initial_capacity: int = 16):
+        """
+        임베딩 유사도 기반 시맨틱 쿼리 캐시
+
+        표현만 조금 다른 질문("오늘 일정 알려줘" / "오늘 일정 뭐야")이
+        같은 검색 결과를 재사용할 수 있도록 쿼리 임베딩과 결과를 함께 저장한다.
+        사용자(scope)별로 정규화된 임베딩 행렬을 유지하고, 조회는 행렬-벡터 곱 한 번으로 수행한다.
+
+        Args:
+            max_distance: 캐시 적중으로 인정할 최대 코사인 거리 (1 - 코사인 유사도)
+            ttl: 캐시 항목 유효시간 (초)
+            max_entries_per_scope: 사용자별 최대 캐시 항목 수 (초과 시 LRU 교체)
+            initial_capacity: 사용자별 임베딩 행렬 초기 크기 (필요 시 2배씩 증가)
+        """
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries_per_scope = max_entries_per_scope
+        self.initial_capacity = initial_capacity
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+        # 통계 카운터
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _scope_key(self, user_id: Optional[Any]) -> str:
+        """사용자 ID로 캐시 범위 키 생성"""
+        return "global" if user_id is None else str(user_id)
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        """코사인 유사도 계산을 위한 L2 정규화 (float32)"""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _new_scope(self, dim: int) -> Dict[str, Any]:
+        capacity = min(self.initial_capacity, self.max_entries_per_scope)
+        return {
+            "embeddings": np.zeros((capacity, dim), dtype=np.float32),
+            "expires_at": np.zeros(capacity, dtype=np.float64),
+            "last_used": np.zeros(capacity, dtype=np.float64),
+            "top_k": np.zeros(capacity, dtype=np.int64),
+            "queries": [None] * capacity,
+            "results": [None] * capacity,
+            "size": 0
+        }
+
+    def _grow(self, scope: Dict[str, Any]) -> None:
+        """임베딩 행렬 용량 확장 (lock 보유 상태에서 호출)"""
+        capacity = scope["embeddings"].shape[0]
+        new_capacity = min(capacity * 2, self.max_entries_per_scope)
+        extra = new_capacity - capacity
+        scope["embeddings"] = np.vstack([
+            scope["embeddings"],
+            np.zeros((extra, scope["embeddings"].shape[1]), dtype=np.float32)
+        ])
+        scope["expires_at"] = np.concatenate([scope["expires_at"], np.zeros(extra)])
+        scope["last_used"] = np.concatenate([scope["last_used"], np.zeros(extra)])
+        scope["top_k"] = np.concatenate([scope["top_k"], np.zeros(extra, dtype=np.int64)])
+        scope["queries"].extend([None] * extra)
+        scope["results"].extend([None] * extra)
+
+    def get(self, query_embedding: np.ndarray, user_id: Optional[Any] = None, top_k: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        유사한 쿼리의 캐시된 결과 가져오기
+
+        top_k를 주면 그보다 작은 top_k로 채운 항목은 결과가 모자랄 수 있으므로 후보에서 제외한다.
+
+        Returns:
+            적중 시 {"results", "query", "similarity"} 딕셔너리, 아니면 None
+        """
+        query_vector = self._normalize(query_embedding)
+        with self._lock:
+            scope = self._scopes.get(self._scope_key(user_id))
+            if scope is None or scope["size"] == 0 or scope["embeddings"].shape[1] != query_vector.shape[0]:
+                self.misses += 1
+                return None
+
+            size = scope["size"]
+            now = time.time()
+
+            # 모든 캐시 임베딩과의 코사인 유사도를 한 번에 계산
+            similarities = scope["embeddings"][:size] @ query_vector
+            similarities[scope["expires_at"][:size] <= now] = -np.inf
+            if top_k is not None:
+                similarities[scope["top_k"][:size] < top_k] = -np.inf
+
+            best = int(np.argmax(similarities))
+            best_similarity = float(similarities[best])
+            if best_similarity < 1.0 - self.max_distance:
+                self.misses += 1
+                return None
+
+            scope["last_used"][best] = now
+            self.hits += 1
+            return {
+                "results": scope["results"][best],
+                "query": scope["queries"][best],
+                "similarity": best_similarity
+            }
+
+    def set(self, query: str, query_embedding: np.ndarray, results: Any, user_id: Optional[Any] = None, top_k: Optional[int] = None) -> None:
+        """쿼리 임베딩과 검색 결과를 캐시에 저장 (top_k는 결과를 채울 때 요청한 개수, 없으면 결과 수)"""
+        query_vector = self._normalize(query_embedding)
+        scope_key = self._scope_key(user_id)
+
+        with self._lock:
+            scope = self._scopes.get(scope_key)
+            if scope is None or scope["embeddings"].shape[1] != query_vector.shape[0]:
+                scope = self._new_scope(query_vector.shape[0])
+                self._scopes[scope_key] = scope
+
+            now = time.time()
+            size = scope["size"]
+            capacity = scope["embeddings"].shape[0]
+
+            if size == capacity and capacity < self.max_entries_per_scope:
+                self._grow(scope)
+                capacity = scope["embeddings"].shape[0]
+
+            if size < capacity:
+                slot = size
+                scope["size"] += 1
+            else:
+                # 만료된 항목을 우선 교체하고, 없으면 가장 오래 사용되지 않은 항목 교체
+                expired = np.flatnonzero(scope["expires_at"][:size] <= now)
+                if len(expired) > 0:
+                    slot = int(expired[0])
+                else:
+                    slot = int(np.argmin(scope["last_used"][:size]))
+                    self.evictions += 1
+
+            scope["embeddings"][slot] = query_vector
+            scope["expires_at"][slot] = now + self.ttl
+            scope["last_used"][slot] = now
+            scope["top_k"][slot] = top_k if top_k is not None else len(results)
+            scope["queries"][slot] = query
+            scope["results"][slot] = results
+
+    def invalidate_user(self, user_id: Optional[Any] = None) -> None:
+        """특정 사용자의 시맨틱 캐시 삭제"""
+        with self._lock:
+            self._scopes.pop(self._scope_key(user_id), None)
+
+    def clear(self) -> None:
+        """캐시 전체 비우기"""
+        with self._lock:
+            self._scopes = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "scopes": len(self._scopes),
+                "entries": sum(scope["size"] for scope in self._scopes.values()),
+                "max_entries_per_scope": self.max_entries_per_scope,
+                "max_distance": self.max_distance,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -1,10 +1,20 @@
+import os
+
 # config/settings/settings.py
 TRANSLATION_SETTINGS = {
     "enabled": True,
     "source_language": "ko",
     "target_language": "en",
     "translation_api": "google",  # google, microsoft, deepl 등
-    "cache_translations": True    # 번역 결과 캐싱 여부
+    "cache_translations": True,   # 번역 결과 캐싱 여부
+    "cache_ttl": 86400,           # 메모리 번역 캐시 유효시간 (초)
+    "cache_max_entries": 50000,   # 메모리 번역 캐시 최대 항목 수
+    "cache_max_bytes": 32 * 1024 * 1024,
+    "batch_max_chars": 4500,      # 배치 번역 요청당 최대 글자 수 (Google 제한 5000)
+    "batch_workers": 4,           # 배치 번역 동시 요청 수
+    "batch_retries": 3,           # 번역 요청 재시도 횟수
+    "batch_backoff": 0.5,         # 재시도 대기 시간 기준값 (초, 지수 증가)
+    "async_workers": 8            # 비동기 번역 요청용 스레드 수
 }
 
 # 벡터 검색 관련 설정
@@ -12,7 +22,8 @@ VECTOR_SEARCH_SETTINGS = {
     "default_model": "paraphrase-multilingual-MiniLM-L12-v2",
     "default_threshold": 0.1,
     "max_results": 5,
-    "cache_enabled": True
+    "cache_enabled": True,
+    "encode_workers": 1           # 쿼리 인코딩 전용 스레드 수 (CPU 연산)
 }
 
 # LLM 관련 설정
@@ -21,4 +32,95 @@ LLM_SETTINGS = {
     "temperature": 0.1,
     "max_tokens": 256,
     "repetition_penalty": 1.0
-}
\ No newline at end of file
+}
+
+# 쿼리 캐시 관련 설정
+CACHE_SETTINGS = {
+    "ttl": 3600,                        # 캐시 유효시간 (초)
+    "max_entries": 10000,               # 최대 캐시 항목 수
+    "max_bytes": 64 * 1024 * 1024,      # 최대 캐시 크기 (바이트)
+    "sweep_interval": 60                # 만료 항목 정리 주기 (초)
+}
+
+
+# 시맨틱(임베딩 유사도) 캐시 관련 설정
+SEMANTIC_CACHE_SETTINGS = {
+    "enabled": True,
+    "max_distance": 0.08,               # 캐시 적중 최대 코사인 거리 (1 - 유사도)
+    "ttl": 3600,                        # 캐시 유효시간 (초)
+    "max_entries_per_user": 512         # 사용자별 최대 캐시 항목 수
+}
+
+# 영구 2차(L2) 디스크 캐시 관련 설정
+DISK_CACHE_SETTINGS = {
+    "enabled": os.getenv("DISK_CACHE_ENABLED", "false").lower() == "true",
+    "directory": os.getenv("DISK_CACHE_DIR", ".cache"),
+    "namespace_ttls": {                 # 네임스페이스별 유효시간 (초)
+        "search": 3600,
+        "translation": 30 * 86400,
+        "embedding": 30 * 86400         # EMBEDDING_CACHE_MMAP이 꺼져 있을 때 임베딩 저장
+    }
+}
+
+# 임베딩 캐시 관련 설정
+EMBEDDING_CACHE_SETTINGS = {
+    "enabled": True,
+    "max_entries": 100000,              # 메모리 임베딩 캐시 최대 항목 수
+    "mmap_enabled": os.getenv("EMBEDDING_CACHE_MMAP", "false").lower() == "true",
+    "directory": os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+}
+
+# Qdrant 연결 및 대량 업서트 관련 설정
+QDRANT_SETTINGS = {
+    "host": os.getenv("QDRANT_HOST", "localhost"),
+    "port": int(os.getenv("QDRANT_PORT", "6333")),
+    "grpc_port": int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+    "prefer_grpc": os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+    "upsert_batch_size": 256,           # 업서트 요청당 포인트 수
+    "upsert_parallel": 4,               # 동시에 진행 중인 업서트 요청 수
+    "quantization": os.getenv("QDRANT_QUANTIZATION") or None,  # None, "scalar"(int8), "binary"
+    "quantization_always_ram": True,    # 양자화 벡터를 항상 RAM에 유지 (원본은 디스크)
+    "quantization_quantile": 0.99,      # scalar 양자화 범위 분위수
+    "search_oversampling": 2.0,         # 양자화 검색 후보 배수
+    "search_rescore": True,             # 후보를 원본 벡터로 다시 점수 계산
+    "hnsw_m": 16,                       # 새 컬렉션 HNSW 노드당 연결 수
+    "hnsw_ef_construct": 100,           # 새 컬렉션 인덱싱 탐색 폭
+    "hnsw_ef": None,                    # 검색 탐색 폭 기본값 (None이면 Qdrant 기본값)
+    "exact": False,                     # 기본 전수 탐색 여부
+    "indexed_only": False,              # 인덱싱되지 않은 세그먼트 제외 여부
+    "use_alias": True                   # 새 컬렉션을 버전 컬렉션 + 별칭으로 생성 (무중단 재구축용)
+}
+
+# 벡터 저장소 백엔드 설정
+VECTOR_STORE_SETTINGS = {
+    "backend": os.getenv("VECTOR_STORE_BACKEND", "qdrant"),   # qdrant, numpy (서버 없이 프로세스 내 검색)
+    "collection_name": "chatbot_vectors",
+    "numpy_snapshot_dir": os.getenv("VECTOR_STORE_SNAPSHOT_DIR", ".cache/vectors"),
+    "numpy_initial_capacity": 1024      # numpy 백엔드 초기 행렬 크기 (부족하면 두 배씩 확장)
+}
+
+# 인덱싱 관련 설정
+INDEXING_SETTINGS = {
+    "watermark_path": os.getenv("INDEXING_WATERMARK_PATH", ".cache/index_watermarks.json"),  # 테이블별 증분 기준값 파일
+    "reconcile_interval": 86400,        # 증분 인덱싱 시 삭제된 행 확인 주기 (초)
+    # 대량 인덱싱 파이프라인 (fetch → chunk → translate → embed → upsert, 인코딩은 항상 단일 작업자)
+    "pipeline": {
+        "chunk_workers": 1,             # 청크 분할 스레드 수
+        "translate_workers": int(os.getenv("INDEXING_TRANSLATE_WORKERS", "4")),  # 번역 API 동시 호출 수
+        "upsert_workers": int(os.getenv("INDEXING_UPSERT_WORKERS", "2")),        # 벡터 DB 동시 업서트 수
+        "queue_size": 4,                # 단계 사이 큐에 쌓을 수 있는 배치 수 (역압 기준)
+        "max_encode_batch": 256         # 인코딩 작업자가 대기 배치를 모아 한 번에 인코딩할 최대 텍스트 수
+    }
+}
+
+# 변경 피드 동기화 설정 (DB 변경을 받아 해당 행만 다시 인덱싱)
+CHANGE_FEED_SETTINGS = {
+    "enabled": os.getenv("CHANGE_FEED_ENABLED", "false").lower() == "true",
+    "source": os.getenv("CHANGE_FEED_SOURCE", "outbox"),  # outbox, notify, local (db/migrations/index_outbox.sql 참고)
+    "outbox_table": "index_outbox",
+    "channel": "index_changes",         # LISTEN/NOTIFY 채널
+    "debounce_seconds": 2.0,            # 마지막 변경 후 이 시간 동안 조용하면 처리
+    "max_delay_seconds": 10.0,          # 변경이 계속되어도 이 시간이 지나면 처리
+    "max_batch_size": 256,              # 대기 중인 행이 이 수를 넘으면 즉시 처리
+    "poll_interval": 1.0                # 소스 폴링 간격 (초)
+}
@@ -1,23 +1,95 @@
+import os
+import asyncio
 import numpy as np
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
 from utils.translation_utils import TranslationService
+from cache.embedding_cache import EmbeddingCache, MmapEmbeddingStore
+from cache.disk_cache import DiskCache
+from config.settings.settings import EMBEDDING_CACHE_SETTINGS
+
+# 모델별로 공유하는 임베딩 캐시
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+
+def get_embedding_cache(model_name: str, dim: int) -> Optional[EmbeddingCache]:
+    """모델별 공유 임베딩 캐시 반환 (설정이 꺼져 있으면 None)"""
+    if not EMBEDDING_CACHE_SETTINGS.get("enabled", True):
+        return None
+    if model_name not in _embedding_caches:
+        mmap_store = None
+        if EMBEDDING_CACHE_SETTINGS.get("mmap_enabled", False):
+            directory = os.path.join(EMBEDDING_CACHE_SETTINGS["directory"], model_name.replace("/", "_"))
+            mmap_store = MmapEmbeddingStore(directory, dim)
+        _embedding_caches[model_name] = EmbeddingCache(
+            model_name=model_name,
+            max_entries=EMBEDDING_CACHE_SETTINGS.get("max_entries", 100000),
+            mmap_store=mmap_store
+        )
+    return _embedding_caches[model_name]
+
+def configure_embedding_cache(disk_cache: Optional[DiskCache] = None) -> None:
+    """공유 임베딩 캐시에 영구 2차 캐시 연결 (mmap 저장소를 쓰는 캐시는 그대로 mmap 사용)"""
+    for cache in _embedding_caches.values():
+        cache.disk_cache = disk_cache
 
 class EmbeddingService:
-    def __init__(self, model_name="paraphrase-multilingual-MiniLM-L12-v2"):
+    def __init__(self, model_name="paraphrase-multilingual-MiniLM-L12-v2", embedding_cache: Optional[EmbeddingCache] = None, encode_workers: int = 1):
         """임베딩 서비스 초기화"""
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
         self.translation_service = TranslationService(source_lang="ko", target_lang="en")
+        # 지정하지 않으면 모델별 공유 임베딩 캐시 사용
+        self.embedding_cache = embedding_cache if embedding_cache is not None else get_embedding_cache(model_name, self.dimension)
+        # CPU 연산인 인코딩을 이벤트 루프 밖에서 실행하기 위한 전용 실행기
+        self.encode_executor = ThreadPoolExecutor(max_workers=encode_workers, thread_name_prefix="encode")
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        캐시를 거쳐 텍스트를 임베딩 (미스인 텍스트만 한 번에 모델로 인코딩)
+        
+        Returns:
+            입력 순서와 같은 (len(texts), dimension) float32 배열
+        """
+        if len(texts) == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        if self.embedding_cache is None:
+            return np.asarray(self.model.encode(texts), dtype=np.float32)
+        
+        keys = [self.embedding_cache.make_key(text) for text in texts]
+        found = self.embedding_cache.get_many(keys)
+        
+        # 캐시 미스 텍스트만 중복 없이 모아 한 번에 인코딩
+        miss_texts: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in miss_texts:
+                miss_texts[key] = text
+        
+        if miss_texts:
+            miss_embeddings = np.asarray(self.model.encode(list(miss_texts.values())), dtype=np.float32)
+            computed = dict(zip(miss_texts.keys(), miss_embeddings))
+            self.embedding_cache.set_many(computed)
+            found.update(computed)
+        
+        # 원래 순서대로 병합
+        return np.vstack([found[key] for key in keys])
+    
+    async def encode_async(self, texts: List[str]) -> np.ndarray:
+        """전용 실행기에서 encode 실행 (이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.encode_executor, self.encode, texts)
     
-    def generate_embeddings(self, texts: List[str], translate: bool = True) -> List[np.ndarray]:
+    def generate_embeddings(self, texts: List[str], translate: bool = True) -> np.ndarray:
         """텍스트 리스트에 대한 임베딩 생성"""
         if translate:
             # 영어로 번역 후 임베딩
             translated_texts = self.translation_service.translate_batch_to_target(texts)
-            embeddings = self.model.encode(translated_texts)
+            embeddings = self.encode(translated_texts)
         else:
             # 직접 임베딩 (번역 없음)
-            embeddings = self.model.encode(texts)
+            embeddings = self.encode(texts)
         return embeddings
     
     def process_chunks(self, chunked_data: List[Dict[str, Any]], translate: bool = True) -> List[Dict[str, Any]]:
@@ -35,10 +107,10 @@ class EmbeddingService:
                 chunk["text"] = translated_texts[i]
             
             # 번역된 텍스트로 임베딩 생성
-            embeddings = self.model.encode(translated_texts)
+            embeddings = self.encode(translated_texts)
         else:
             # 번역 없이 임베딩 생성
-            embeddings = self.model.encode(texts)
+            embeddings = self.encode(texts)
         
         # 임베딩을 원래 데이터와 결합
         for i, chunk in enumerate(chunked_data):
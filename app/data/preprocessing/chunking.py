@@ -1,7 +1,8 @@
 # data/preprocessing/chunking.py
+import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text, inspect
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from utils.translation_utils import TranslationService
 
 translation_service = TranslationService(source_lang="ko", target_lang="en")
@@ -18,6 +19,53 @@ def fetch_data_from_table(db: Session, table_name: str, limit: int = None):
     result = db.execute(text(query))
     return result.fetchall()
 
+def stream_rows_from_table(db: Session, table_name: str, fetch_size: int = 1000, where: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    서버 측 커서로 테이블 행을 fetch_size개씩 가져오며 하나씩 반환 (fetchall 없이 메모리 사용량 제한)
+    
+    Args:
+        where: 바인드 파라미터를 사용하는 WHERE 조건 (예: '"id" > :mark')
+        params: WHERE 조건의 바인드 파라미터
+    """
+    query = f'SELECT * FROM "{table_name}"' + (f" WHERE {where}" if where else "")
+    statement = text(query).execution_options(stream_results=True, yield_per=fetch_size)
+    result = db.execute(statement, params or {})
+    try:
+        for partition in result.partitions(fetch_size):
+            yield from partition
+    finally:
+        result.close()
+
+def stream_column_values(db: Session, table_name: str, column: str, fetch_size: int = 10000) -> Iterator[Any]:
+    """서버 측 커서로 한 컬럼의 값만 스트리밍 (삭제 확인용 ID 집합 등)"""
+    statement = text(f'SELECT "{column}" FROM "{table_name}"').execution_options(stream_results=True, yield_per=fetch_size)
+    result = db.execute(statement)
+    try:
+        for partition in result.partitions(fetch_size):
+            for row in partition:
+                yield row[0]
+    finally:
+        result.close()
+
+def get_column_names(db: Session, table_name: str) -> List[str]:
+    """테이블의 컬럼 이름 목록"""
+    return [column["name"] for column in inspect(db.bind).get_columns(table_name)]
+
+def get_watermark_columns(db: Session, table_name: str) -> List[str]:
+    """
+    증분 인덱싱 기준 컬럼 선택
+    
+    updated_at/created_at이 있으면 둘 다(있는 것만), 없으면 id를 사용한다.
+    id 컬럼이 없는 테이블은 빈 리스트를 반환하며, index_incremental은 이 경우 매번 테이블 전체를 다시 읽는다.
+    이런 테이블의 row_id는 스트림 내 순번이라, 걸러진 행만 인덱싱하면 새 행이 0..k 순번으로
+    기존 행의 포인트를 덮어쓰기 때문이다. (바뀌지 않은 청크는 content_hash 비교로 다시 임베딩하지 않는다.)
+    """
+    columns = set(get_column_names(db, table_name))
+    if "id" not in columns:
+        return []
+    time_columns = [column for column in ("updated_at", "created_at") if column in columns]
+    return time_columns or ["id"]
+
 def extract_text_from_row(row, translate: bool = None):
     """
     DB 로우에서 텍스트 데이터 추출 및 번역 (선택 사항)
@@ -36,13 +84,47 @@ def extract_text_from_row(row, translate: bool = None):
     
     # 번역 옵션이 활성화된 경우 영어로 번역
     if translate:
-        original_text = text
         text = translation_service.translate_to_target(text)
-        print(f"원본 텍스트: {original_text}")
-        print(f"번역된 텍스트: {text}")
     
     return text
 
+def _to_epoch_seconds(value: Any) -> Optional[float]:
+    """datetime/date/숫자/ISO 문자열을 epoch 초로 변환 (변환할 수 없으면 None)"""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time()).timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def row_metadata(row) -> Dict[str, Any]:
+    """
+    검색 필터/재순위에 쓰는 행 메타데이터 추출
+
+    user_id 컬럼과, updated_at(없으면 created_at)을 epoch 초로 변환한 timestamp를 청크 페이로드에 복사한다.
+    (qdrant_store의 user_id/timestamp 페이로드 인덱스와 enhanced_search의 최신성 점수가 이 값을 사용)
+    """
+    row_dict = row._mapping
+    metadata = {}
+    user_id = row_dict.get('user_id')
+    if user_id is not None:
+        try:
+            metadata['user_id'] = int(user_id)
+        except (TypeError, ValueError):
+            metadata['user_id'] = user_id
+    for column in ('updated_at', 'created_at'):
+        timestamp = _to_epoch_seconds(row_dict.get(column))
+        if timestamp is not None:
+            metadata['timestamp'] = timestamp
+            break
+    return metadata
+
 # data/preprocessing/chunking.py - split_text_into_chunks 함수 추가
 def split_text_into_chunks(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
     """
@@ -93,41 +175,86 @@ def split_text_into_chunks(text: str, chunk_size: int = 1000, chunk_overlap: int
     
     return chunks
 
-def process_all_tables(db: Session, exclude_tables=None, chunk_size: int = 1000, chunk_overlap: int = 200):
-    """모든 테이블의 데이터 처리 및 청크 분할"""
+def row_chunks(table: str, row: Any, row_index: int, chunk_size: int = 1000, chunk_overlap: int = 200, translate: bool = None) -> List[Dict[str, Any]]:
+    """
+    한 행을 청크 목록으로 분할 (row_index는 id 컬럼이 없을 때 row_id로 사용)
+    
+    translate=False면 원문 그대로 분할한다 (번역은 인덱싱 파이프라인의 translate 단계에서 배치로 수행).
+    """
+    # 행에서 텍스트 추출
+    row_text = extract_text_from_row(row, translate=translate)
+    
+    # ID 값 추출 (대부분의 테이블에 id 컬럼이 있다고 가정)
+    row_id = row._mapping.get('id', row_index)
+    
+    # 텍스트 청크 분할
+    chunks = split_text_into_chunks(row_text, chunk_size, chunk_overlap)
+    extra_metadata = row_metadata(row)
+    
+    # 메타데이터와 함께 반환
+    return [
+        {
+            'text': chunk,
+            'metadata': {
+                'table': table,
+                'row_id': row_id,
+                'chunk_index': i,
+                'total_chunks': len(chunks),
+                **extra_metadata
+            }
+        }
+        for i, chunk in enumerate(chunks)
+    ]
+
+def iter_row_chunks(table: str, rows: Iterable[Any], chunk_size: int = 1000, chunk_overlap: int = 200, translate: bool = None) -> Iterator[Dict[str, Any]]:
+    """행 이터레이터에서 청크를 하나씩 생성"""
+    for row_index, row in enumerate(rows):
+        yield from row_chunks(table, row, row_index, chunk_size, chunk_overlap, translate)
+
+def iter_table_chunks(db: Session, table: str, chunk_size: int = 1000, chunk_overlap: int = 200, fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """한 테이블의 행을 스트리밍하며 청크를 하나씩 생성"""
+    yield from iter_row_chunks(table, stream_rows_from_table(db, table, fetch_size), chunk_size, chunk_overlap)
+
+def iter_all_table_chunks(db: Session, exclude_tables=None, chunk_size: int = 1000, chunk_overlap: int = 200, fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """모든 테이블의 청크를 테이블 순서대로 하나씩 생성"""
     if exclude_tables is None:
         exclude_tables = []
     
-    tables = get_all_tables(db)
-    chunked_data = []
-    
-    for table in tables:
+    for table in get_all_tables(db):
         if table in exclude_tables:
             continue
-            
+        
         print(f"Processing table: {table}")
-        rows = fetch_data_from_table(db, table)
+        yield from iter_table_chunks(db, table, chunk_size, chunk_overlap, fetch_size)
+
+def iter_table_rows(db: Session, table: str, fetch_size: int = 1000, where: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, int, Any]]:
+    """한 테이블의 행을 (테이블, 행 순번, 행)으로 스트리밍 (청크 분할을 다른 스레드에서 할 때 사용)"""
+    for row_index, row in enumerate(stream_rows_from_table(db, table, fetch_size, where, params)):
+        yield table, row_index, row
+
+def iter_all_table_rows(db: Session, exclude_tables=None, fetch_size: int = 1000) -> Iterator[Tuple[str, int, Any]]:
+    """모든 테이블의 행을 테이블 순서대로 (테이블, 행 순번, 행)으로 스트리밍"""
+    if exclude_tables is None:
+        exclude_tables = []
+    
+    for table in get_all_tables(db):
+        if table in exclude_tables:
+            continue
         
-        for row_index, row in enumerate(rows):
-            # 행에서 텍스트 추출
-            row_text = extract_text_from_row(row)
-            
-            # ID 값 추출 (대부분의 테이블에 id 컬럼이 있다고 가정)
-            row_id = row._mapping.get('id', row_index)
-            
-            # 텍스트 청크 분할
-            chunks = split_text_into_chunks(row_text, chunk_size, chunk_overlap)
-            
-            # 메타데이터와 함께 저장
-            for i, chunk in enumerate(chunks):
-                chunked_data.append({
-                    'text': chunk,
-                    'metadata': {
-                        'table': table,
-                        'row_id': row_id,
-                        'chunk_index': i,
-                        'total_chunks': len(chunks)
-                    }
-                })
-    
-    return chunked_data
\ No newline at end of file
+        print(f"Processing table: {table}")
+        yield from iter_table_rows(db, table, fetch_size)
+
+def iter_chunk_batches(chunks: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """청크 이터레이터를 batch_size개씩 묶어 반환 (한 번에 한 배치만 메모리에 유지)"""
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def process_all_tables(db: Session, exclude_tables=None, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """모든 테이블의 데이터 처리 및 청크 분할 (전체 리스트 반환, 대량 인덱싱은 iter_all_table_chunks 사용)"""
+    return list(iter_all_table_chunks(db, exclude_tables, chunk_size, chunk_overlap))
@@ -0,0 +1,61 @@
+-- db/migrations/index_outbox.sql
+-- 벡터 인덱스 동기화를 위한 변경 이력(outbox) 테이블과 트리거
+--
+-- 트리거가 변경된 행의 (테이블, id, 작업)을 index_outbox에 기록하고 index_changes 채널로 NOTIFY 한다.
+-- 동기화 워커(services/indexing/change_feed.py)는 outbox를 읽거나 LISTEN으로 알림을 받아 처리한다.
+--
+-- 적용: psql -f db/migrations/index_outbox.sql
+-- 테이블별 트리거 설치: SELECT install_index_outbox_trigger('schedule');
+--
+-- 주의: 트리거는 NEW.id / OLD.id를 읽으므로 id 컬럼이 없는 테이블에 설치하면 그 테이블의 모든 INSERT/UPDATE/DELETE가
+--       실패한다. install_index_outbox_trigger는 id 컬럼이 없는 테이블에는 설치를 거부한다.
+-- outbox 행은 워커가 처리(ack) 후 삭제한다 (outbox 모드, notify 모드 모두 알림의 event_id로 삭제).
+
+CREATE TABLE IF NOT EXISTS index_outbox (
+    id          BIGSERIAL PRIMARY KEY,
+    table_name  TEXT        NOT NULL,
+    row_id      BIGINT      NOT NULL,
+    op          TEXT        NOT NULL,               -- upsert, delete
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION index_outbox_notify() RETURNS trigger AS $$
+DECLARE
+    changed_id BIGINT;
+    change_op  TEXT;
+    event_id   BIGINT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed_id := OLD.id;
+        change_op := 'delete';
+    ELSE
+        changed_id := NEW.id;
+        change_op := 'upsert';
+    END IF;
+
+    INSERT INTO index_outbox (table_name, row_id, op) VALUES (TG_TABLE_NAME, changed_id, change_op)
+        RETURNING id INTO event_id;
+    PERFORM pg_notify(
+        'index_changes',
+        json_build_object('event_id', event_id, 'table', TG_TABLE_NAME, 'id', changed_id, 'op', change_op)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION install_index_outbox_trigger(target_table TEXT) RETURNS void AS $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = target_table AND column_name = 'id'
+    ) THEN
+        RAISE EXCEPTION 'table % has no id column; index_outbox_trigger would make every write fail', target_table;
+    END IF;
+    EXECUTE format('DROP TRIGGER IF EXISTS index_outbox_trigger ON %I', target_table);
+    EXECUTE format(
+        'CREATE TRIGGER index_outbox_trigger AFTER INSERT OR UPDATE OR DELETE ON %I '
+        'FOR EACH ROW EXECUTE FUNCTION index_outbox_notify()',
+        target_table
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -1,8 +1,10 @@
 # llm/models/deepseek_model.py
+import json
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
 from typing import Dict, List, Any, Optional
 from llm.models.generation_params import GenerationParameters
+from utils.single_flight import SingleFlight
 
 class DeepSeekLLM:
     def __init__(self, 
@@ -46,6 +48,9 @@ class DeepSeekLLM:
         
         # 생성 파라미터 관리자 초기화
         self.param_manager = GenerationParameters(config_path=param_config)
+        
+        # 동일한 프롬프트/파라미터의 동시 생성을 하나로 합치는 single-flight 그룹
+        self.single_flight = SingleFlight()
             
         print("DeepSeek model loaded successfully")
     
@@ -72,6 +77,27 @@ class DeepSeekLLM:
         Returns:
             생성된 텍스트
         """
+        # 같은 프롬프트와 파라미터로 진행 중인 생성이 있으면 그 결과를 함께 받음
+        flight_key = json.dumps(
+            [prompt, max_tokens, temperature, preset, param_overrides, adaptive, context_items],
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False
+        )
+        return self.single_flight.do(
+            flight_key,
+            lambda: self._generate(prompt, max_tokens, temperature, preset, param_overrides, adaptive, context_items)
+        )
+    
+    def _generate(self,
+                  prompt: str,
+                  max_tokens: int,
+                  temperature: float,
+                  preset: Optional[str],
+                  param_overrides: Optional[Dict[str, Any]],
+                  adaptive: bool,
+                  context_items: Optional[List[Dict[str, Any]]]) -> str:
+        """텍스트 실제 생성 (single-flight 리더만 호출)"""
         # 생성 파라미터 가져오기
         if adaptive and context_items:
             gen_params = self.param_manager.create_adaptive_params(prompt, context_items)
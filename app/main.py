@@ -1,40 +1,128 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from db.connection.database import engine, Base, get_db
+from db.connection.database import engine, Base, get_db, SessionLocal
 from sqlalchemy import text
 from data.preprocessing.chunking import (
     process_all_tables, 
     fetch_data_from_table, 
     extract_text_from_row, 
-    split_text_into_chunks
+    split_text_into_chunks,
+    row_metadata
 )
-from data.embedding.embedding import EmbeddingService
+from data.embedding.embedding import EmbeddingService, configure_embedding_cache
 from services.indexing.indexing_service import IndexingService
+from services.indexing.watermark_store import WatermarkStore
+from services.indexing.change_feed import ChangeFeedWorker, LocalChangeSource, OutboxChangeSource, NotifyChangeSource
 from vectordb.qdrant_store import QdrantVectorStore
-from data.embedding.embedding import EmbeddingService
+from vectordb.numpy_store import NumpyVectorStore
 from cache.query_cache import QueryCache
+from cache.semantic_cache import SemanticQueryCache
+from cache.disk_cache import DiskCache
 from postprocessing.threshold.threshold_filter import ThresholdFilter
 from services.similarity.search_service import SearchService
 from postprocessing.ranking.ranking import RankingProcessor
 from llm.models.deepseek_model import DeepSeekLLM
 from services.chat.chat_service import ChatService
-from utils.translation_utils import TranslationService
-from config.settings.settings import TRANSLATION_SETTINGS
+from utils.translation_utils import TranslationService, get_translation_cache, configure_translation_cache
+from config.settings.settings import (
+    TRANSLATION_SETTINGS,
+    CACHE_SETTINGS,
+    SEMANTIC_CACHE_SETTINGS,
+    DISK_CACHE_SETTINGS,
+    VECTOR_SEARCH_SETTINGS,
+    QDRANT_SETTINGS,
+    VECTOR_STORE_SETTINGS,
+    INDEXING_SETTINGS,
+    CHANGE_FEED_SETTINGS
+)
 
 
 from api.routes.chat_routes import router as chat_router
 
 
-# 서비스 초기화
-embedding_service = EmbeddingService()
-vector_store = QdrantVectorStore()
-indexing_service = IndexingService(embedding_service, vector_store)
-query_cache = QueryCache()
+# 서비스 초기화 (임베딩 모델은 한 번만 로드해 인덱싱, 벡터 크기, 검색에서 공유)
+embedding_service = EmbeddingService(
+    model_name="paraphrase-multilingual-MiniLM-L12-v2",
+    encode_workers=VECTOR_SEARCH_SETTINGS.get("encode_workers", 1)
+)
+if VECTOR_STORE_SETTINGS["backend"] == "numpy":
+    # Qdrant 서버 없이 프로세스 내 NumPy 저장소 사용 (개발/CI/소규모 배포용)
+    vector_store = NumpyVectorStore(
+        collection_name=VECTOR_STORE_SETTINGS["collection_name"],
+        vector_size=embedding_service.dimension,
+        snapshot_dir=VECTOR_STORE_SETTINGS["numpy_snapshot_dir"],
+        initial_capacity=VECTOR_STORE_SETTINGS["numpy_initial_capacity"]
+    )
+else:
+    vector_store = QdrantVectorStore(
+        collection_name=VECTOR_STORE_SETTINGS["collection_name"],
+        host=QDRANT_SETTINGS["host"],
+        port=QDRANT_SETTINGS["port"],
+        grpc_port=QDRANT_SETTINGS["grpc_port"],
+        prefer_grpc=QDRANT_SETTINGS["prefer_grpc"],
+        upsert_batch_size=QDRANT_SETTINGS["upsert_batch_size"],
+        upsert_parallel=QDRANT_SETTINGS["upsert_parallel"],
+        quantization=QDRANT_SETTINGS["quantization"],
+        quantization_always_ram=QDRANT_SETTINGS["quantization_always_ram"],
+        quantization_quantile=QDRANT_SETTINGS["quantization_quantile"],
+        search_oversampling=QDRANT_SETTINGS["search_oversampling"],
+        search_rescore=QDRANT_SETTINGS["search_rescore"],
+        hnsw_m=QDRANT_SETTINGS["hnsw_m"],
+        hnsw_ef_construct=QDRANT_SETTINGS["hnsw_ef_construct"],
+        hnsw_ef=QDRANT_SETTINGS["hnsw_ef"],
+        exact=QDRANT_SETTINGS["exact"],
+        indexed_only=QDRANT_SETTINGS["indexed_only"],
+        use_alias=QDRANT_SETTINGS["use_alias"]
+    )
+indexing_service = IndexingService(
+    embedding_service,
+    vector_store,
+    watermark_store=WatermarkStore(INDEXING_SETTINGS["watermark_path"]),
+    reconcile_interval=INDEXING_SETTINGS["reconcile_interval"],
+    pipeline_settings=INDEXING_SETTINGS["pipeline"]
+)
+# DB 변경 피드 동기화 워커 (같은 행의 연속 변경을 합쳐 마이크로 배치로 다시 인덱싱)
+if CHANGE_FEED_SETTINGS["source"] == "notify":
+    change_source = NotifyChangeSource(engine, channel=CHANGE_FEED_SETTINGS["channel"], outbox_table=CHANGE_FEED_SETTINGS["outbox_table"])
+elif CHANGE_FEED_SETTINGS["source"] == "local":
+    change_source = LocalChangeSource()
+else:
+    change_source = OutboxChangeSource(SessionLocal, table=CHANGE_FEED_SETTINGS["outbox_table"])
+change_feed_worker = ChangeFeedWorker(
+    change_source,
+    indexing_service,
+    SessionLocal,
+    debounce_seconds=CHANGE_FEED_SETTINGS["debounce_seconds"],
+    max_delay_seconds=CHANGE_FEED_SETTINGS["max_delay_seconds"],
+    max_batch_size=CHANGE_FEED_SETTINGS["max_batch_size"],
+    poll_interval=CHANGE_FEED_SETTINGS["poll_interval"]
+)
+# 재시작 후에도 유지되는 2차 캐시 (설정 시에만 사용, 첫 사용 시점에 파일 로딩)
+disk_cache = DiskCache(
+    directory=DISK_CACHE_SETTINGS["directory"],
+    namespace_ttls=DISK_CACHE_SETTINGS["namespace_ttls"]
+) if DISK_CACHE_SETTINGS.get("enabled", False) else None
+if disk_cache:
+    configure_translation_cache(disk_cache)
+    configure_embedding_cache(disk_cache)
+query_cache = QueryCache(
+    ttl=CACHE_SETTINGS["ttl"],
+    max_entries=CACHE_SETTINGS["max_entries"],
+    max_bytes=CACHE_SETTINGS["max_bytes"],
+    sweep_interval=CACHE_SETTINGS["sweep_interval"],
+    disk_cache=disk_cache
+)
+semantic_cache = SemanticQueryCache(
+    max_distance=SEMANTIC_CACHE_SETTINGS["max_distance"],
+    ttl=SEMANTIC_CACHE_SETTINGS["ttl"],
+    max_entries_per_scope=SEMANTIC_CACHE_SETTINGS["max_entries_per_user"]
+) if SEMANTIC_CACHE_SETTINGS.get("enabled", True) else None
 threshold_filter = ThresholdFilter(threshold=0.1)
 ranking_processor = RankingProcessor()  # 랭킹 프로세서 초기화
 translation_enabled = TRANSLATION_SETTINGS.get("enabled", True)
-embedding_service = EmbeddingService(model_name="paraphrase-multilingual-MiniLM-L12-v2")
 
 
 
@@ -44,7 +132,8 @@ search_service = SearchService(
     threshold_filter=threshold_filter,
     query_cache=query_cache,
     ranking_processor=ranking_processor,
-    translation_enabled=translation_enabled
+    translation_enabled=translation_enabled,
+    semantic_cache=semantic_cache
 )
 
 llm_model = DeepSeekLLM(model_name = "deepseek-ai/deepseek-coder-1.3b-instruct", device="cuda")
@@ -60,6 +149,22 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI()
 app.include_router(chat_router, prefix="/api/chat", tags=["chat"])
 
+@app.on_event("startup")
+def start_change_feed():
+    if CHANGE_FEED_SETTINGS["enabled"]:
+        change_feed_worker.start()
+
+@app.on_event("shutdown")
+def stop_change_feed():
+    """대기 중인 변경을 처리한 뒤 워커 종료"""
+    change_feed_worker.stop()
+
+@app.on_event("shutdown")
+def save_vector_snapshot():
+    """NumPy 백엔드 사용 시 종료 전에 벡터 스냅샷 저장"""
+    if isinstance(vector_store, NumpyVectorStore):
+        vector_store.save()
+
 # ✅ CORS 미들웨어 추가
 app.add_middleware(
     CORSMiddleware,
@@ -75,6 +180,8 @@ def reset_vector_database():
         # 모든 벡터 데이터 삭제
         success = vector_store.delete_all()
         if success:
+            # 벡터가 없어졌으므로 다음 증분 인덱싱은 전체를 다시 처리
+            indexing_service.watermark_store.clear()
             return {"status": "success", "message": "모든 벡터 데이터가 삭제되었습니다."}
         else:
             raise HTTPException(status_code=500, detail="벡터 데이터 삭제 실패")
@@ -89,6 +196,45 @@ def index_all_tables(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Indexing failed: {str(e)}")
 
+# 증분 인덱싱: 테이블별 기준값 이후 변경된 행만 인덱싱 (reconcile=true면 삭제된 행 확인 강제)
+@app.post("/index/incremental")
+def index_incremental(reconcile: Optional[bool] = None, db: Session = Depends(get_db)):
+    try:
+        result = indexing_service.index_incremental(db, exclude_tables=["migrations", "alembic_version"], reconcile=reconcile)
+        return {"status": "success", "message": "Incremental indexing completed", "details": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Incremental indexing failed: {str(e)}")
+
+# 대량 인덱싱 파이프라인의 단계별 처리량/큐 깊이 (실행 중이면 현재 값, 아니면 마지막 실행 결과)
+@app.get("/index/pipeline/stats")
+def get_index_pipeline_stats():
+    return {"status": "success", "stats": indexing_service.pipeline_stats()}
+
+@app.get("/index/watermarks")
+def get_index_watermarks():
+    return {"status": "success", "watermarks": indexing_service.watermark_store.all()}
+
+# 무중단 재구축: 섀도 컬렉션에 인덱싱 후 별칭 교체 (재구축 중에도 기존 인덱스로 검색)
+@app.post("/index/rebuild")
+def rebuild_all_tables(keep_old: bool = False, db: Session = Depends(get_db)):
+    try:
+        result = indexing_service.rebuild_all_tables(db, exclude_tables=["migrations", "alembic_version"], keep_old=keep_old)
+        # 새 인덱스 기준으로 다시 검색하도록 캐시 비우기
+        query_cache.clear()
+        if semantic_cache:
+            semantic_cache.clear()
+        return {"status": "success", "message": "All tables rebuilt and swapped", "details": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rebuild failed: {str(e)}")
+
+# 별칭 도입 전 컬렉션을 별칭으로 전환 (최초 1회, 전환 순간 잠깐 검색이 실패할 수 있어 재구축과 분리)
+@app.post("/index/migrate-alias")
+def migrate_to_alias():
+    try:
+        return {"status": "success", "details": vector_store.migrate_to_alias()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Alias migration failed: {str(e)}")
+
 @app.post("/index/table/{table_name}")
 def index_table(table_name: str, db: Session = Depends(get_db)):
     try:
@@ -105,18 +251,97 @@ def index_table(table_name: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Indexing failed: {str(e)}")
     
 @app.get("/search")
-def search_similar(query: str, top_k: int = 5, use_cache: bool = True, threshold: float = None):
+async def search_similar(
+    query: str,
+    top_k: int = 5,
+    use_cache: bool = True,
+    threshold: float = None,
+    user_id: int = None,
+    table: Optional[str] = None,
+    user_only: bool = False,
+    hnsw_ef: Optional[int] = None,
+    exact: Optional[bool] = None,
+    indexed_only: Optional[bool] = None
+):
     try:
-        # 요청별 임계값 설정 가능 (기본값 사용)
-        if threshold is not None:
-            threshold_filter.threshold = threshold
+        # 페이로드 조건은 Qdrant 검색 중에 적용 (사후 필터링 아님)
+        filters = {}
+        if table:
+            filters["table"] = table
+        if user_only and user_id is not None:
+            filters["user_id"] = user_id
+        
+        # 요청별 검색 파라미터 (지정한 값만 전달, 나머지는 저장소 기본값)
+        search_params = {
+            key: value for key, value in
+            {"hnsw_ef": hnsw_ef, "exact": exact, "indexed_only": indexed_only}.items()
+            if value is not None
+        }
         
-        # 검색 수행
-        result = search_service.search(query, top_k, use_cache)
+        # 요청별 임계값은 공유 필터를 변경하지 않고 검색에 직접 전달 (없으면 기본값 사용)
+        result = await search_service.search_async(query, top_k, use_cache, user_id=user_id, threshold=threshold, filters=filters or None, search_params=search_params or None)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+class ChangeEvent(BaseModel):
+    table: str
+    id: int
+    op: str = "upsert"  # upsert, delete
+
+class ChangeBatchRequest(BaseModel):
+    changes: List[ChangeEvent]
+    wait: bool = False  # True면 대기하지 않고 즉시 처리한 결과 반환
+
+class SearchParams(BaseModel):
+    hnsw_ef: Optional[int] = None
+    exact: Optional[bool] = None
+    indexed_only: Optional[bool] = None
+
+    class Config:
+        extra = "forbid"  # 알 수 없는 검색 파라미터는 422로 거부
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = 5
+    use_cache: bool = True
+    threshold: Optional[float] = None
+    filters: Optional[Dict[str, Any]] = None
+    search_params: Optional[SearchParams] = None
+
+# 여러 질문 일괄 검색 (평가/프리페치 작업용)
+@app.post("/search/batch")
+def search_batch(request: BatchSearchRequest):
+    try:
+        # 지정한 값만 전달 (나머지는 저장소 기본값)
+        search_params = request.search_params.dict(exclude_none=True) if request.search_params else None
+        results = search_service.search_many(request.queries, request.top_k, request.use_cache, threshold=request.threshold, filters=request.filters, search_params=search_params or None)
+        return {"status": "success", "count": len(results), "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
+# 쿼리 캐시 통계 확인
+@app.get("/cache/stats")
+def get_cache_stats():
+    translation_cache = get_translation_cache()
+    return {
+        "status": "success",
+        "query_cache": query_cache.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "translation_cache": translation_cache.stats() if translation_cache else None,
+        "embedding_cache": embedding_service.embedding_cache.stats() if embedding_service.embedding_cache else None,
+        "disk_cache": disk_cache.stats() if disk_cache else None,
+        "search_single_flight": search_service.single_flight.stats(),
+        "llm_single_flight": llm_model.single_flight.stats()
+    }
+
+@app.post("/cache/clear")
+def clear_cache():
+    query_cache.clear()
+    if semantic_cache:
+        semantic_cache.clear()
+    return {"status": "success", "message": "쿼리 캐시가 비워졌습니다."}
+
 # 청크분할 된 db데이터 임베딩딩 확인
 @app.get("/embeddings/{table_name}")
 def get_table_embeddings(table_name: str, limit: int = 5, db: Session = Depends(get_db)):
@@ -145,7 +370,8 @@ def get_table_embeddings(table_name: str, limit: int = 5, db: Session = Depends(
                         'table': table_name,
                         'row_id': row_id,
                         'chunk_index': i,
-                        'total_chunks': len(chunks)
+                        'total_chunks': len(chunks),
+                        **row_metadata(row)
                     }
                 })
         
@@ -208,7 +434,8 @@ def get_table_chunks(table_name: str, limit: int = 5, db: Session = Depends(get_
                         'table': table_name,
                         'row_id': row_id,
                         'chunk_index': i,
-                        'total_chunks': len(chunks)
+                        'total_chunks': len(chunks),
+                        **row_metadata(row)
                     }
                 })
         
@@ -333,8 +560,8 @@ def index_single_record(table_name: str, record_id: int, db: Session = Depends(g
         if not record:
             raise HTTPException(status_code=404, detail=f"Record with id {record_id} not found in table {table_name}")
         
-        # 해당 레코드 처리
-        row_text = extract_text_from_row(record)
+        # 해당 레코드 처리 (원문으로 분할해 해시 비교 후 바뀐 청크만 번역)
+        row_text = extract_text_from_row(record, translate=False)
         chunks = split_text_into_chunks(row_text)
         
         chunked_data = []
@@ -345,34 +572,49 @@ def index_single_record(table_name: str, record_id: int, db: Session = Depends(g
                     'table': table_name,
                     'row_id': record_id,
                     'chunk_index': i,
-                    'total_chunks': len(chunks)
+                    'total_chunks': len(chunks),
+                    **row_metadata(record)
                 }
             })
         
-        # 기존 데이터 삭제 (업데이트 경우 필요)
-        vector_store.delete_by_metadata(table_name, record_id)
-        
-        # 임베딩 생성 및 저장
+        # 저장된 해시와 같은 청크는 건너뛰고 바뀐 청크만 번역/임베딩/업서트, 줄어든 청크는 삭제
         if chunked_data:
-            texts = [item['text'] for item in chunked_data]
-            embeddings = embedding_service.generate_embeddings(texts)
-            
-            metadatas = []
-            for j, item in enumerate(chunked_data):
-                metadata = item['metadata']
-                metadata['text'] = texts[j]
-                metadatas.append(metadata)
-            
-            vector_store.add_embeddings(embeddings, metadatas)
+            result = indexing_service.index_chunks(chunked_data, label=f" for record {table_name}/{record_id}")
+        else:
+            vector_store.delete_by_metadata(table_name, record_id)
+            result = {"chunks_updated": 0, "chunks_skipped": 0, "chunks_deleted": 0}
         
         return {
             "status": "success", 
             "message": f"Record {record_id} from table {table_name} indexed successfully",
-            "chunks_indexed": len(chunked_data)
+            "chunks_indexed": len(chunked_data),
+            "chunks_updated": result["chunks_updated"],
+            "chunks_skipped": result["chunks_skipped"],
+            "chunks_deleted": result["chunks_deleted"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Indexing failed: {str(e)}")
 
+# 변경된 레코드 목록을 한 번에 받아 동기화 워커에 전달 (레코드별 개별 호출 대신 사용)
+@app.post("/index/changes")
+def submit_index_changes(request: ChangeBatchRequest):
+    try:
+        change_feed_worker.submit([
+            {"table": change.table, "row_id": change.id, "op": change.op}
+            for change in request.changes
+        ])
+        # 워커가 꺼져 있으면 요청 안에서 바로 처리
+        if request.wait or not CHANGE_FEED_SETTINGS["enabled"]:
+            result = change_feed_worker.flush(force=True)
+            return {"status": "success", "message": "Changes indexed", "details": result, "stats": change_feed_worker.stats()}
+        return {"status": "accepted", "message": f"{len(request.changes)} changes queued", "stats": change_feed_worker.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Change sync failed: {str(e)}")
+
+@app.get("/index/changes/stats")
+def get_change_feed_stats():
+    return {"status": "success", "stats": change_feed_worker.stats()}
+
 # 인덱스에서 특정 레코드 삭제하는 엔드포인트
 @app.post("/index/delete/{table_name}/{record_id}")
 def delete_from_index(table_name: str, record_id: int):
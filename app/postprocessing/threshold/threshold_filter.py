@@ -1,5 +1,5 @@
 # postprocessing/threshold/threshold_filter.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class ThresholdFilter:
     def __init__(self, threshold: float = 0.7):
@@ -11,20 +11,24 @@ class ThresholdFilter:
         """
         self.threshold = threshold
     
-    def filter_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def filter_results(self, results: List[Dict[str, Any]], threshold: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         임계값 이상의 유사도 점수를 가진 결과만 반환
         
         Args:
             results (List[Dict]): 벡터 검색 결과 리스트
+            threshold (float): 요청별 임계값 (없으면 self.threshold 사용, 공유 상태는 변경하지 않음)
             
         Returns:
             List[Dict]: 필터링된 결과 리스트
         """
+        if threshold is None:
+            threshold = self.threshold
+        
         # Qdrant에서는 높은 점수가 더 관련성이 높음 (코사인 유사도)
         filtered_results = [
             result for result in results 
-            if result.get('score', 0) >= self.threshold
+            if result.get('score', 0) >= threshold
         ]
         
         return filtered_results
\ No newline at end of file
@@ -0,0 +1,100 @@
+# scripts/evaluation/benchmark_hnsw.py
+# HNSW m / ef 조합별 recall@k 와 지연시간 비교 벤치마크
+#
+# 기존 컬렉션의 벡터를 m 값마다 임시 컬렉션으로 복사하고, 각 컬렉션에서 hnsw_ef를 바꿔가며
+# NumPy 전수 탐색 정답과 비교한다. exact=True 검색도 함께 측정해 기준선으로 사용한다.
+#
+# 실행방법 (app 디렉터리에서)
+# python -m scripts.evaluation.benchmark_hnsw --source chatbot_vectors --m 8,16,32 --ef 16,32,64,128,256
+import argparse
+import time
+import numpy as np
+from qdrant_client.http import models
+from vectordb.qdrant_store import QdrantVectorStore
+from scripts.evaluation.benchmark_quantization import load_vectors, make_queries, exact_top_k, wait_until_indexed
+
+def measure(store: QdrantVectorStore, queries: np.ndarray, truth_ids, top_k: int, **search_kwargs):
+    """쿼리별 지연시간과 recall@k 측정"""
+    latencies = []
+    recalls = []
+    for query, truth in zip(queries, truth_ids):
+        start_time = time.perf_counter()
+        hits = store.search(query, top_k=top_k, payload_fields=[], **search_kwargs)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        recalls.append(len({hit["id"] for hit in hits} & truth) / len(truth))
+    return {
+        "recall": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant HNSW 파라미터 벤치마크")
+    parser.add_argument("--source", default="chatbot_vectors", help="벡터를 가져올 원본 컬렉션")
+    parser.add_argument("--host", default="localhost", help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant 포트")
+    parser.add_argument("--limit", type=int, default=50000, help="복사할 최대 벡터 수")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--top-k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--noise", type=float, default=0.05, help="쿼리 생성 시 더할 잡음 표준편차")
+    parser.add_argument("--m", default="8,16,32", help="측정할 m 값 (쉼표 구분)")
+    parser.add_argument("--ef-construct", type=int, default=100, help="인덱싱 탐색 폭")
+    parser.add_argument("--ef", default="16,32,64,128,256", help="측정할 hnsw_ef 값 (쉼표 구분)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--keep", action="store_true", help="임시 컬렉션 삭제하지 않음")
+    args = parser.parse_args()
+
+    m_values = [int(value) for value in args.m.split(",") if value.strip()]
+    ef_values = [int(value) for value in args.ef.split(",") if value.strip()]
+
+    source = QdrantVectorStore(collection_name=args.source, host=args.host, port=args.port)
+    vectors, payloads = load_vectors(source, args.limit)
+    if len(vectors) == 0:
+        print(f"No vectors in {args.source}")
+        return
+    print(f"Loaded {len(vectors)} vectors (dim={vectors.shape[1]}) from {args.source}")
+
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+    truth_rows = exact_top_k(vectors, queries, args.top_k)
+
+    rows = []
+    for m in m_values:
+        collection_name = f"{args.source}_bench_m{m}"
+        store = QdrantVectorStore(
+            collection_name=collection_name,
+            vector_size=vectors.shape[1],
+            host=args.host,
+            port=args.port,
+            hnsw_m=m,
+            hnsw_ef_construct=args.ef_construct
+        )
+        try:
+            store.delete_all()
+            # 작은 컬렉션도 HNSW 인덱스를 만들도록 인덱싱 임계값을 낮춤
+            store.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1)
+            )
+            start_time = time.perf_counter()
+            ids = store.bulk_upsert(vectors, payloads)["ids"]
+            wait_until_indexed(store)
+            build_seconds = time.perf_counter() - start_time
+
+            truth_ids = [{ids[row] for row in truth} for truth in truth_rows]
+            rows.append({"m": m, "ef": "exact", "build_s": build_seconds,
+                         **measure(store, queries, truth_ids, args.top_k, exact=True)})
+            for ef in ef_values:
+                rows.append({"m": m, "ef": ef, "build_s": build_seconds,
+                             **measure(store, queries, truth_ids, args.top_k, hnsw_ef=ef)})
+        finally:
+            if not args.keep:
+                store.client.delete_collection(collection_name)
+
+    print(f"{'m':>4}{'ef':>8}{'build(s)':>10}{f'recall@{args.top_k}':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for row in rows:
+        print(f"{row['m']:>4}{str(row['ef']):>8}{row['build_s']:>10.1f}{row['recall']:>12.4f}"
+              f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
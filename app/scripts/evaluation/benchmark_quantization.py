@@ -0,0 +1,188 @@
+# scripts/evaluation/benchmark_quantization.py
+# float32 / scalar(int8) / binary 양자화 컬렉션의 메모리, recall@k, 지연시간 비교 벤치마크
+#
+# 기존 컬렉션의 벡터를 임시 컬렉션으로 복사한 뒤, 정답(NumPy 전수 탐색)과 비교한다.
+#
+# 실행방법 (app 디렉터리에서)
+# python -m scripts.evaluation.benchmark_quantization --source chatbot_vectors --queries 200 --top-k 10
+import argparse
+import json
+import time
+import urllib.request
+import numpy as np
+from qdrant_client.http import models
+from vectordb.qdrant_store import QdrantVectorStore
+
+# 모드별 벡터 1개당 RAM에 두는 벡터 크기 추정치 (바이트, 차원 dim 기준, 인덱스/오버헤드 제외)
+# 실제 사용량은 Qdrant 텔레메트리의 세그먼트 ram/disk 사용량으로 따로 측정한다.
+BYTES_PER_VECTOR = {
+    "float": lambda dim: 4 * dim,
+    "scalar": lambda dim: dim,
+    "binary": lambda dim: (dim + 7) // 8,
+}
+
+def load_vectors(store: QdrantVectorStore, limit: int):
+    """원본 컬렉션에서 벡터와 페이로드를 스크롤로 읽기"""
+    vectors, payloads = [], []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = store.client.scroll(
+            collection_name=store.collection_name,
+            limit=min(1000, limit - len(vectors)),
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        for point in points:
+            vectors.append(point.vector)
+            payloads.append(point.payload or {})
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32), payloads
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    """저장된 벡터에 잡음을 더해 쿼리 생성 (자기 자신만 찾는 편향 완화)"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    queries = vectors[picks] + rng.normal(0, noise, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    """코사인 유사도 전수 탐색 정답 (행 인덱스)"""
+    normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    scores = queries @ normalized.T
+    top = np.argpartition(-scores, min(top_k, scores.shape[1] - 1), axis=1)[:, :top_k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+def measure_segments(host: str, port: int, collection_name: str):
+    """
+    Qdrant 텔레메트리에서 컬렉션 세그먼트의 실제 RAM/디스크 사용량 합계 조회 (바이트)
+
+    텔레메트리를 읽을 수 없으면 (None, None)을 반환한다.
+    """
+    url = f"http://{host}:{port}/telemetry?details_level=10"
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            telemetry = json.loads(response.read())
+    except (OSError, ValueError) as e:
+        print(f"텔레메트리 조회 실패: {e}")
+        return None, None
+
+    ram_bytes = disk_bytes = 0
+    found = False
+    collections = telemetry.get("result", {}).get("collections", {}).get("collections", [])
+    for collection in collections:
+        if collection.get("id") != collection_name:
+            continue
+        for shard in collection.get("shards", []):
+            for segment in (shard.get("local") or {}).get("segments", []):
+                info = segment.get("info", {})
+                ram_bytes += info.get("ram_usage_bytes", 0)
+                disk_bytes += info.get("disk_usage_bytes", 0)
+                found = True
+    return (ram_bytes, disk_bytes) if found else (None, None)
+
+def wait_until_indexed(store: QdrantVectorStore, timeout: float = 600):
+    """옵티마이저가 인덱스/양자화 벡터를 모두 만들 때까지 대기"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if store.client.get_collection(store.collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+
+def run_mode(args, mode: str, vectors: np.ndarray, payloads, queries: np.ndarray, truth_rows: np.ndarray):
+    """한 가지 모드의 임시 컬렉션을 만들어 측정"""
+    collection_name = f"{args.source}_bench_{mode}"
+    store = QdrantVectorStore(
+        collection_name=collection_name,
+        vector_size=vectors.shape[1],
+        host=args.host,
+        port=args.port,
+        quantization=None if mode == "float" else mode,
+        search_oversampling=args.oversampling,
+        search_rescore=not args.no_rescore
+    )
+    try:
+        store.delete_all()
+        upsert = store.bulk_upsert(vectors, payloads)
+        wait_until_indexed(store)
+
+        # 정답 행 인덱스를 이번 업서트에서 생성된 포인트 ID로 변환
+        ids = upsert["ids"]
+        truth_ids = [{ids[row] for row in rows} for rows in truth_rows]
+
+        latencies = []
+        recalls = []
+        for query, truth in zip(queries, truth_ids):
+            start_time = time.perf_counter()
+            hits = store.search(query, top_k=args.top_k, payload_fields=[])
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            found = {hit["id"] for hit in hits}
+            recalls.append(len(found & truth) / len(truth))
+
+        # 측정값: 세그먼트 RAM/디스크 사용량, 추정값: RAM의 (양자화) 벡터와 디스크에 둔 float32 원본
+        measured_ram, measured_disk = measure_segments(args.host, args.port, collection_name)
+        estimated_ram = len(vectors) * BYTES_PER_VECTOR[mode](vectors.shape[1])
+        originals_on_disk = len(vectors) * BYTES_PER_VECTOR["float"](vectors.shape[1]) if mode != "float" else 0
+        mb = 1024 * 1024
+        return {
+            "mode": mode,
+            "points": upsert["inserted"],
+            "ram_mb": measured_ram / mb if measured_ram is not None else None,
+            "disk_mb": measured_disk / mb if measured_disk is not None else None,
+            "est_vector_ram_mb": estimated_ram / mb,
+            "est_float32_on_disk_mb": originals_on_disk / mb,
+            f"recall@{args.top_k}": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+    finally:
+        if not args.keep:
+            store.client.delete_collection(collection_name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant 양자화 벤치마크")
+    parser.add_argument("--source", default="chatbot_vectors", help="벡터를 가져올 원본 컬렉션")
+    parser.add_argument("--host", default="localhost", help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant 포트")
+    parser.add_argument("--limit", type=int, default=50000, help="복사할 최대 벡터 수")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--top-k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--noise", type=float, default=0.05, help="쿼리 생성 시 더할 잡음 표준편차")
+    parser.add_argument("--oversampling", type=float, default=2.0, help="양자화 검색 oversampling")
+    parser.add_argument("--no-rescore", action="store_true", help="원본 벡터 rescore 끄기")
+    parser.add_argument("--modes", default="float,scalar,binary", help="측정할 모드 (쉼표 구분)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--keep", action="store_true", help="임시 컬렉션 삭제하지 않음")
+    args = parser.parse_args()
+
+    source = QdrantVectorStore(collection_name=args.source, host=args.host, port=args.port)
+    vectors, payloads = load_vectors(source, args.limit)
+    if len(vectors) == 0:
+        print(f"No vectors in {args.source}")
+        return
+    print(f"Loaded {len(vectors)} vectors (dim={vectors.shape[1]}) from {args.source}")
+
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+    truth_rows = exact_top_k(vectors, queries, args.top_k)
+
+    results = []
+    for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+        if mode not in BYTES_PER_VECTOR:
+            raise ValueError(f"Unknown mode: {mode}")
+        results.append(run_mode(args, mode, vectors, payloads, queries, truth_rows))
+
+    # RAM/disk는 텔레메트리 측정값(세그먼트 전체), est.는 벡터 크기만 계산한 추정값
+    def format_mb(value):
+        return f"{value:.1f}" if value is not None else "n/a"
+
+    print(f"{'mode':<8}{'points':>9}{'RAM(MB)':>10}{'disk(MB)':>10}{'est. vec RAM(MB)':>18}{'est. f32 disk(MB)':>19}"
+          f"{f'recall@{args.top_k}':>12}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for result in results:
+        print(f"{result['mode']:<8}{result['points']:>9}{format_mb(result['ram_mb']):>10}{format_mb(result['disk_mb']):>10}"
+              f"{result['est_vector_ram_mb']:>18.1f}{result['est_float32_on_disk_mb']:>19.1f}"
+              f"{result[f'recall@{args.top_k}']:>12.4f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# scripts/indexing/migrate_payload_indexes.py
+# 기존 Qdrant 컬렉션에 필터 검색용 페이로드 인덱스를 추가하는 마이그레이션 스크립트
+#
+# 실행방법 (app 디렉터리에서)
+# python -m scripts.indexing.migrate_payload_indexes --collection chatbot_vectors
+import argparse
+from qdrant_client import QdrantClient
+from vectordb.qdrant_store import QdrantVectorStore, PAYLOAD_INDEXES
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant 페이로드 인덱스 마이그레이션")
+    parser.add_argument("--collection", default="chatbot_vectors", help="대상 컬렉션 이름")
+    parser.add_argument("--host", default="localhost", help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant 포트")
+    args = parser.parse_args()
+
+    client = QdrantClient(host=args.host, port=args.port)
+    before = set((client.get_collection(args.collection).payload_schema or {}).keys())
+
+    # QdrantVectorStore 초기화 시 누락된 페이로드 인덱스가 생성됨
+    QdrantVectorStore(collection_name=args.collection, host=args.host, port=args.port)
+
+    after = set((client.get_collection(args.collection).payload_schema or {}).keys())
+    print(f"Collection: {args.collection}")
+    for field_name in PAYLOAD_INDEXES:
+        status = "indexed" if field_name in after else "missing"
+        print(f"  {field_name}: {status}")
+    print(f"Created: {sorted(after - before)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# scripts/indexing/migrate_quantization.py
+# 기존 Qdrant 컬렉션의 양자화 설정을 변경하는 마이그레이션 스크립트
+# (양자화 벡터는 Qdrant 옵티마이저가 백그라운드에서 다시 생성하며, 그동안에도 검색 가능)
+#
+# 실행방법 (app 디렉터리에서)
+# python -m scripts.indexing.migrate_quantization --collection chatbot_vectors --mode scalar
+# python -m scripts.indexing.migrate_quantization --collection chatbot_vectors --mode none
+import argparse
+import time
+from qdrant_client.http import models
+from vectordb.qdrant_store import QdrantVectorStore
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant 양자화 설정 마이그레이션")
+    parser.add_argument("--collection", default="chatbot_vectors", help="대상 컬렉션 이름")
+    parser.add_argument("--host", default="localhost", help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=6333, help="Qdrant 포트")
+    parser.add_argument("--mode", choices=["none", "scalar", "binary"], required=True, help="양자화 방식")
+    parser.add_argument("--no-always-ram", action="store_true", help="양자화 벡터를 RAM에 고정하지 않음")
+    parser.add_argument("--wait", action="store_true", help="옵티마이저가 재구성을 마칠 때까지 대기")
+    args = parser.parse_args()
+
+    # QdrantVectorStore 초기화 시 양자화 설정이 다르면 컬렉션 설정이 변경됨
+    store = QdrantVectorStore(
+        collection_name=args.collection,
+        host=args.host,
+        port=args.port,
+        quantization=None if args.mode == "none" else args.mode,
+        quantization_always_ram=not args.no_always_ram
+    )
+
+    if args.wait:
+        while store.client.get_collection(args.collection).status != models.CollectionStatus.GREEN:
+            time.sleep(1)
+
+    collection_info = store.client.get_collection(args.collection)
+    print(f"Collection: {args.collection}")
+    print(f"  status: {collection_info.status}")
+    print(f"  quantization: {collection_info.config.quantization_config}")
+    print(f"  vectors on disk: {collection_info.config.params.vectors.on_disk}")
+
+if __name__ == "__main__":
+    main()
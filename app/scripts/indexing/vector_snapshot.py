@@ -0,0 +1,54 @@
+# scripts/indexing/vector_snapshot.py
+# 벡터 스냅샷 내보내기/불러오기 (새 노드 구성이나 스키마 변경 후 재구축 시 번역/임베딩 없이 복원)
+#
+# 실행방법 (app 디렉터리에서)
+# python -m scripts.indexing.vector_snapshot export --dir snapshots/2024-06-01
+# python -m scripts.indexing.vector_snapshot import --dir snapshots/2024-06-01 --host new-qdrant
+import argparse
+import json
+from vectordb.qdrant_store import QdrantVectorStore
+from vectordb.snapshot import read_snapshot_header
+from config.settings.settings import QDRANT_SETTINGS, VECTOR_STORE_SETTINGS
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 스냅샷 내보내기/불러오기")
+    parser.add_argument("command", choices=["export", "import"], help="실행할 작업")
+    parser.add_argument("--dir", required=True, help="스냅샷 디렉터리")
+    parser.add_argument("--collection", default=VECTOR_STORE_SETTINGS["collection_name"], help="대상 컬렉션 이름")
+    parser.add_argument("--name", default=None, help="불러올 스냅샷 이름 (기본값: 컬렉션 이름)")
+    parser.add_argument("--host", default=QDRANT_SETTINGS["host"], help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=QDRANT_SETTINGS["port"], help="Qdrant 포트")
+    parser.add_argument("--grpc", action="store_true", default=QDRANT_SETTINGS["prefer_grpc"], help="gRPC 사용")
+    parser.add_argument("--batch-size", type=int, default=None, help="읽기 배치 크기")
+    parser.add_argument("--parallel", type=int, default=QDRANT_SETTINGS["upsert_parallel"], help="동시 업서트 요청 수")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        store = QdrantVectorStore(
+            collection_name=args.collection,
+            host=args.host,
+            port=args.port,
+            grpc_port=QDRANT_SETTINGS["grpc_port"],
+            prefer_grpc=args.grpc
+        )
+        result = store.export_snapshot(args.dir, batch_size=args.batch_size or 1000)
+    else:
+        # 컬렉션 차원은 스냅샷 헤더에서 가져옴 (임베딩 모델을 로딩하지 않음)
+        header = read_snapshot_header(args.dir, args.name or args.collection)
+        store = QdrantVectorStore(
+            collection_name=args.collection,
+            vector_size=header["dim"],
+            host=args.host,
+            port=args.port,
+            grpc_port=QDRANT_SETTINGS["grpc_port"],
+            prefer_grpc=args.grpc,
+            upsert_batch_size=QDRANT_SETTINGS["upsert_batch_size"],
+            upsert_parallel=args.parallel,
+            quantization=QDRANT_SETTINGS["quantization"]
+        )
+        result = store.import_snapshot(args.dir, name=args.name, batch_size=args.batch_size or 10000)
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
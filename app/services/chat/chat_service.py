@@ -77,7 +77,9 @@ class ChatService:
         search_results = self.search_service.search(
             query=message,  # 원본 메시지 전달 (SearchService 내부에서 번역)
             top_k=self.max_context_items, 
-            use_cache=True
+            use_cache=True,
+            user_id=user_id,
+            threshold=search_threshold
         )
         
         # 검색 결과 가져오기
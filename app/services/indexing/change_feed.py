@@ -0,0 +1,297 @@
+# services/indexing/change_feed.py
+import json
+import queue
+import select
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from services.indexing.indexing_service import IndexingService
+
+# 변경 이벤트: {"table": 테이블, "row_id": 레코드 ID, "op": "upsert" | "delete", "event_id": 소스별 ID(선택)}
+
+class LocalChangeSource:
+    def __init__(self):
+        """프로세스 내 큐 기반 변경 소스 (테스트/개발용, HTTP로 받은 변경 목록 전달용)"""
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def publish(self, table: str, row_id: Any, op: str = "upsert") -> None:
+        """변경 이벤트 추가"""
+        self._queue.put({"table": table, "row_id": row_id, "op": op})
+
+    def poll(self, timeout: float) -> List[Dict[str, Any]]:
+        """대기 중인 이벤트를 모두 가져옴 (없으면 timeout까지 대기)"""
+        events = []
+        try:
+            events.append(self._queue.get(timeout=timeout))
+            while True:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def ack(self, events: List[Dict[str, Any]]) -> None:
+        """처리 완료 (큐에서 이미 제거되었으므로 할 일 없음)"""
+        return None
+
+def _delete_outbox_events(connection_or_session, table: str, events: List[Dict[str, Any]]) -> List[Any]:
+    """처리한 이벤트를 outbox에서 삭제하고 삭제한 이벤트 ID 반환"""
+    event_ids = [event["event_id"] for event in events if event.get("event_id") is not None]
+    if event_ids:
+        connection_or_session.execute(text(f'DELETE FROM "{table}" WHERE id = ANY(:ids)'), {"ids": event_ids})
+    return event_ids
+
+class OutboxChangeSource:
+    def __init__(self, session_factory: Callable[[], Session], table: str = "index_outbox", fetch_size: int = 1000):
+        """
+        outbox 테이블 폴링 변경 소스 (db/migrations/index_outbox.sql)
+
+        처리 완료(ack)된 이벤트만 outbox에서 삭제하므로 워커가 중단되어도 변경이 유실되지 않는다.
+        BIGSERIAL id는 커밋 순서와 다를 수 있으므로 마지막 id 이후만 읽지 않고,
+        아직 ack되지 않았고 이미 가져간(처리 중) 이벤트가 아닌 행을 매번 다시 조회한다.
+        """
+        self.session_factory = session_factory
+        self.table = table
+        self.fetch_size = fetch_size
+        self._inflight: set = set()
+        self._lock = threading.Lock()
+
+    def poll(self, timeout: float) -> List[Dict[str, Any]]:
+        """처리 중이 아닌 outbox 이벤트 조회 (없으면 timeout 동안 대기)"""
+        with self._lock:
+            inflight = list(self._inflight)
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                text(f'SELECT id, table_name, row_id, op FROM "{self.table}" WHERE NOT (id = ANY(:inflight)) ORDER BY id LIMIT :limit'),
+                {"inflight": inflight, "limit": self.fetch_size}
+            ).fetchall()
+        finally:
+            db.close()
+
+        if not rows:
+            time.sleep(timeout)
+            return []
+        with self._lock:
+            self._inflight.update(row[0] for row in rows)
+        return [{"event_id": row[0], "table": row[1], "row_id": row[2], "op": row[3]} for row in rows]
+
+    def ack(self, events: List[Dict[str, Any]]) -> None:
+        """처리한 이벤트를 outbox에서 삭제"""
+        db = self.session_factory()
+        try:
+            event_ids = _delete_outbox_events(db, self.table, events)
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self._inflight.difference_update(event_ids)
+
+class NotifyChangeSource:
+    def __init__(self, engine, channel: str = "index_changes", outbox_table: str = "index_outbox"):
+        """
+        Postgres LISTEN/NOTIFY 변경 소스
+
+        알림은 워커가 연결되어 있을 때만 전달되므로, 중단 중 변경은 증분 인덱싱(/index/incremental)으로 보완한다.
+        트리거는 outbox에도 기록하고 알림에 그 id(event_id)를 담으므로, ack 시 outbox 행을 삭제해 쌓이지 않게 한다.
+        """
+        self.engine = engine
+        self.channel = channel
+        self.outbox_table = outbox_table
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            connection = self.engine.raw_connection()
+            connection.set_session(autocommit=True)
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self._connection = connection
+        return self._connection
+
+    def poll(self, timeout: float) -> List[Dict[str, Any]]:
+        """알림이 올 때까지 최대 timeout 대기 후 쌓인 알림을 모두 반환"""
+        connection = self._connect()
+        driver_connection = getattr(connection, "driver_connection", None) or connection.connection
+        if select.select([driver_connection], [], [], timeout) == ([], [], []):
+            return []
+        driver_connection.poll()
+
+        events = []
+        while driver_connection.notifies:
+            notify = driver_connection.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                events.append({
+                    "event_id": payload.get("event_id"),
+                    "table": payload["table"],
+                    "row_id": payload["id"],
+                    "op": payload.get("op", "upsert")
+                })
+            except (ValueError, KeyError) as e:
+                print(f"잘못된 변경 알림 무시: {notify.payload} ({e})")
+        return events
+
+    def ack(self, events: List[Dict[str, Any]]) -> None:
+        """처리한 알림의 outbox 행 삭제"""
+        with self.engine.begin() as connection:
+            _delete_outbox_events(connection, self.outbox_table, events)
+
+class ChangeFeedWorker:
+    def __init__(self,
+                 source: Any,
+                 indexing_service: IndexingService,
+                 session_factory: Callable[[], Session],
+                 debounce_seconds: float = 2.0,
+                 max_delay_seconds: float = 10.0,
+                 max_batch_size: int = 256,
+                 poll_interval: float = 1.0):
+        """
+        변경 소스를 소비해 벡터 인덱스를 갱신하는 백그라운드 워커
+
+        같은 (테이블, ID)의 변경은 하나로 합치고(마지막 작업 우선), debounce_seconds 동안 추가 변경이 없거나
+        처음 변경 후 max_delay_seconds가 지나면 테이블별로 묶어 한 번에 다시 임베딩한다.
+
+        Args:
+            source: poll(timeout)/ack(events)를 제공하는 변경 소스
+            debounce_seconds: 마지막 변경 후 이 시간 동안 조용하면 처리
+            max_delay_seconds: 변경이 계속되어도 이 시간이 지나면 처리
+            max_batch_size: 대기 중인 변경이 이 수를 넘으면 즉시 처리
+            poll_interval: 소스 폴링 대기 시간 (초)
+        """
+        self.source = source
+        self.indexing_service = indexing_service
+        self.session_factory = session_factory
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.max_batch_size = max_batch_size
+        self.poll_interval = poll_interval
+
+        # (테이블, ID) -> {"op", "first_seen", "last_seen", "events"}
+        self._pending: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # 통계 카운터
+        self.received = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.indexed_rows = 0
+        self.deleted_rows = 0
+        self.chunks_skipped = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        """워커 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """대기 중인 변경을 처리한 뒤 워커 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.submit(self.source.poll(self.poll_interval))
+                self.flush()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"변경 동기화 중 오류 발생: {e}")
+                time.sleep(self.poll_interval)
+        # 종료 전 남은 변경 처리
+        self.flush(force=True)
+
+    def submit(self, events: List[Dict[str, Any]]) -> None:
+        """이벤트를 (테이블, ID)별로 합쳐 대기열에 추가 (소스 외에 API로 받은 변경도 여기로 넣음)"""
+        now = time.time()
+        with self._lock:
+            for event in events:
+                self.received += 1
+                key = (event["table"], event["row_id"])
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = {"op": event["op"], "first_seen": now, "last_seen": now, "events": [event]}
+                else:
+                    self.coalesced += 1
+                    entry["op"] = event["op"]
+                    entry["last_seen"] = now
+                    entry["events"].append(event)
+
+    def _take_ready(self, force: bool) -> Dict[Tuple[str, Any], Dict[str, Any]]:
+        """처리할 변경 꺼내기 (lock 보유 상태에서 호출)"""
+        now = time.time()
+        if force or len(self._pending) >= self.max_batch_size:
+            ready_keys = list(self._pending.keys())
+        else:
+            ready_keys = [
+                key for key, entry in self._pending.items()
+                if now - entry["last_seen"] >= self.debounce_seconds or now - entry["first_seen"] >= self.max_delay_seconds
+            ]
+        return {key: self._pending.pop(key) for key in ready_keys}
+
+    def flush(self, force: bool = False) -> Dict[str, int]:
+        """준비된 변경을 테이블별 마이크로 배치로 처리"""
+        with self._lock:
+            ready = self._take_ready(force)
+        counts = {"indexed": 0, "deleted": 0, "chunks_updated": 0, "chunks_skipped": 0, "chunks_deleted": 0}
+        if not ready:
+            return counts
+
+        # 테이블별로 upsert/delete ID 분류
+        by_table: Dict[str, Dict[str, List[Any]]] = {}
+        for (table, row_id), entry in ready.items():
+            by_table.setdefault(table, {"upsert": [], "delete": []})[entry["op"] if entry["op"] == "delete" else "upsert"].append(row_id)
+
+        db = self.session_factory()
+        try:
+            for table, ops in by_table.items():
+                if ops["upsert"]:
+                    result = self.indexing_service.index_rows(db, table, ops["upsert"])
+                    counts["indexed"] += result["indexed_rows"]
+                    counts["deleted"] += result["deleted_rows"]
+                    for key in ("chunks_updated", "chunks_skipped", "chunks_deleted"):
+                        counts[key] += result[key]
+                if ops["delete"]:
+                    self.indexing_service.vector_store.delete_rows(table, ops["delete"])
+                    counts["deleted"] += len(ops["delete"])
+        except Exception:
+            # 실패한 변경은 다시 대기열에 넣어 다음 주기에 재시도
+            with self._lock:
+                for key, entry in ready.items():
+                    self._pending.setdefault(key, entry)
+            raise
+        finally:
+            db.close()
+
+        self.source.ack([event for entry in ready.values() for event in entry["events"]])
+        with self._lock:
+            self.batches += 1
+            self.indexed_rows += counts["indexed"]
+            self.deleted_rows += counts["deleted"]
+            self.chunks_skipped += counts["chunks_skipped"]
+        print(f"Synced {len(ready)} changed rows ({counts['indexed']} indexed, {counts['deleted']} deleted, {counts['chunks_skipped']} unchanged chunks skipped)")
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        """통계 반환"""
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "pending": len(self._pending),
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "batches": self.batches,
+                "indexed_rows": self.indexed_rows,
+                "deleted_rows": self.deleted_rows,
+                "chunks_skipped": self.chunks_skipped,
+                "errors": self.errors
+            }
@@ -1,28 +1,78 @@
 # services/indexing/indexing_service.py
-from data.preprocessing.chunking import process_all_tables, fetch_data_from_table, extract_text_from_row, split_text_into_chunks
+from data.preprocessing.chunking import (
+    get_all_tables,
+    get_column_names,
+    get_watermark_columns,
+    stream_rows_from_table,
+    stream_column_values,
+    iter_row_chunks,
+    iter_table_rows,
+    iter_all_table_rows,
+    iter_chunk_batches
+)
+from services.indexing.watermark_store import WatermarkStore
+from services.indexing.pipeline import IndexingPipeline
 from data.embedding.embedding import EmbeddingService
-from vectordb.qdrant_store import QdrantVectorStore
+from vectordb.qdrant_store import QdrantVectorStore, content_hash, point_id_for
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import time
 
 class IndexingService:
-    def __init__(self, embedding_service: EmbeddingService, vector_store: QdrantVectorStore):
+    def __init__(self, embedding_service: EmbeddingService, vector_store: QdrantVectorStore, watermark_store: Optional[WatermarkStore] = None, reconcile_interval: int = 86400, pipeline_settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            watermark_store: 테이블별 증분 인덱싱 기준값 저장소
+            reconcile_interval: 증분 인덱싱 시 삭제된 행을 확인하는 주기 (초)
+            pipeline_settings: 대량 인덱싱 파이프라인의 단계별 작업자 수/큐 크기 (IndexingPipeline 인자)
+        """
         self.embedding_service = embedding_service
         self.vector_store = vector_store
+        self.watermark_store = watermark_store or WatermarkStore()
+        self.reconcile_interval = reconcile_interval
+        self.pipeline_settings = pipeline_settings or {}
+        # 실행 중이거나 마지막으로 실행한 파이프라인 (단계별 통계 조회용)
+        self.pipeline: Optional[IndexingPipeline] = None
+        # 다음 배치 임베딩과 이전 배치 업서트를 겹치기 위한 실행기
+        self.upsert_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-upsert")
     
-    def index_all_tables(self, db: Session, exclude_tables=None, batch_size: int = 100):
-        """모든 테이블 데이터 인덱싱"""
-        # 데이터 청크 분할
-        chunked_data = process_all_tables(db, exclude_tables, chunk_size=1000)
+    def _index_batches(self, batches: Iterable[List[Dict[str, Any]]], label: str = "", vector_store: Optional[QdrantVectorStore] = None, skip_unchanged: bool = False) -> Dict[str, Any]:
+        """
+        청크 배치를 임베딩하고 저장
         
-        # 배치 처리 (메모리 관리)
+        배치 i의 업서트를 백그라운드에서 진행하는 동안 배치 i+1의 임베딩을 계산한다.
+        batches는 지연 생성되는 이터레이터여도 되며, 동시에 메모리에 있는 배치는 최대 두 개다.
+        vector_store를 주면 서비스 중인 저장소 대신 그 저장소(섀도)에 기록한다.
+        청크 텍스트는 번역 전 원문이어야 한다. 모든 청크에 원문 해시(content_hash)를 저장하고,
+        skip_unchanged면 번역 전에 저장된 해시와 비교해 같은 청크는 번역/임베딩/업서트 없이 건너뛴다.
+        번역에 실패해 원문으로 임베딩한 청크는 해시를 비워 저장하므로 다음 실행에서 다시 처리된다.
+        """
+        vector_store = vector_store or self.vector_store
         total_indexed = 0
-        for i in range(0, len(chunked_data), batch_size):
-            batch = chunked_data[i:i+batch_size]
+        totals = {"chunks_skipped": 0, "chunks_deleted": 0}
+        pending = None
+        start_time = time.perf_counter()
+        
+        for batch_number, batch in enumerate(batches, 1):
+            for item in batch:
+                item['metadata']['content_hash'] = content_hash(item['text'])
+            if skip_unchanged:
+                batch, counts = self._changed_chunks(batch, vector_store)
+                totals["chunks_skipped"] += counts["skipped"]
+                totals["chunks_deleted"] += counts["deleted"]
+                if not batch:
+                    continue
             
-            # 임베딩 생성
+            # 임베딩 생성 (float32 연속 배열)
             texts = [item['text'] for item in batch]
-            embeddings = self.embedding_service.generate_embeddings(texts)
+            translated, failed = self.embedding_service.translation_service.translate_batch_to_target_checked(texts)
+            embeddings = self.embedding_service.generate_embeddings(translated, translate=False)
+            # 번역 실패로 원문을 임베딩한 청크는 해시를 비워 다음 실행에서 다시 처리
+            for item, item_failed in zip(batch, failed):
+                if item_failed:
+                    item['metadata']['content_hash'] = None
             
             # 메타데이터 추출 (텍스트도 포함)
             metadatas = []
@@ -31,55 +81,278 @@ class IndexingService:
                 metadata['text'] = texts[j]  # 원본 텍스트도 메타데이터에 저장
                 metadatas.append(metadata)
             
-            # 임베딩 및 메타데이터 저장
-            result = self.vector_store.add_embeddings(embeddings, metadatas)
-            total_indexed += result["inserted"]
+            # 이전 배치 업서트 완료 확인 후 현재 배치 업서트 시작
+            if pending is not None:
+                total_indexed += pending.result()["inserted"]
+            pending = self.upsert_executor.submit(vector_store.bulk_upsert, embeddings, metadatas)
+            
+            print(f"Indexed batch {batch_number}{label}, total vectors so far: {total_indexed}")
+        
+        if pending is not None:
+            total_indexed += pending.result()["inserted"]
+        
+        elapsed = time.perf_counter() - start_time
+        if skip_unchanged:
+            print(f"Skipped {totals['chunks_skipped']} unchanged chunks{label}, deleted {totals['chunks_deleted']} stale chunks")
+        return {
+            "total_indexed": total_indexed,
+            "chunks_updated": total_indexed,
+            **totals,
+            "elapsed": elapsed,
+            "points_per_second": total_indexed / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def _run_pipeline(self, rows: Iterable[Tuple[str, int, Any]], batch_size: int = 100, label: str = "", vector_store: Optional[QdrantVectorStore] = None, skip_unchanged: bool = False) -> Dict[str, Any]:
+        """
+        (테이블, 행 순번, 행) 스트림을 단계별 파이프라인으로 인덱싱 (대량 인덱싱용)
+        
+        번역/임베딩/업서트가 서로 겹쳐 진행되며, 반환값은 _index_batches와 같은 키에 단계별 통계(stages)가 더해진다.
+        """
+        vector_store = vector_store or self.vector_store
+        changed_filter = None
+        if skip_unchanged:
+            changed_filter = lambda batch: self._changed_chunks(batch, vector_store)
+        self.pipeline = IndexingPipeline(
+            self.embedding_service,
+            vector_store,
+            batch_size=batch_size,
+            changed_filter=changed_filter,
+            label=label,
+            **self.pipeline_settings
+        )
+        return self.pipeline.run(rows)
+    
+    def pipeline_stats(self) -> Optional[Dict[str, Any]]:
+        """실행 중이거나 마지막으로 실행한 파이프라인의 단계별 처리량과 큐 깊이"""
+        pipeline = self.pipeline
+        return pipeline.stats() if pipeline is not None else None
+    
+    def _changed_chunks(self, batch: List[Dict[str, Any]], vector_store: QdrantVectorStore) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        저장된 해시와 비교해 다시 임베딩할 청크만 골라냄
+        
+        결정적 포인트 ID로 기존 청크의 content_hash/total_chunks만 한 번에 조회한다.
+        해시가 같으면 건너뛰되 청크 수가 바뀌었으면 total_chunks 페이로드만 갱신하고,
+        행이 짧아졌는데 마지막 청크를 건너뛰는 경우에는 남은 이전 청크를 따로 삭제한다.
+        (마지막 청크를 업서트하는 행은 bulk_upsert가 함께 삭제한다.)
+        
+        Returns:
+            (바뀐 청크 목록, {"skipped", "deleted"})
+        """
+        ids = [point_id_for(item['metadata']) for item in batch]
+        existing = vector_store.retrieve_payloads(ids, payload_fields=["content_hash", "total_chunks"])
+        
+        changed = []
+        payload_updates = {}
+        trailing = []
+        deleted = 0
+        for point_id, item in zip(ids, batch):
+            metadata = item['metadata']
+            stored = existing.get(point_id)
+            is_changed = stored is None or stored.get("content_hash") != metadata['content_hash']
+            if is_changed:
+                changed.append(item)
+            elif stored.get("total_chunks") != metadata.get("total_chunks"):
+                payload_updates[point_id] = {"total_chunks": metadata.get("total_chunks")}
             
-            print(f"Indexed batch {i//batch_size + 1}, total vectors so far: {total_indexed}")
+            # 행의 마지막 청크: 이전 청크 수가 더 많았으면 그만큼 삭제됨
+            total_chunks = metadata.get("total_chunks")
+            if stored is not None and total_chunks is not None and metadata.get("chunk_index") == total_chunks - 1:
+                stale = (stored.get("total_chunks") or 0) - total_chunks
+                if stale > 0:
+                    deleted += stale
+                    if not is_changed:
+                        trailing.append(metadata)
         
-        return {"total_indexed": total_indexed, "total_vectors": self.vector_store.count()}
+        if payload_updates:
+            vector_store.update_payloads(payload_updates)
+        if trailing:
+            vector_store.delete_trailing_chunks(trailing)
+        return changed, {"skipped": len(batch) - len(changed), "deleted": deleted}
+    
+    def index_all_tables(self, db: Session, exclude_tables=None, batch_size: int = 100):
+        """모든 테이블 데이터 인덱싱"""
+        # 시작 전 기준값 기록 (인덱싱 중 변경된 행은 다음 증분 인덱싱에서 다시 처리됨)
+        marks = self._current_marks_all(db, exclude_tables)
+        
+        # 행 조회/청크 분할/번역/임베딩/업서트를 겹쳐 실행 (메모리 사용량은 단계 사이 큐 크기로 제한)
+        result = self._run_pipeline(iter_all_table_rows(db, exclude_tables), batch_size, skip_unchanged=True)
+        self._save_marks(marks)
+        
+        return {**result, "total_vectors": self.vector_store.count()}
+    
+    def rebuild_all_tables(self, db: Session, exclude_tables=None, batch_size: int = 100, keep_old: bool = False):
+        """
+        모든 테이블을 섀도 컬렉션에 새로 인덱싱한 뒤 별칭 교체 (무중단 재구축)
+        
+        재구축 중에도 검색은 기존 컬렉션을 그대로 사용하고, 포인트 수 검증 후 한 번에 전환된다.
+        """
+        marks = self._current_marks_all(db, exclude_tables)
+        shadow = self.vector_store.create_shadow()
+        try:
+            result = self._run_pipeline(iter_all_table_rows(db, exclude_tables), batch_size, vector_store=shadow)
+        except Exception:
+            self.vector_store.drop_shadow(shadow)
+            raise
+        
+        # 포인트 수 검증 후 별칭 교체 및 이전 컬렉션 정리
+        promoted = self.vector_store.promote_shadow(shadow, expected_count=result["total_indexed"], keep_old=keep_old)
+        self._save_marks(marks)
+        return {**result, **promoted}
     
     def index_table(self, db: Session, table_name: str, batch_size: int = 100):
         """특정 테이블만 인덱싱"""
-        rows = fetch_data_from_table(db, table_name)
-        chunked_data = []
+        marks = {table_name: self._current_marks(db, table_name, get_watermark_columns(db, table_name))}
         
-        for row_index, row in enumerate(rows):
-            row_text = extract_text_from_row(row)
-            row_id = row._mapping.get('id', row_index)
-            chunks = split_text_into_chunks(row_text)
-            
-            for i, chunk in enumerate(chunks):
-                chunked_data.append({
-                    'text': chunk,
-                    'metadata': {
-                        'table': table_name,
-                        'row_id': row_id,
-                        'chunk_index': i,
-                        'total_chunks': len(chunks)
-                    }
-                })
-        
-        # 배치 처리
-        total_indexed = 0
-        for i in range(0, len(chunked_data), batch_size):
-            batch = chunked_data[i:i+batch_size]
+        result = self._run_pipeline(iter_table_rows(db, table_name), batch_size, label=f" for table {table_name}", skip_unchanged=True)
+        self._save_marks(marks)
+        
+        return {"table": table_name, **result}
+    
+    def index_incremental(self, db: Session, exclude_tables=None, batch_size: int = 100, reconcile: Optional[bool] = None):
+        """
+        기준값 이후 변경된 행만 인덱싱 (테이블별 high-water mark)
+        
+        updated_at/created_at이 있으면 그 값이 기준값 이상인 행, 없으면 id가 기준값보다 큰 행만
+        인덱스를 타는 범위 조건으로 가져온다. 기준 컬럼이 없는 테이블은 전체를 다시 인덱싱한다.
+        결정적 포인트 ID로 업서트하므로 경계값의 행을 다시 처리해도 중복되지 않는다.
+        
+        Args:
+            reconcile: True면 삭제 확인 강제, False면 생략, None이면 reconcile_interval 주기에 따라 실행
+        """
+        if exclude_tables is None:
+            exclude_tables = []
+        
+        tables = {}
+        totals = {"total_indexed": 0, "total_deleted": 0, "chunks_skipped": 0, "chunks_deleted": 0}
+        for table in get_all_tables(db):
+            if table in exclude_tables:
+                continue
             
-            # 임베딩 생성
-            texts = [item['text'] for item in batch]
-            embeddings = self.embedding_service.generate_embeddings(texts)
+            columns = get_watermark_columns(db, table)
+            previous_marks = self.watermark_store.get_marks(table)
+            # 스트리밍 전에 새 기준값을 잡아 두어 처리 중 변경된 행을 놓치지 않음
+            current_marks = self._current_marks(db, table, columns)
+            where, params = self._incremental_condition(columns, previous_marks)
             
-            # 메타데이터 추출 (텍스트도 포함)
-            metadatas = []
-            for j, item in enumerate(batch):
-                metadata = item['metadata']
-                metadata['text'] = texts[j]
-                metadatas.append(metadata)
+            rows = iter_table_rows(db, table, where=where, params=params)
+            result = self._run_pipeline(rows, batch_size, label=f" for table {table}", skip_unchanged=True)
+            if columns:
+                self.watermark_store.set_marks(table, current_marks)
             
-            # 임베딩 및 메타데이터 저장
-            result = self.vector_store.add_embeddings(embeddings, metadatas)
-            total_indexed += result["inserted"]
+            # 삭제된 행 확인 (주기적)
+            deleted = 0
+            if reconcile or (reconcile is None and time.time() - self.watermark_store.get_reconciled_at(table) >= self.reconcile_interval):
+                deleted = self.reconcile_deletions(db, table)
             
-            print(f"Indexed batch {i//batch_size + 1} for table {table_name}, total vectors: {total_indexed}")
+            tables[table] = {
+                "mode": "incremental" if where else "full",
+                "columns": columns,
+                "indexed": result["total_indexed"],
+                "deleted": deleted,
+                "chunks_skipped": result["chunks_skipped"],
+                "chunks_deleted": result["chunks_deleted"]
+            }
+            totals["total_indexed"] += result["total_indexed"]
+            totals["total_deleted"] += deleted
+            totals["chunks_skipped"] += result["chunks_skipped"]
+            totals["chunks_deleted"] += result["chunks_deleted"]
+        
+        return {**totals, "tables": tables}
+    
+    def reconcile_deletions(self, db: Session, table: str) -> int:
+        """
+        DB의 id 집합과 인덱싱된 row_id 집합을 비교해 DB에서 사라진 행의 벡터 삭제
+        
+        Returns:
+            삭제한 행 수 (id 컬럼이 없는 테이블은 row_id가 순번이라 비교할 수 없으므로 0)
+        """
+        if "id" not in get_column_names(db, table):
+            return 0
+        
+        # 청크로 인덱싱한 행만 비교 (채팅 기록처럼 같은 table 값을 쓰는 다른 포인트는 get_row_ids에서 제외됨)
+        db_ids = set(stream_column_values(db, table, "id"))
+        stale_ids = {row_id for row_id in self.vector_store.get_row_ids(table) - db_ids if row_id is not None}
+        if stale_ids:
+            self.vector_store.delete_rows(table, sorted(stale_ids))
+            print(f"Deleted vectors of {len(stale_ids)} removed rows from table {table}")
+        self.watermark_store.set_reconciled_at(table, time.time())
+        return len(stale_ids)
+    
+    def index_chunks(self, chunked_data: List[Dict[str, Any]], label: str = "") -> Dict[str, Any]:
+        """이미 분할된 원문 청크 목록을 인덱싱 (바뀌지 않은 청크는 번역 없이 건너뜀)"""
+        return self._index_batches([chunked_data], label=label, skip_unchanged=True)
+    
+    def index_rows(self, db: Session, table: str, row_ids: List[Any], batch_size: int = 100) -> Dict[str, Any]:
+        """
+        지정한 id의 행만 다시 인덱싱 (변경 피드 동기화용)
+        
+        한 번의 ANY(:ids) 조회로 행을 가져오고, DB에 없는 id는 삭제된 것으로 보고 벡터를 지운다.
+        """
+        found_ids = set()
+        
+        def tracked_rows():
+            for row in stream_rows_from_table(db, table, where='"id" = ANY(:ids)', params={"ids": list(row_ids)}):
+                found_ids.add(row._mapping.get("id"))
+                yield row
+        
+        # 원문으로 분할해 해시를 비교하고, 바뀐 청크만 generate_embeddings에서 번역
+        batches = iter_chunk_batches(iter_row_chunks(table, tracked_rows(), translate=False), batch_size)
+        result = self._index_batches(batches, label=f" for table {table}", skip_unchanged=True)
+        
+        missing_ids = [row_id for row_id in row_ids if row_id not in found_ids]
+        if missing_ids:
+            self.vector_store.delete_rows(table, missing_ids)
+        
+        return {
+            "table": table,
+            "indexed_rows": len(found_ids),
+            "deleted_rows": len(missing_ids),
+            "total_indexed": result["total_indexed"],
+            "chunks_updated": result["chunks_updated"],
+            "chunks_skipped": result["chunks_skipped"],
+            "chunks_deleted": result["chunks_deleted"]
+        }
+    
+    def _current_marks(self, db: Session, table: str, columns: List[str]) -> Dict[str, Any]:
+        """기준 컬럼별 현재 최댓값 (인덱스를 사용하는 MAX 조회)"""
+        if not columns:
+            return {}
+        select = ", ".join(f'MAX("{column}") AS "{column}"' for column in columns)
+        row = db.execute(text(f'SELECT {select} FROM "{table}"')).fetchone()
+        return dict(row._mapping)
+    
+    def _current_marks_all(self, db: Session, exclude_tables=None) -> Dict[str, Dict[str, Any]]:
+        """모든 테이블의 현재 기준값"""
+        return {
+            table: self._current_marks(db, table, get_watermark_columns(db, table))
+            for table in get_all_tables(db)
+            if table not in (exclude_tables or [])
+        }
+    
+    def _save_marks(self, marks: Dict[str, Dict[str, Any]]) -> None:
+        for table, table_marks in marks.items():
+            if table_marks:
+                self.watermark_store.set_marks(table, table_marks)
+    
+    def _incremental_condition(self, columns: List[str], marks: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        기준값 이후 행을 고르는 WHERE 조건과 파라미터
+        
+        시각 컬럼은 같은 시각에 기록된 행을 놓치지 않도록 >=를 사용하고, 여러 개면 OR로 묶는다.
+        기준값이 없거나 기준 컬럼 구성이 바뀐 경우 (None, {})을 반환해 전체를 가져온다.
+        """
+        if not columns or any(column not in marks for column in columns):
+            return None, {}
         
-        return {"table": table_name, "total_indexed": total_indexed}
\ No newline at end of file
+        conditions = []
+        params = {}
+        for column in columns:
+            if marks[column] is None:
+                # 기준 시점에 값이 있던 행이 없었으므로 값이 생긴 행은 모두 새 변경
+                conditions.append(f'"{column}" IS NOT NULL')
+                continue
+            operator = ">" if column == "id" else ">="
+            conditions.append(f'"{column}" {operator} :{column}')
+            params[column] = marks[column]
+        return " OR ".join(conditions), params
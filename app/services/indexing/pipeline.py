@@ -0,0 +1,368 @@
+# services/indexing/pipeline.py
+import queue
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from data.preprocessing.chunking import row_chunks
+from data.embedding.embedding import EmbeddingService
+from vectordb.qdrant_store import QdrantVectorStore, content_hash
+
+# 단계 종료 표시 (상위 단계 작업자가 모두 끝나면 하위 단계 작업자 수만큼 넣음)
+_DONE = object()
+
+class PipelineAborted(Exception):
+    """다른 단계의 오류로 파이프라인이 중단됨"""
+    pass
+
+class PipelineStage:
+    def __init__(self, name: str, workers: int, queue_size: int):
+        """
+        파이프라인 단계 하나의 입력 큐와 처리 통계
+
+        Args:
+            name: 단계 이름 (통계 키)
+            workers: 작업자 스레드 수
+            queue_size: 입력 큐 최대 크기 (가득 차면 상위 단계가 대기 = 역압, 0이면 입력 큐 없음)
+        """
+        self.name = name
+        self.workers = workers
+        self.queue: Optional["queue.Queue[Any]"] = queue.Queue(maxsize=queue_size) if queue_size > 0 else None
+        self._lock = threading.Lock()
+        self._finished_workers = 0
+
+        # 통계 카운터
+        self.processed = 0
+        self.emitted = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def record(self, processed: int, emitted: int, busy: float) -> None:
+        with self._lock:
+            self.processed += processed
+            self.emitted += emitted
+            self.busy_seconds += busy
+
+    def record_wait(self, seconds: float) -> None:
+        """하위 단계 큐가 가득 차서 기다린 시간 (역압)"""
+        with self._lock:
+            self.wait_seconds += seconds
+
+    def observe_depth(self) -> None:
+        depth = self.queue.qsize()
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def worker_finished(self) -> bool:
+        """작업자 종료 기록, 마지막 작업자면 True"""
+        with self._lock:
+            self._finished_workers += 1
+            return self._finished_workers == self.workers
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "emitted": self.emitted,
+                "items_per_second": self.processed / elapsed if elapsed > 0 else 0.0,
+                "busy_seconds": self.busy_seconds,
+                "utilization": self.busy_seconds / (elapsed * self.workers) if elapsed > 0 else 0.0,
+                "backpressure_seconds": self.wait_seconds,
+                "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+                "queue_capacity": self.queue.maxsize if self.queue is not None else 0,
+                "max_queue_depth": self.max_queue_depth
+            }
+
+class IndexingPipeline:
+    def __init__(self,
+                 embedding_service: EmbeddingService,
+                 vector_store: QdrantVectorStore,
+                 batch_size: int = 100,
+                 chunk_size: int = 1000,
+                 chunk_overlap: int = 200,
+                 chunk_workers: int = 1,
+                 translate_workers: int = 4,
+                 upsert_workers: int = 2,
+                 queue_size: int = 4,
+                 max_encode_batch: int = 256,
+                 translate: bool = True,
+                 changed_filter: Optional[Callable[[List[Dict[str, Any]]], Tuple[List[Dict[str, Any]], Dict[str, int]]]] = None,
+                 label: str = ""):
+        """
+        fetch → chunk → translate → embed → upsert 단계를 제한된 큐로 연결한 인덱싱 파이프라인
+
+        네트워크를 기다리는 번역/업서트는 여러 스레드로, CPU를 쓰는 인코딩은 한 스레드로 처리해
+        번역·인코딩·업서트가 서로 겹쳐 진행된다. 큐가 가득 차면 상위 단계가 기다리므로
+        DB 조회 속도는 가장 느린 단계에 맞춰지고 메모리 사용량은 큐 크기로 제한된다.
+        fetch는 DB 세션을 공유할 수 없으므로 run()을 호출한 스레드에서 실행한다.
+
+        Args:
+            batch_size: chunk 단계가 묶는 청크 배치 크기
+            chunk_workers: 청크 분할 스레드 수
+            translate_workers: 번역(및 변경 확인) 스레드 수
+            upsert_workers: 업서트 스레드 수
+            queue_size: 단계 사이 큐에 쌓을 수 있는 배치 수 (행 큐는 queue_size * batch_size행)
+            max_encode_batch: 인코딩 작업자가 대기 중인 배치를 모아 한 번에 인코딩할 최대 텍스트 수
+            translate: False면 번역 없이 원문을 인코딩
+            changed_filter: 번역 전에 배치에서 바뀐 청크만 골라내는 함수 (배치 -> (배치, {"skipped", "deleted"}))
+        """
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_encode_batch = max_encode_batch
+        self.translate = translate
+        self.changed_filter = changed_filter
+        self.label = label
+
+        # 각 단계의 입력 큐 (fetch는 호출 스레드에서 chunk 큐로 넣음)
+        self.stages = {
+            "fetch": PipelineStage("fetch", 1, 0),
+            "chunk": PipelineStage("chunk", max(1, chunk_workers), max(1, queue_size * batch_size)),
+            "translate": PipelineStage("translate", max(1, translate_workers), max(1, queue_size)),
+            "embed": PipelineStage("embed", 1, max(1, queue_size)),
+            "upsert": PipelineStage("upsert", max(1, upsert_workers), max(1, queue_size))
+        }
+
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+        self.total_indexed = 0
+        self.chunks_skipped = 0
+        self.chunks_deleted = 0
+
+    def _fail(self, error: BaseException) -> None:
+        """첫 오류를 기록하고 모든 단계를 중단"""
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._abort.set()
+
+    def _put(self, source: PipelineStage, target: PipelineStage, item: Any) -> None:
+        """하위 단계 큐에 넣기 (가득 차면 대기, 중단되면 예외)"""
+        start = time.perf_counter()
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            try:
+                target.queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        source.record_wait(time.perf_counter() - start)
+        target.observe_depth()
+
+    def _get(self, stage: PipelineStage, block: bool = True) -> Any:
+        """단계 입력 큐에서 꺼내기 (block=False면 비어 있을 때 None)"""
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            try:
+                return stage.queue.get(timeout=0.1) if block else stage.queue.get_nowait()
+            except queue.Empty:
+                if not block:
+                    return None
+
+    def _finish(self, stage: PipelineStage, downstream: Optional[PipelineStage]) -> None:
+        """작업자 종료 처리 (단계의 마지막 작업자면 하위 단계에 종료 표시 전달)"""
+        if stage.worker_finished() and downstream is not None:
+            for _ in range(downstream.workers):
+                self._put(stage, downstream, _DONE)
+
+    def _run_worker(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _chunk_worker(self) -> None:
+        """행을 청크로 분할하고 원문 해시를 붙여 batch_size개씩 묶음"""
+        stage, downstream = self.stages["chunk"], self.stages["translate"]
+        batch: List[Dict[str, Any]] = []
+        while True:
+            item = self._get(stage)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            table, row_index, row = item
+            # 번역하지 않은 원문으로 분할/해시 (번역은 translate 단계의 여러 작업자가 배치로 처리)
+            chunks = row_chunks(table, row, row_index, self.chunk_size, self.chunk_overlap, translate=False)
+            for chunk in chunks:
+                chunk['metadata']['content_hash'] = content_hash(chunk['text'])
+            batch.extend(chunks)
+            stage.record(1, 0, time.perf_counter() - start)
+            while len(batch) >= self.batch_size:
+                self._put(stage, downstream, batch[:self.batch_size])
+                stage.record(0, 1, 0.0)
+                batch = batch[self.batch_size:]
+        if batch:
+            self._put(stage, downstream, batch)
+            stage.record(0, 1, 0.0)
+        self._finish(stage, downstream)
+
+    def _translate_worker(self) -> None:
+        """바뀐 청크만 남기고 번역 (네트워크 대기이므로 여러 스레드)"""
+        stage, downstream = self.stages["translate"], self.stages["embed"]
+        while True:
+            batch = self._get(stage)
+            if batch is _DONE:
+                break
+            start = time.perf_counter()
+            if self.changed_filter is not None:
+                batch, counts = self.changed_filter(batch)
+                with self._counts_lock:
+                    self.chunks_skipped += counts["skipped"]
+                    self.chunks_deleted += counts["deleted"]
+            texts = [item['text'] for item in batch]
+            if self.translate and texts:
+                texts, failed = self.embedding_service.translation_service.translate_batch_to_target_checked(texts)
+                # 번역 실패로 원문을 임베딩하는 청크는 해시를 비워 다음 실행에서 다시 처리
+                for item, item_failed in zip(batch, failed):
+                    if item_failed:
+                        item['metadata']['content_hash'] = None
+            stage.record(1, 1 if batch else 0, time.perf_counter() - start)
+            if batch:
+                self._put(stage, downstream, (batch, texts))
+        self._finish(stage, downstream)
+
+    def _embed_worker(self) -> None:
+        """
+        대기 중인 배치를 max_encode_batch개 텍스트까지 모아 한 번에 인코딩 (단일 스레드)
+
+        인코딩이 느려 배치가 쌓일수록 한 번에 더 많이 인코딩하므로 호출당 오버헤드가 줄어든다.
+        """
+        stage, downstream = self.stages["embed"], self.stages["upsert"]
+        done = False
+        while not done:
+            item = self._get(stage)
+            if item is _DONE:
+                break
+            pending = [item]
+            total_texts = len(item[1])
+            while total_texts < self.max_encode_batch:
+                item = self._get(stage, block=False)
+                if item is None:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                pending.append(item)
+                total_texts += len(item[1])
+
+            start = time.perf_counter()
+            embeddings = self.embedding_service.encode([text for _, texts in pending for text in texts])
+            stage.record(len(pending), len(pending), time.perf_counter() - start)
+
+            offset = 0
+            for batch, _ in pending:
+                metadatas = []
+                for item in batch:
+                    metadata = item['metadata']
+                    metadata['text'] = item['text']  # 원본 텍스트도 메타데이터에 저장
+                    metadatas.append(metadata)
+                self._put(stage, downstream, (np.ascontiguousarray(embeddings[offset:offset + len(batch)]), metadatas))
+                offset += len(batch)
+        self._finish(stage, downstream)
+
+    def _upsert_worker(self) -> None:
+        """벡터 저장소 업서트 (네트워크 대기이므로 여러 스레드)"""
+        stage = self.stages["upsert"]
+        while True:
+            item = self._get(stage)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            embeddings, metadatas = item
+            inserted = self.vector_store.bulk_upsert(embeddings, metadatas)["inserted"]
+            stage.record(1, 1, time.perf_counter() - start)
+            with self._counts_lock:
+                self.total_indexed += inserted
+                total = self.total_indexed
+            print(f"Indexed batch{self.label}, total vectors so far: {total}")
+        self._finish(stage, None)
+
+    def run(self, rows: Iterable[Tuple[str, int, Any]]) -> Dict[str, Any]:
+        """
+        (테이블, 행 순번, 행) 이터레이터를 끝까지 인덱싱
+
+        Returns:
+            total_indexed, chunks_updated, chunks_skipped, chunks_deleted, rows, elapsed,
+            points_per_second, stages(단계별 처리량/큐 깊이)
+        """
+        workers = {
+            "chunk": self._chunk_worker,
+            "translate": self._translate_worker,
+            "embed": self._embed_worker,
+            "upsert": self._upsert_worker
+        }
+        threads = []
+        for name, target in workers.items():
+            for i in range(self.stages[name].workers):
+                thread = threading.Thread(target=self._run_worker, args=(target,), name=f"index-{name}-{i}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # fetch: 호출 스레드에서 DB 커서를 읽어 chunk 큐로 전달
+        self._start_time = time.perf_counter()
+        fetch, chunk = self.stages["fetch"], self.stages["chunk"]
+        iterator = iter(rows)
+        try:
+            while True:
+                start = time.perf_counter()
+                row = next(iterator, _DONE)
+                if row is _DONE:
+                    break
+                fetch.record(1, 1, time.perf_counter() - start)
+                self._put(fetch, chunk, row)
+            self._finish(fetch, chunk)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # 중단된 경우에도 서버 측 커서를 닫음
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+        for thread in threads:
+            thread.join()
+        self._end_time = time.perf_counter()
+
+        if self._error is not None:
+            raise self._error
+
+        stats = self.stats()
+        print(f"Pipeline indexed {self.total_indexed} vectors{self.label} "
+              f"({stats['elapsed']:.2f}s, {stats['points_per_second']:.0f} points/s)")
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """단계별 처리량과 큐 깊이 (실행 중에도 조회 가능)"""
+        if self._start_time is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._end_time or time.perf_counter()) - self._start_time
+        with self._counts_lock:
+            total_indexed = self.total_indexed
+            chunks_skipped = self.chunks_skipped
+            chunks_deleted = self.chunks_deleted
+        return {
+            "running": self._start_time is not None and self._end_time is None,
+            "total_indexed": total_indexed,
+            "chunks_updated": total_indexed,
+            "chunks_skipped": chunks_skipped,
+            "chunks_deleted": chunks_deleted,
+            "rows": self.stages["fetch"].processed,
+            "elapsed": elapsed,
+            "points_per_second": total_indexed / elapsed if elapsed > 0 else 0.0,
+            "stages": {name: stage.stats(elapsed) for name, stage in self.stages.items()}
+        }
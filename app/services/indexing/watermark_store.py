@@ -0,0 +1,93 @@
+# services/indexing/watermark_store.py
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+def _encode_value(value: Any) -> Any:
+    """날짜/시각 값은 타입을 보존하도록 표시해서 저장"""
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+    return value
+
+class WatermarkStore:
+    def __init__(self, path: str = ".cache/index_watermarks.json"):
+        """
+        테이블별 증분 인덱싱 기준값(high-water mark)을 JSON 파일에 저장
+
+        테이블마다 {"marks": {컬럼: 최대값}, "reconciled_at": 마지막 삭제 확인 시각}을 기록한다.
+
+        Args:
+            path: 저장 파일 경로
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """파일 지연 로딩 (lock 보유 상태에서 호출)"""
+        if self._state is None:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            else:
+                self._state = {}
+        return self._state
+
+    def _save(self) -> None:
+        """임시 파일에 쓴 뒤 교체 (lock 보유 상태에서 호출)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def get_marks(self, table: str) -> Dict[str, Any]:
+        """테이블의 컬럼별 기준값 (없으면 빈 딕셔너리)"""
+        with self._lock:
+            marks = self._load().get(table, {}).get("marks", {})
+            return {column: _decode_value(value) for column, value in marks.items()}
+
+    def set_marks(self, table: str, marks: Dict[str, Any]) -> None:
+        """테이블의 컬럼별 기준값 저장"""
+        with self._lock:
+            entry = self._load().setdefault(table, {})
+            entry["marks"] = {column: _encode_value(value) for column, value in marks.items()}
+            self._save()
+
+    def get_reconciled_at(self, table: str) -> float:
+        """마지막 삭제 확인 시각 (없으면 0)"""
+        with self._lock:
+            return self._load().get(table, {}).get("reconciled_at", 0.0)
+
+    def set_reconciled_at(self, table: str, timestamp: float) -> None:
+        with self._lock:
+            self._load().setdefault(table, {})["reconciled_at"] = timestamp
+            self._save()
+
+    def clear(self, table: Optional[str] = None) -> None:
+        """기준값 삭제 (table이 없으면 전체)"""
+        with self._lock:
+            state = self._load()
+            if table is None:
+                state.clear()
+            else:
+                state.pop(table, None)
+            self._save()
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """전체 상태 반환 (확인용)"""
+        with self._lock:
+            return json.loads(json.dumps(self._load()))
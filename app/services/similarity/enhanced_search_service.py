@@ -38,43 +38,45 @@ class EnhancedSearchService(SearchService):
         """
         특정 기준에 따라 검색 수행
         
+        기준은 후보를 걸러내지 않고 순위만 높인다. 필터 없는 벡터 검색 한 번으로 여유분(candidate_factor배)을
+        가져온 뒤, 파이썬에서 최신성/출처/사용자 점수를 섞어 최종 점수를 한 번만 다시 계산한다.
+        
         Args:
             query: 검색 쿼리
             top_k: 반환할 최대 결과 수
             use_cache: 캐시 사용 여부
-            criteria: 검색 기준 (recency, source_priority, user_relevance 등)
+            criteria: 검색 기준 (recency, recency_days, date_field, source_priority, user_relevance,
+                      candidate_factor 등)
             
         Returns:
             검색 결과 및 메타데이터
         """
-        # 기본 검색 결과 가져오기
-        base_results = self.search(query, top_k, use_cache)
-        
-        # 기준이 없으면 기본 결과 반환
+        # 기준이 없으면 기본 검색 결과 반환
         if not criteria:
-            return base_results
-            
-        # 검색 결과 리스트
+            return self.search(query, top_k, use_cache)
+        
+        # 재계산 후 순위가 바뀔 여유분을 포함해 후보를 한 번에 가져옴
+        candidate_factor = max(1, int(criteria.get('candidate_factor', 3)))
+        base_results = self.search(query, top_k * candidate_factor, use_cache, user_id=criteria.get('user_id'))
         results = base_results.get('results', [])
         
         # 결과가 없으면 기본 결과 반환
         if not results:
             return base_results
-            
-        # 기준에 따라 결과 재정렬
-        sorted_results = self._apply_sorting_criteria(results, criteria)
         
-        # 결과 업데이트
-        base_results['results'] = sorted_results
-        base_results['applied_criteria'] = criteria
+        # 기준에 따라 최종 점수를 한 번에 계산하고 정렬
+        sorted_results = self._rescore_with_criteria(results, criteria)
         
-        return base_results
+        # 결과 업데이트 (캐시에 저장된 결과 딕셔너리는 수정하지 않음)
+        return {**base_results, 'results': sorted_results[:top_k], 'applied_criteria': criteria}
     
-    def _apply_sorting_criteria(self, 
-                              results: List[Dict[str, Any]], 
-                              criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _rescore_with_criteria(self, 
+                               results: List[Dict[str, Any]], 
+                               criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
-        특정 기준에 따라 결과 정렬
+        최신성, 출처 우선순위, 사용자 관련성을 한 번의 순회로 반영해 최종 점수 계산 후 정렬
+        
+        결과는 캐시된 검색 결과와 공유될 수 있으므로 각 항목을 복사해 점수를 기록하고 새 리스트로 정렬한다.
         
         Args:
             results: 검색 결과 리스트
@@ -83,120 +85,80 @@ class EnhancedSearchService(SearchService):
         Returns:
             정렬된 결과 리스트
         """
-        # 결과 복사본 생성
-        sorted_results = results.copy()
-        
-        # 1. 최신성 기준 정렬
-        if criteria.get('recency'):
-            weight = criteria.get('recency_weight', 1.0)
-            date_field = criteria.get('date_field', 'created_at')
-            sorted_results = self._sort_by_recency(sorted_results, weight, date_field)
-            
-        # 2. 출처 우선순위 기준 정렬
-        if criteria.get('source_priority'):
-            weight = criteria.get('source_weight', 1.0)
-            priority_sources = criteria.get('priority_sources', [])
-            sorted_results = self._sort_by_source_priority(sorted_results, weight, priority_sources)
-            
-        # 3. 사용자 관련성 기준 정렬
-        if criteria.get('user_relevance'):
-            weight = criteria.get('user_weight', 1.0)
-            user_id = criteria.get('user_id')
-            sorted_results = self._sort_by_user_relevance(sorted_results, weight, user_id)
-            
-        return sorted_results
-        
-    def _sort_by_recency(self, 
-                       results: List[Dict[str, Any]],
-                       weight: float,
-                       date_field: str) -> List[Dict[str, Any]]:
-        """
-        최신성에 따라 결과 정렬
-        """
-        # 현재 날짜/시간
         now = datetime.datetime.now()
+        recency_weight = criteria.get('recency_weight', 1.0)
+        date_field = criteria.get('date_field', 'created_at')
+        recency_days = criteria.get('recency_days', 30)
+        source_weight = criteria.get('source_weight', 1.0)
+        priority_sources = criteria.get('priority_sources', [])
+        user_weight = criteria.get('user_weight', 1.0)
+        user_id = criteria.get('user_id')
         
-        # 각 결과에 최신성 점수 추가
+        rescored = []
         for result in results:
+            result = dict(result)
+            rescored.append(result)
             metadata = result.get('metadata', {})
-            date_str = metadata.get(date_field)
+            score = result.get('ranking_score', result.get('score', 0))
             
-            # 날짜 정보가 있는 경우 최신성 점수 계산
-            recency_score = 0.0
-            if date_str:
-                try:
-                    # 날짜 문자열 파싱 (ISO 형식 가정)
-                    date_obj = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    
-                    # 최신성 점수 계산 (최대 30일 기준)
-                    days_diff = (now - date_obj).days
-                    if days_diff <= 0:
-                        recency_score = 1.0
-                    elif days_diff <= 30:
-                        recency_score = 1.0 - (days_diff / 30)
-                    else:
-                        recency_score = 0.0
-                except ValueError:
-                    pass
+            # 1. 최신성 점수 결합
+            if criteria.get('recency'):
+                recency_score = self._recency_score(metadata, date_field, now, recency_days)
+                score = score * (1.0 - recency_weight) + recency_score * recency_weight
+                result['recency_score'] = recency_score
             
-            # 기존 점수와 최신성 점수 결합
-            original_score = result.get('ranking_score', result.get('score', 0))
-            result['ranking_score'] = original_score * (1.0 - weight) + recency_score * weight
-            result['recency_score'] = recency_score
-        
-        # 최종 점수로 정렬
-        results.sort(key=lambda x: x.get('ranking_score', 0), reverse=True)
-        return results
+            # 2. 출처 우선순위 점수 결합
+            if criteria.get('source_priority'):
+                source_score = self._source_score(metadata, priority_sources)
+                score = score * (1.0 - source_weight) + source_score * source_weight
+                result['source_score'] = source_score
+            
+            # 3. 사용자 관련성 점수 결합
+            if criteria.get('user_relevance') and user_id:
+                user_score = 1.0 if str(metadata.get('user_id')) == str(user_id) else 0.2
+                score = score * (1.0 - user_weight) + user_score * user_weight
+                result['user_score'] = user_score
+            
+            result['ranking_score'] = score
         
-    def _sort_by_source_priority(self, 
-                              results: List[Dict[str, Any]],
-                              weight: float,
-                              priority_sources: List[str]) -> List[Dict[str, Any]]:
+        # 최종 점수로 한 번만 정렬
+        return sorted(rescored, key=lambda x: x.get('ranking_score', 0), reverse=True)
+    
+    def _recency_score(self, 
+                       metadata: Dict[str, Any], 
+                       date_field: str, 
+                       now: datetime.datetime,
+                       recency_days: float = 30) -> float:
         """
-        출처 우선순위에 따라 결과 정렬
+        최신성 점수 계산 (recency_days일에 걸쳐 선형 감소, date_field가 없으면 timestamp 사용)
         """
-        # 각 결과에 출처 우선순위 점수 추가
-        for result in results:
-            metadata = result.get('metadata', {})
-            table = metadata.get('table', '')
-            
-            # 우선순위 점수 계산
-            source_score = 0.0
-            if table in priority_sources:
-                source_score = 1.0 - (priority_sources.index(table) / len(priority_sources))
-            
-            # 기존 점수와 출처 점수 결합
-            original_score = result.get('ranking_score', result.get('score', 0))
-            result['ranking_score'] = original_score * (1.0 - weight) + source_score * weight
-            result['source_score'] = source_score
+        date_value = metadata.get(date_field, metadata.get('timestamp'))
+        if not date_value:
+            return 0.0
         
-        # 최종 점수로 정렬
-        results.sort(key=lambda x: x.get('ranking_score', 0), reverse=True)
-        return results
+        try:
+            if isinstance(date_value, (int, float)):
+                date_obj = datetime.datetime.fromtimestamp(date_value)
+            else:
+                # 날짜 문자열 파싱 (ISO 형식 가정)
+                date_obj = datetime.datetime.fromisoformat(str(date_value).replace('Z', '+00:00'))
+                if date_obj.tzinfo is not None:
+                    date_obj = date_obj.astimezone().replace(tzinfo=None)
+        except (ValueError, OverflowError, OSError):
+            return 0.0
         
-    def _sort_by_user_relevance(self, 
-                             results: List[Dict[str, Any]],
-                             weight: float,
-                             user_id: Optional[int]) -> List[Dict[str, Any]]:
+        days_diff = (now - date_obj).days
+        if days_diff <= 0:
+            return 1.0
+        elif days_diff <= recency_days:
+            return 1.0 - (days_diff / recency_days)
+        return 0.0
+    
+    def _source_score(self, metadata: Dict[str, Any], priority_sources: List[str]) -> float:
         """
-        사용자 관련성에 따라 결과 정렬
+        출처 우선순위 점수 계산
         """
-        if not user_id:
-            return results
-            
-        # 각 결과에 사용자 관련성 점수 추가
-        for result in results:
-            metadata = result.get('metadata', {})
-            result_user_id = metadata.get('user_id')
-            
-            # 사용자 관련성 점수 계산
-            user_score = 1.0 if str(result_user_id) == str(user_id) else 0.2
-            
-            # 기존 점수와 사용자 관련성 점수 결합
-            original_score = result.get('ranking_score', result.get('score', 0))
-            result['ranking_score'] = original_score * (1.0 - weight) + user_score * weight
-            result['user_score'] = user_score
-        
-        # 최종 점수로 정렬
-        results.sort(key=lambda x: x.get('ranking_score', 0), reverse=True)
-        return results
\ No newline at end of file
+        table = metadata.get('table', '')
+        if table in priority_sources:
+            return 1.0 - (priority_sources.index(table) / len(priority_sources))
+        return 0.0
@@ -2,9 +2,17 @@ from vectordb.qdrant_store import QdrantVectorStore
 from data.embedding.embedding import EmbeddingService
 from postprocessing.threshold.threshold_filter import ThresholdFilter
 from cache.query_cache import QueryCache
+from cache.semantic_cache import SemanticQueryCache
 from postprocessing.ranking.ranking import RankingProcessor
 from utils.translation_utils import TranslationService
+from utils.async_utils import run_sync
+from utils.single_flight import SingleFlight
+from cache.embedding_cache import normalize_text
 from typing import List, Dict, Any, Optional
+import json
+
+# 1차 검색(점수 계산/랭킹)에 필요한 최소 페이로드 필드
+RANKING_PAYLOAD_FIELDS = ["table", "row_id", "user_id", "created_at", "updated_at", "timestamp"]
 
 class SearchService:
     def __init__(
@@ -15,12 +23,20 @@ class SearchService:
         query_cache: Optional[QueryCache] = None,
         ranking_processor: Optional[RankingProcessor] = None,
         cache_enabled: bool = True,
-        translation_enabled: bool = True
+        translation_enabled: bool = True,
+        semantic_cache: Optional[SemanticQueryCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        lazy_payload: bool = True
     ):
         self.vector_store = vector_store
         self.embedding_service = embedding_service
         self.threshold_filter = threshold_filter or ThresholdFilter()
         self.query_cache = query_cache
+        self.semantic_cache = semantic_cache
+        # 동일한 질문의 동시 검색을 하나로 합치는 single-flight 그룹
+        self.single_flight = single_flight or SingleFlight()
+        # 랭킹은 최소 페이로드로 수행하고 최종 top_k만 전체 페이로드 조회
+        self.lazy_payload = lazy_payload
         self.ranking_processor = ranking_processor or RankingProcessor()
         self.cache_enabled = cache_enabled
         self.translation_enabled = translation_enabled
@@ -29,14 +45,62 @@ class SearchService:
         if self.translation_enabled:
             self.translation_service = TranslationService(source_lang="ko", target_lang="en")
     
-    def search(self, query: str, top_k: int = 5, use_cache: bool = True) -> Dict[str, Any]:
+    def search(self, query: str, top_k: int = 5, use_cache: bool = True, user_id: Optional[int] = None, threshold: Optional[float] = None, filters: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        사용자 질문에 대한 유사도 검색 수행 (search_async의 동기 래퍼)
+        
+        Args:
+            query (str): 사용자 질문
+            top_k (int): 반환할 최대 결과 수
+            use_cache (bool): 캐시 사용 여부
+            user_id (int): 시맨틱 캐시 범위로 사용할 사용자 ID (선택 사항)
+            threshold (float): 요청별 유사도 임계값 (없으면 기본값)
+            filters (Dict): 페이로드 조건 (예: {"user_id": 3, "table": ["schedule"]}), 벡터 검색 중에 적용
+            search_params (Dict): 벡터 검색 파라미터 (hnsw_ef, exact, indexed_only), 없으면 저장소 기본값
+            
+        Returns:
+            Dict: 검색 결과 및 메타데이터
+        """
+        return run_sync(self.search_async(query, top_k, use_cache, user_id=user_id, threshold=threshold, filters=filters, search_params=search_params))
+    
+    async def search_async(self, query: str, top_k: int = 5, use_cache: bool = True, user_id: Optional[int] = None, threshold: Optional[float] = None, filters: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        사용자 질문에 대한 유사도 검색 수행
+        사용자 질문에 대한 유사도 검색 수행 (번역/인코딩/벡터 검색 중 이벤트 루프를 막지 않음)
+        
+        같은 사용자 범위에서 정규화한 질문이 같은 검색이 이미 진행 중이면
+        새로 계산하지 않고 그 결과를 함께 받는다.
         
         Args:
             query (str): 사용자 질문
             top_k (int): 반환할 최대 결과 수
             use_cache (bool): 캐시 사용 여부
+            user_id (int): 시맨틱 캐시 범위로 사용할 사용자 ID (선택 사항)
+            threshold (float): 요청별 유사도 임계값 (없으면 기본값)
+            filters (Dict): 페이로드 조건 (예: {"user_id": 3, "table": ["schedule"]}), 벡터 검색 중에 적용
+            search_params (Dict): 벡터 검색 파라미터 (hnsw_ef, exact, indexed_only), 없으면 저장소 기본값
+            
+        Returns:
+            Dict: 검색 결과 및 메타데이터
+        """
+        scope = "global" if user_id is None else str(user_id)
+        flight_key = f"{scope}\x1f{top_k}\x1f{use_cache}\x1f{self._cache_key(normalize_text(query), self._resolve_threshold(threshold), filters, search_params)}"
+        return await self.single_flight.do_async(
+            flight_key,
+            lambda: self._search_async(query, top_k, use_cache, user_id, threshold, filters, search_params)
+        )
+    
+    async def _search_async(self, query: str, top_k: int = 5, use_cache: bool = True, user_id: Optional[int] = None, threshold: Optional[float] = None, filters: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        유사도 검색 실제 수행 (single-flight 리더만 호출)
+        
+        Args:
+            query (str): 사용자 질문
+            top_k (int): 반환할 최대 결과 수
+            use_cache (bool): 캐시 사용 여부
+            user_id (int): 시맨틱 캐시 범위로 사용할 사용자 ID (선택 사항)
+            threshold (float): 요청별 유사도 임계값 (없으면 기본값)
+            filters (Dict): 페이로드 조건 (예: {"user_id": 3, "table": ["schedule"]}), 벡터 검색 중에 적용
+            search_params (Dict): 벡터 검색 파라미터 (hnsw_ef, exact, indexed_only), 없으면 저장소 기본값
             
         Returns:
             Dict: 검색 결과 및 메타데이터
@@ -44,9 +108,13 @@ class SearchService:
         # 원본 쿼리 저장
         original_query = query
         
+        # 요청별 임계값 (공유 ThresholdFilter를 변경하지 않음)
+        score_threshold = self._resolve_threshold(threshold)
+        cache_key = self._cache_key(query, score_threshold, filters, search_params)
+        
         # 1. 캐시 확인 (옵션)
         if self.cache_enabled and use_cache and self.query_cache:
-            cached_results = self.query_cache.get(query)
+            cached_results = self.query_cache.get(cache_key)
             if cached_results:
                 return {
                     "status": "success", 
@@ -58,34 +126,56 @@ class SearchService:
         
         # 2. 질문 번역 (옵션)
         if self.translation_enabled:
-            query = self.translation_service.translate_to_target(query)
+            query = await self.translation_service.translate_to_target_async(query)
             print(f"Translated query: {query}")
         
-        # 3. 질문 임베딩 생성
-        query_embedding = self.embedding_service.generate_embeddings([query], translate=False)[0]
+        # 3. 질문 임베딩 생성 (전용 실행기에서 인코딩)
+        query_embedding = (await self.embedding_service.encode_async([query]))[0]
         
-        # 4. 벡터 검색 수행
-        raw_results = self.vector_store.search(query_embedding, top_k * 2)
+        # 3-1. 시맨틱 캐시 확인 (유사한 표현의 질문 재사용, 옵션)
+        use_semantic_cache = (
+            self.cache_enabled and use_cache and self.semantic_cache is not None
+            and score_threshold == self.threshold_filter.threshold
+            and not filters
+            and not search_params
+        )
+        if use_semantic_cache:
+            semantic_hit = self.semantic_cache.get(query_embedding, user_id=user_id, top_k=top_k)
+            if semantic_hit:
+                return {
+                    "status": "success",
+                    "query": original_query,
+                    "results": semantic_hit["results"][:top_k],
+                    "source": "semantic_cache",
+                    "matched_query": semantic_hit["query"],
+                    "similarity": semantic_hit["similarity"],
+                    "filtered": True
+                }
         
-        # 5. 임계값 기반 필터링
-        filtered_results = self.threshold_filter.filter_results(raw_results)
+        # 4. 벡터 검색 수행 (임계값 미만 점수는 Qdrant에서 제외)
+        raw_results = await self.vector_store.search_async(
+            query_embedding,
+            top_k * 2,
+            score_threshold=score_threshold,
+            payload_fields=RANKING_PAYLOAD_FIELDS if self.lazy_payload else None,
+            filters=filters,
+            **(search_params or {})
+        )
         
-        # 6. 랭킹 알고리즘 적용
-        ranked_results = self.ranking_processor.rerank_with_custom_rules(filtered_results, original_query)
+        # 5~7. 임계값 필터링, 랭킹, 상위 K개 선택
+        filtered_results, top_results = self._postprocess_results(raw_results, original_query, top_k, score_threshold)
         
-        # 7. 상위 K개만 선택
-        top_results = ranked_results[:top_k] if len(ranked_results) > top_k else ranked_results
-        
-        # 8. 메타데이터 내 텍스트 원래 언어로 번역 (옵션)
-        if self.translation_enabled:
-            for result in top_results:
-                if 'metadata' in result and 'original_text' in result['metadata']:
-                    # 원본 텍스트가 있으면 복원
-                    result['metadata']['text'] = result['metadata']['original_text']
+        # 8. 최종 결과만 전체 페이로드 조회 후 원문 복원
+        payloads = None
+        if self.lazy_payload and top_results:
+            payloads = await self.vector_store.retrieve_payloads_async([result['id'] for result in top_results])
+        self._finalize_results(top_results, payloads)
         
         # 9. 결과 캐싱 (옵션)
         if self.cache_enabled and use_cache and self.query_cache:
-            self.query_cache.set(original_query, top_results)
+            self.query_cache.set(cache_key, top_results)
+        if use_semantic_cache:
+            self.semantic_cache.set(original_query, query_embedding, top_results, user_id=user_id, top_k=top_k)
         
         # 10. 결과 반환
         return {
@@ -94,6 +184,146 @@ class SearchService:
             "total_results": len(raw_results),
             "filtered_results": len(filtered_results),
             "results": top_results,
-            "threshold": self.threshold_filter.threshold,
+            "threshold": score_threshold,
             "source": "search"
-        }
\ No newline at end of file
+        }
+    
+    def search_many(self, queries: List[str], top_k: int = 5, use_cache: bool = True, threshold: Optional[float] = None, filters: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        여러 질문을 한 번에 검색 (일괄 번역, 단일 인코딩, Qdrant 배치 검색)
+        
+        Args:
+            queries (List[str]): 사용자 질문 리스트
+            top_k (int): 질문별 반환할 최대 결과 수
+            use_cache (bool): 캐시 사용 여부
+            threshold (float): 요청별 유사도 임계값 (없으면 기본값)
+            filters (Dict): 페이로드 조건 (예: {"user_id": 3, "table": ["schedule"]}), 벡터 검색 중에 적용
+            search_params (Dict): 벡터 검색 파라미터 (hnsw_ef, exact, indexed_only), 없으면 저장소 기본값
+            
+        Returns:
+            List[Dict]: 질문 순서와 같은 검색 결과 리스트
+        """
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        score_threshold = self._resolve_threshold(threshold)
+        
+        # 1. 캐시 확인 (옵션)
+        pending = []
+        for i, query in enumerate(queries):
+            if self.cache_enabled and use_cache and self.query_cache:
+                cached_results = self.query_cache.get(self._cache_key(query, score_threshold, filters, search_params))
+                if cached_results:
+                    responses[i] = {
+                        "status": "success",
+                        "query": query,
+                        "results": cached_results,
+                        "source": "cache",
+                        "filtered": True
+                    }
+                    continue
+            pending.append(i)
+        
+        if not pending:
+            return responses
+        
+        pending_queries = [queries[i] for i in pending]
+        
+        # 2. 질문 일괄 번역 (옵션)
+        if self.translation_enabled:
+            search_texts = self.translation_service.translate_batch_to_target(pending_queries)
+        else:
+            search_texts = pending_queries
+        
+        # 3. 모든 질문을 한 번에 임베딩
+        query_embeddings = self.embedding_service.encode(search_texts)
+        
+        # 4. Qdrant 배치 검색 (단일 요청)
+        raw_results_list = self.vector_store.search_batch(
+            query_embeddings,
+            top_k * 2,
+            score_threshold=score_threshold,
+            payload_fields=RANKING_PAYLOAD_FIELDS if self.lazy_payload else None,
+            filters=filters,
+            **(search_params or {})
+        )
+        
+        # 5. 질문별 필터링/랭킹
+        processed = [
+            self._postprocess_results(raw_results, original_query, top_k, score_threshold)
+            for original_query, raw_results in zip(pending_queries, raw_results_list)
+        ]
+        
+        # 6. 모든 질문의 최종 결과 페이로드를 한 번에 조회
+        payloads = None
+        if self.lazy_payload:
+            ids = list({result['id']: None for _, top_results in processed for result in top_results})
+            payloads = self.vector_store.retrieve_payloads(ids)
+        
+        # 7. 원문 복원 및 캐싱
+        for i, original_query, raw_results, (filtered_results, top_results) in zip(pending, pending_queries, raw_results_list, processed):
+            self._finalize_results(top_results, payloads)
+            
+            if self.cache_enabled and use_cache and self.query_cache:
+                self.query_cache.set(self._cache_key(original_query, score_threshold, filters, search_params), top_results)
+            
+            responses[i] = {
+                "status": "success",
+                "query": original_query,
+                "total_results": len(raw_results),
+                "filtered_results": len(filtered_results),
+                "results": top_results,
+                "threshold": score_threshold,
+                "source": "search"
+            }
+        
+        return responses
+    
+    def _resolve_threshold(self, threshold: Optional[float]) -> float:
+        """요청별 임계값이 없으면 기본 임계값 사용"""
+        return self.threshold_filter.threshold if threshold is None else threshold
+    
+    def _cache_key(self, query: str, score_threshold: float, filters: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None) -> str:
+        """기본 임계값이 아니거나 필터/검색 파라미터가 있는 요청은 조건을 포함한 별도 캐시 키 사용"""
+        key = query
+        if score_threshold != self.threshold_filter.threshold:
+            key += f"\x1fthreshold={score_threshold}"
+        if filters:
+            key += f"\x1ffilters={json.dumps(filters, sort_keys=True, default=str)}"
+        if search_params:
+            key += f"\x1fparams={json.dumps(search_params, sort_keys=True)}"
+        return key
+    
+    def _postprocess_results(self, raw_results: List[Dict[str, Any]], original_query: str, top_k: int, score_threshold: Optional[float] = None):
+        """
+        임계값 필터링, 랭킹, 상위 K개 선택
+        
+        Returns:
+            (필터링된 결과, 상위 K개 결과)
+        """
+        # 임계값 기반 필터링 (Qdrant score_threshold 적용 후 클라이언트 측 안전장치)
+        filtered_results = self.threshold_filter.filter_results(raw_results, score_threshold)
+        
+        # 랭킹 알고리즘 적용
+        ranked_results = self.ranking_processor.rerank_with_custom_rules(filtered_results, original_query)
+        
+        # 상위 K개만 선택
+        top_results = ranked_results[:top_k] if len(ranked_results) > top_k else ranked_results
+        
+        return filtered_results, top_results
+    
+    def _finalize_results(self, top_results: List[Dict[str, Any]], payloads: Optional[Dict[Any, Dict[str, Any]]] = None) -> None:
+        """
+        최종 결과에 전체 페이로드를 채우고 원문 텍스트 복원
+        
+        Args:
+            top_results: 상위 K개 결과
+            payloads: ID별 전체 페이로드 (지연 조회한 경우)
+        """
+        for result in top_results:
+            if payloads is not None and result['id'] in payloads:
+                result['metadata'] = payloads[result['id']]
+            
+            # 메타데이터 내 텍스트 원래 언어로 번역 (옵션)
+            if self.translation_enabled:
+                if 'metadata' in result and 'original_text' in result['metadata']:
+                    # 원본 텍스트가 있으면 복원
+                    result['metadata']['text'] = result['metadata']['original_text']
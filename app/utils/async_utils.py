@@ -0,0 +1,27 @@
+# utils/async_utils.py
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """동기 코드에서 코루틴을 실행하기 위한 전용 이벤트 루프 (데몬 스레드에서 실행)"""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-bridge", daemon=True)
+            thread.start()
+            _background_loop = loop
+    return _background_loop
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    코루틴을 동기적으로 실행하고 결과 반환
+
+    호출한 스레드에 이미 이벤트 루프가 돌고 있어도 사용할 수 있도록
+    asyncio.run 대신 전용 백그라운드 루프에 제출한다.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop()).result()
@@ -0,0 +1,76 @@
+# utils/single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    def __init__(self):
+        """
+        동일한 키의 동시 요청을 하나로 합치는 single-flight 그룹
+
+        처음 들어온 호출만 실제로 계산하고, 계산 중에 들어온 같은 키의 호출은
+        같은 Future를 기다렸다가 결과(또는 예외)를 함께 받는다.
+        스레드와 이벤트 루프가 달라도 동작하도록 concurrent.futures.Future를 사용한다.
+        """
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # 통계 카운터
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _acquire(self, key: str) -> Tuple[Future, bool]:
+        """키에 대한 Future와 리더 여부 반환"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """동기 함수 실행 (같은 키가 실행 중이면 그 결과를 기다림)"""
+        future, leader = self._acquire(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+    async def do_async(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """코루틴 함수 실행 (같은 키가 실행 중이면 그 결과를 기다림)"""
+        future, leader = self._acquire(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """통계 반환"""
+        with self._lock:
+            return {
+                "inflight": len(self._inflight),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced
+            }
@@ -1,46 +1,267 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from deep_translator import GoogleTranslator
+from cache.query_cache import QueryCache
+from cache.disk_cache import DiskCache
+from config.settings.settings import TRANSLATION_SETTINGS
+
+# 배치 번역 시 여러 텍스트를 한 요청으로 묶기 위한 구분자
+BATCH_SEPARATOR = "\n⁂\n"
+_BATCH_SPLIT_PATTERN = re.compile(r"\s*⁂\s*")
+
+# 비동기 번역 요청을 처리하는 공유 I/O 실행기
+_translation_executor = ThreadPoolExecutor(
+    max_workers=TRANSLATION_SETTINGS.get("async_workers", 8),
+    thread_name_prefix="translate"
+)
+
+# 모든 TranslationService 인스턴스가 공유하는 번역 캐시
+_translation_cache: Optional[QueryCache] = None
+
+def get_translation_cache() -> Optional[QueryCache]:
+    """공유 번역 캐시 반환 (cache_translations 설정이 꺼져 있으면 None)"""
+    global _translation_cache
+    if _translation_cache is None and TRANSLATION_SETTINGS.get("cache_translations", True):
+        _translation_cache = QueryCache(
+            ttl=TRANSLATION_SETTINGS.get("cache_ttl", 86400),
+            max_entries=TRANSLATION_SETTINGS.get("cache_max_entries", 50000),
+            max_bytes=TRANSLATION_SETTINGS.get("cache_max_bytes", 32 * 1024 * 1024),
+            namespace="translation"
+        )
+    return _translation_cache
+
+def configure_translation_cache(disk_cache: Optional[DiskCache] = None) -> Optional[QueryCache]:
+    """공유 번역 캐시에 영구 2차 캐시 연결"""
+    cache = get_translation_cache()
+    if cache is not None:
+        cache.disk_cache = disk_cache
+    return cache
 
 class TranslationService:
     """번역 서비스 유틸리티 클래스"""
     
-    def __init__(self, source_lang="ko", target_lang="en"):
+    def __init__(self, source_lang="ko", target_lang="en", cache: Optional[QueryCache] = None):
         """번역 서비스 초기화"""
         self.source_lang = source_lang
         self.target_lang = target_lang
-        self.translator = GoogleTranslator(source=source_lang, target=target_lang)
-        # 역방향 번역기도 초기화 (영어 -> 한국어)
-        self.reverse_translator = GoogleTranslator(source="en", target="ko")
+        # 배치 번역 설정
+        self.batch_max_chars = TRANSLATION_SETTINGS.get("batch_max_chars", 4500)
+        self.batch_workers = TRANSLATION_SETTINGS.get("batch_workers", 4)
+        self.batch_retries = TRANSLATION_SETTINGS.get("batch_retries", 3)
+        self.batch_backoff = TRANSLATION_SETTINGS.get("batch_backoff", 0.5)
+        # 지정하지 않으면 공유 번역 캐시 사용
+        self.cache = cache if cache is not None else get_translation_cache()
+        # GoogleTranslator는 요청마다 내부 상태를 변경하므로 스레드별 인스턴스 사용
+        self._local = threading.local()
+    
+    def _translator(self, source: str, target: str) -> GoogleTranslator:
+        """현재 스레드 전용 번역기 (언어 쌍별로 한 번만 생성)"""
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        key = (source, target)
+        if key not in translators:
+            translators[key] = GoogleTranslator(source=source, target=target)
+        return translators[key]
         
-    def translate_to_target(self, text: str) -> str:
-        """소스 언어에서 타겟 언어로 텍스트 번역"""
-        if not text or not isinstance(text, str):
-            return ""
-            
+    def _cache_key(self, source: str, target: str, text: str) -> str:
+        """번역 캐시 키 생성"""
+        return f"{source}\x1f{target}\x1f{text}"
+    
+    def _cached_lookup(self, source: str, target: str, text: str) -> Optional[str]:
+        """캐시에서 번역 결과 조회 (없으면 None)"""
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(source, target, text))
+    
+    def _translate_uncached(self, source: str, target: str, text: str) -> str:
+        """캐시 확인 없이 번역 API를 호출하고 결과를 캐싱 (실패 시 원문 반환, 캐싱하지 않음)"""
         try:
-            return self.translator.translate(text)
+            translated = self._translator(source, target).translate(text)
         except Exception as e:
-            print(f"번역 오류 (소스 -> 타겟): {e}")
+            print(f"번역 오류 ({source} -> {target}): {e}")
             return text
+        
+        if self.cache is not None and translated is not None:
+            self.cache.set(self._cache_key(source, target, text), translated)
+        return translated
     
-    def translate_to_source(self, text: str) -> str:
-        """타겟 언어에서 소스 언어로 텍스트 번역"""
+    def _translate(self, source: str, target: str, text: str) -> str:
+        """(source, target, text) 키로 캐시를 확인한 뒤 미스일 때만 번역 API 호출"""
         if not text or not isinstance(text, str):
             return ""
-            
-        try:
-            return self.reverse_translator.translate(text)
-        except Exception as e:
-            print(f"번역 오류 (타겟 -> 소스): {e}")
-            return text
+        cached = self._cached_lookup(source, target, text)
+        if cached is not None:
+            return cached
+        return self._translate_uncached(source, target, text)
+    
+    async def _translate_async(self, source: str, target: str, text: str) -> str:
+        """캐시 적중 시 스레드 전환 없이 반환, 미스면 공유 I/O 실행기에서 번역 (캐시는 한 번만 조회)"""
+        if not text or not isinstance(text, str):
+            return ""
+        cached = self._cached_lookup(source, target, text)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_translation_executor, self._translate_uncached, source, target, text)
+    
+    def translate_to_target(self, text: str) -> str:
+        """소스 언어에서 타겟 언어로 텍스트 번역"""
+        return self._translate(self.source_lang, self.target_lang, text)
+    
+    def translate_to_source(self, text: str) -> str:
+        """타겟 언어에서 소스 언어로 텍스트 번역"""
+        return self._translate("en", "ko", text)
+    
+    async def translate_to_target_async(self, text: str) -> str:
+        """소스 언어에서 타겟 언어로 비동기 번역 (캐시 적중 시 스레드 전환 없음)"""
+        return await self._translate_async(self.source_lang, self.target_lang, text)
+    
+    async def translate_to_source_async(self, text: str) -> str:
+        """타겟 언어에서 소스 언어로 비동기 번역 (캐시 적중 시 스레드 전환 없음)"""
+        return await self._translate_async("en", "ko", text)
     
     def translate_batch_to_target(self, texts: List[str]) -> List[str]:
-        """텍스트 배치를 타겟 언어로 번역"""
-        return [self.translate_to_target(text) for text in texts if text]
+        """텍스트 배치를 타겟 언어로 번역 (입력과 같은 순서/길이, 빈 문자열은 빈 문자열로 유지)"""
+        return self._translate_batch(texts, self.source_lang, self.target_lang)
+    
+    def translate_batch_to_target_checked(self, texts: List[str]) -> Tuple[List[str], List[bool]]:
+        """
+        텍스트 배치를 타겟 언어로 번역하고 항목별 실패 여부도 반환
+        
+        실패한 항목은 원문이 그대로 들어 있으므로, 인덱싱에서는 그 청크를 다음 실행 때 다시 처리하도록 표시해야 한다.
+        """
+        return self._translate_batch_checked(texts, self.source_lang, self.target_lang)
     
     def translate_batch_to_source(self, texts: List[str]) -> List[str]:
-        """텍스트 배치를 소스 언어로 번역"""
-        return [self.translate_to_source(text) for text in texts if text]
+        """텍스트 배치를 소스 언어로 번역 (입력과 같은 순서/길이, 빈 문자열은 빈 문자열로 유지)"""
+        return self._translate_batch(texts, "en", "ko")
+    
+    def _translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        """배치 번역 결과만 반환 (실패한 항목은 원문)"""
+        return self._translate_batch_checked(texts, source, target)[0]
+    
+    def _translate_batch_checked(self, texts: List[str], source: str, target: str) -> Tuple[List[str], List[bool]]:
+        """
+        캐시 미스인 텍스트만 모아 구분자로 묶은 요청을 병렬로 번역
+        
+        Args:
+            texts: 번역할 텍스트 리스트
+            source: 소스 언어
+            target: 타겟 언어
+            
+        Returns:
+            (입력과 정렬이 일치하는 번역 결과 리스트, 번역에 실패해 원문을 담은 항목 표시)
+        """
+        results = ["" for _ in texts]
+        failed = [False for _ in texts]
+        pending: Dict[str, List[int]] = {}
+        
+        # 1. 캐시 확인 및 중복 제거
+        for i, text in enumerate(texts):
+            if not text or not isinstance(text, str):
+                continue
+            if self.cache is not None:
+                cached = self.cache.get(self._cache_key(source, target, text))
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending.setdefault(text, []).append(i)
+        
+        if not pending:
+            return results, failed
+        
+        # 2. 요청 크기 제한에 맞춰 묶기
+        packs = self._pack_texts(list(pending.keys()))
+        
+        # 3. 공유 번역 실행기로 병렬 번역 (동시에 진행 중인 묶음은 batch_workers개로 제한, 하나면 바로 실행)
+        if len(packs) == 1:
+            translated_packs = [self._translate_pack(packs[0], source, target)]
+        else:
+            workers = max(1, self.batch_workers)
+            translated_packs: List[List[Optional[str]]] = [[] for _ in packs]
+            in_flight = []
+            for index, pack in enumerate(packs):
+                if len(in_flight) >= workers:
+                    done_index, future = in_flight.pop(0)
+                    translated_packs[done_index] = future.result()
+                in_flight.append((index, _translation_executor.submit(self._translate_pack, pack, source, target)))
+            for done_index, future in in_flight:
+                translated_packs[done_index] = future.result()
+        
+        # 4. 결과 정렬 복원 및 캐싱 (실패한 항목(None)은 원문을 반환하고 캐싱하지 않음)
+        for pack, translated in zip(packs, translated_packs):
+            for text, translated_text in zip(pack, translated):
+                for i in pending[text]:
+                    results[i] = text if translated_text is None else translated_text
+                    failed[i] = translated_text is None
+                # 원문과 같은 번역(고유명사, 숫자 등)도 성공한 결과이므로 캐싱해 다시 요청하지 않음
+                if self.cache is not None and translated_text is not None:
+                    self.cache.set(self._cache_key(source, target, text), translated_text)
+        
+        return results, failed
+    
+    def _pack_texts(self, texts: List[str]) -> List[List[str]]:
+        """구분자를 포함한 길이가 batch_max_chars를 넘지 않도록 텍스트를 묶음"""
+        packs: List[List[str]] = []
+        current: List[str] = []
+        current_len = 0
+        
+        for text in texts:
+            added_len = len(text) + (len(BATCH_SEPARATOR) if current else 0)
+            if current and current_len + added_len > self.batch_max_chars:
+                packs.append(current)
+                current, current_len = [], 0
+                added_len = len(text)
+            current.append(text)
+            current_len += added_len
+        
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _translate_pack(self, pack: List[str], source: str, target: str) -> List[Optional[str]]:
+        """
+        묶음 하나를 번역하고 구분자로 다시 분리 (분리 결과가 어긋나면 개별 번역으로 대체)
+        
+        번역에 실패한 항목은 None으로 반환해 호출자가 원문으로 대체하고 캐싱하지 않도록 한다.
+        """
+        # GoogleTranslator는 요청마다 내부 상태를 변경하므로 스레드별 인스턴스 사용
+        translator = self._translator(source, target)
+        
+        if len(pack) > 1:
+            try:
+                translated = self._with_retry(translator.translate, BATCH_SEPARATOR.join(pack))
+                parts = _BATCH_SPLIT_PATTERN.split(translated.strip()) if translated else []
+                if len(parts) == len(pack):
+                    return parts
+                print(f"배치 번역 분리 불일치 ({len(parts)} != {len(pack)}), 개별 번역으로 대체")
+            except Exception as e:
+                print(f"배치 번역 오류 ({source} -> {target}): {e}")
+        
+        results = []
+        for text in pack:
+            try:
+                results.append(self._with_retry(translator.translate, text))
+            except Exception as e:
+                print(f"번역 오류 ({source} -> {target}): {e}")
+                results.append(None)
+        return results
+    
+    def _with_retry(self, func, *args):
+        """지수 백오프로 재시도 (batch_retries가 0 이하여도 최소 한 번은 호출)"""
+        attempts = max(1, self.batch_retries)
+        for attempt in range(attempts):
+            try:
+                return func(*args)
+            except Exception:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(self.batch_backoff * (2 ** attempt))
     
     def translate_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """메타데이터 필드 번역"""
@@ -0,0 +1,563 @@
+# vectordb/numpy_store.py
+from qdrant_client.http import models
+from functools import partial
+from typing import List, Dict, Any, Optional, Union
+import asyncio
+import threading
+import time
+import numpy as np
+from vectordb.qdrant_store import PAYLOAD_INDEXES, build_filter, point_id_for
+from vectordb.snapshot import SnapshotWriter, read_snapshot, snapshot_exists
+
+# 숫자 비교(Range)가 가능한 페이로드 인덱스 필드
+NUMERIC_SCHEMAS = (models.PayloadSchemaType.INTEGER, models.PayloadSchemaType.FLOAT)
+
+class NumpyVectorStore:
+    def __init__(self,
+                 collection_name: str = "chatbot_vectors",
+                 vector_size: int = 384,
+                 snapshot_dir: Optional[str] = None,
+                 initial_capacity: int = 1024):
+        """
+        Qdrant 서버 없이 동작하는 프로세스 내 NumPy 벡터 저장소 (QdrantVectorStore와 같은 인터페이스)
+
+        정규화한 벡터를 미리 할당한 float32 행렬에 담고, 용량이 부족하면 두 배로 늘린다.
+        검색은 행렬곱 한 번과 argpartition으로 top-k를 구하며, 페이로드 조건은 불리언 마스크로 적용한다.
+
+        Args:
+            collection_name: 스냅샷 파일 이름에 사용
+            vector_size: 벡터 차원
+            snapshot_dir: 스냅샷 디렉터리 (None이면 저장하지 않음, 있으면 초기화 시 로딩)
+            initial_capacity: 처음 할당할 행 수
+        """
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.RLock()
+
+        self._vectors = np.zeros((max(1, initial_capacity), vector_size), dtype=np.float32)
+        self._alive = np.zeros(len(self._vectors), dtype=bool)
+        self._ids: List[Any] = []
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._id_to_row: Dict[Any, int] = {}
+        # 인덱스 필드는 열 배열로 유지해 필터 마스크를 벡터 연산으로 계산
+        self._columns: Dict[str, np.ndarray] = {}
+        self._reset_columns(len(self._vectors))
+        # 재구축 중 실시간 쓰기를 함께 반영할 섀도 저장소
+        self._mirror: Optional["NumpyVectorStore"] = None
+        # delete_rows/delete_by_metadata로 삭제한 포인트 수 (섀도 교체 전 검증에 반영)
+        self.deleted_points = 0
+
+        if snapshot_dir and snapshot_exists(snapshot_dir, collection_name):
+            self.load()
+
+    def _reset_columns(self, capacity: int) -> None:
+        """인덱스 필드 열 배열 초기화"""
+        self._columns = {
+            field_name: np.full(capacity, np.nan) if schema in NUMERIC_SCHEMAS else np.full(capacity, None, dtype=object)
+            for field_name, schema in PAYLOAD_INDEXES.items()
+        }
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """행 수가 용량을 넘으면 두 배씩 확장 (lock 보유 상태에서 호출)"""
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        new_capacity = capacity
+        while new_capacity < rows:
+            new_capacity *= 2
+
+        vectors = np.zeros((new_capacity, self.vector_size), dtype=np.float32)
+        vectors[:capacity] = self._vectors
+        self._vectors = vectors
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:capacity] = self._alive
+        self._alive = alive
+        for field_name, column in self._columns.items():
+            grown = np.full(new_capacity, np.nan) if column.dtype != object else np.full(new_capacity, None, dtype=object)
+            grown[:capacity] = column
+            self._columns[field_name] = grown
+
+    def _coerce(self, field_name: str, value: Any) -> Any:
+        """
+        인덱스 필드 값을 PAYLOAD_INDEXES 스키마 타입으로 변환 (숫자는 float, 키워드는 str, 변환 불가/없음은 nan/None)
+
+        페이로드마다 "3"과 3처럼 타입이 달라도 열 배열과 필터 값이 같은 타입으로 비교되도록 저장과 조회 모두에 적용한다.
+        """
+        if PAYLOAD_INDEXES[field_name] in NUMERIC_SCHEMAS:
+            return self._coerce_float(value)
+        return None if value is None else str(value)
+
+    @staticmethod
+    def _coerce_float(value: Any) -> float:
+        """범위 조건 비교용 float 변환 (변환 불가/없음은 nan)"""
+        try:
+            return np.nan if value is None else float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def _set_columns(self, row: int, payload: Optional[Dict[str, Any]]) -> None:
+        """행의 인덱스 필드 값 기록 (lock 보유 상태에서 호출)"""
+        for field_name, column in self._columns.items():
+            column[row] = self._coerce(field_name, payload.get(field_name) if payload else None)
+
+    def _delete_rows(self, rows: np.ndarray) -> int:
+        """행을 삭제 표시하고 죽은 행이 많으면 압축 (lock 보유 상태에서 호출)"""
+        rows = rows[self._alive[rows]]
+        for row in rows:
+            self._id_to_row.pop(self._ids[row], None)
+            self._payloads[row] = None
+            self._set_columns(row, None)
+        self._alive[rows] = False
+
+        # 삭제된 행이 절반을 넘으면 압축
+        if len(self._ids) > 0 and len(self._id_to_row) < len(self._ids) // 2:
+            self._compact()
+        return len(rows)
+
+    def _compact(self) -> None:
+        """살아 있는 행만 앞으로 모음 (lock 보유 상태에서 호출)"""
+        keep = np.flatnonzero(self._alive[:len(self._ids)])
+        size = len(keep)
+        self._vectors[:size] = self._vectors[keep]
+        for field_name, column in self._columns.items():
+            column[:size] = column[keep]
+            column[size:] = np.nan if column.dtype != object else None
+        self._ids = [self._ids[row] for row in keep]
+        self._payloads = [self._payloads[row] for row in keep]
+        self._alive[:] = False
+        self._alive[:size] = True
+        self._id_to_row = {point_id: row for row, point_id in enumerate(self._ids)}
+
+    def _condition_mask(self, condition: Any, size: int) -> np.ndarray:
+        """단일 조건(FieldCondition 또는 중첩 Filter)의 불리언 마스크"""
+        if isinstance(condition, models.Filter):
+            return self._filter_mask(condition, size)
+        if not isinstance(condition, models.FieldCondition):
+            raise ValueError(f"Unsupported filter condition: {type(condition).__name__}")
+
+        column = self._columns.get(condition.key)
+        if column is None:
+            # 인덱스가 없는 필드는 페이로드를 직접 확인
+            payloads = self._payloads[:size]
+            column = np.array([payload.get(condition.key) if payload else None for payload in payloads], dtype=object)
+            coerce = lambda value: value
+        else:
+            column = column[:size]
+            # 필터 값도 저장된 열과 같은 타입으로 변환해 비교
+            coerce = partial(self._coerce, condition.key)
+
+        if condition.match is not None:
+            if isinstance(condition.match, models.MatchValue):
+                return np.asarray(column == coerce(condition.match.value), dtype=bool)
+            if isinstance(condition.match, models.MatchAny):
+                mask = np.zeros(size, dtype=bool)
+                for value in condition.match.any:
+                    mask |= np.asarray(column == coerce(value), dtype=bool)
+                return mask
+            raise ValueError(f"Unsupported match: {type(condition.match).__name__}")
+
+        if condition.range is not None:
+            values = column.astype(np.float64) if column.dtype != object else np.array(
+                [self._coerce_float(value) for value in column], dtype=np.float64
+            )
+            mask = ~np.isnan(values)
+            if condition.range.gt is not None:
+                mask &= values > condition.range.gt
+            if condition.range.gte is not None:
+                mask &= values >= condition.range.gte
+            if condition.range.lt is not None:
+                mask &= values < condition.range.lt
+            if condition.range.lte is not None:
+                mask &= values <= condition.range.lte
+            return mask
+
+        raise ValueError(f"Unsupported field condition on {condition.key}")
+
+    def _filter_mask(self, query_filter: Optional[models.Filter], size: int) -> np.ndarray:
+        """Qdrant 필터의 must/should/must_not 의미를 그대로 따르는 불리언 마스크"""
+        mask = self._alive[:size].copy()
+        if query_filter is None:
+            return mask
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(condition, size)
+        if query_filter.should:
+            should_mask = np.zeros(size, dtype=bool)
+            for condition in query_filter.should:
+                should_mask |= self._condition_mask(condition, size)
+            mask &= should_mask
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(condition, size)
+        return mask
+
+    def add_embeddings(self, embeddings: Union[np.ndarray, List[np.ndarray]], metadatas: List[Dict[str, Any]]):
+        """임베딩 벡터와 메타데이터 추가 (같은 청크는 같은 ID로 덮어쓰기)"""
+        if len(embeddings) == 0:
+            return {"inserted": 0, "ids": []}
+        return self.bulk_upsert(np.asarray(embeddings, dtype=np.float32), metadatas)
+
+    def bulk_upsert(self,
+                    vectors: np.ndarray,
+                    metadatas: List[Dict[str, Any]],
+                    batch_size: Optional[int] = None,
+                    parallel: Optional[int] = None,
+                    ids: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        (N, dim) float32 배열 업서트 (batch_size/parallel은 인터페이스 호환용으로 무시)
+
+        QdrantVectorStore와 같이 행의 마지막 청크가 포함되면 줄어든 나머지 청크를 삭제한다.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(metadatas):
+            raise ValueError(f"vectors shape {vectors.shape} does not match {len(metadatas)} metadatas")
+        if vectors.shape[0] == 0:
+            return {"inserted": 0, "ids": [], "batches": 0, "elapsed": 0.0, "points_per_second": 0.0}
+
+        start_time = time.perf_counter()
+        if ids is None:
+            ids = [point_id_for(metadata) for metadata in metadatas]
+
+        # 코사인 유사도를 내적으로 계산하도록 정규화해서 저장
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        normalized = vectors / np.maximum(norms, 1e-12)
+
+        with self._lock:
+            rows = []
+            for point_id in ids:
+                row = self._id_to_row.get(point_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ensure_capacity(row + 1)
+                    self._ids.append(point_id)
+                    self._payloads.append(None)
+                    self._id_to_row[point_id] = row
+                rows.append(row)
+
+            rows = np.asarray(rows)
+            self._vectors[rows] = normalized
+            self._alive[rows] = True
+            for row, metadata, point_id in zip(rows, metadatas, ids):
+                payload = {**metadata, "vector_id": point_id}
+                self._payloads[row] = payload
+                self._set_columns(row, payload)
+
+            # 행의 마지막 청크가 포함된 경우 chunk_index >= total_chunks인 청크 삭제
+            self._delete_trailing_chunks(metadatas)
+
+        # 재구축 중이면 같은 ID로 섀도에도 기록
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.bulk_upsert(vectors, metadatas, ids=ids)
+
+        elapsed = time.perf_counter() - start_time
+        return {
+            "inserted": len(ids),
+            "ids": ids,
+            "batches": 1,
+            "elapsed": elapsed,
+            "points_per_second": len(ids) / elapsed if elapsed > 0 else 0.0
+        }
+
+    def _delete_trailing_chunks(self, metadatas: List[Dict[str, Any]]) -> None:
+        """
+        행의 마지막 청크 메타데이터 기준으로 chunk_index >= total_chunks인 청크 삭제 (lock 보유 상태에서 호출)
+
+        배치 전체에 대해 table/row_id/chunk_index 열 마스크를 한 번만 계산하고, 후보 행만 개별 확인한다.
+        """
+        totals: Dict[Any, int] = {}
+        for metadata in metadatas:
+            total_chunks = metadata.get("total_chunks")
+            if total_chunks is None or metadata.get("chunk_index") != total_chunks - 1:
+                continue
+            if metadata.get("table") is None or metadata.get("row_id") is None:
+                continue
+            totals[(metadata["table"], metadata["row_id"])] = total_chunks
+        if not totals:
+            return
+
+        size = len(self._ids)
+        # 남는 청크는 항상 chunk_index >= 1 (NaN 비교는 False)
+        mask = self._alive[:size] & (self._columns["chunk_index"][:size] >= 1)
+        table_mask = np.zeros(size, dtype=bool)
+        for table in {table for table, _ in totals}:
+            table_mask |= self._columns["table"][:size] == table
+        mask &= table_mask
+        try:
+            mask &= np.isin(self._columns["row_id"][:size], [float(row_id) for _, row_id in totals])
+        except (TypeError, ValueError):
+            # 숫자가 아닌 row_id는 아래 개별 확인으로 처리
+            pass
+
+        stale = [
+            row for row in np.flatnonzero(mask)
+            if self._payloads[row]["chunk_index"] >= totals.get((self._payloads[row].get("table"), self._payloads[row].get("row_id")), np.inf)
+        ]
+        if stale:
+            self._delete_rows(np.asarray(stale, dtype=np.int64))
+
+    def delete_trailing_chunks(self, metadatas: List[Dict[str, Any]]) -> None:
+        """업서트 없이 행의 줄어든 청크만 삭제 (metadatas는 각 행의 마지막 청크 메타데이터)"""
+        with self._lock:
+            self._delete_trailing_chunks(metadatas)
+
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_trailing_chunks(metadatas)
+
+    def update_payloads(self, updates: Dict[Any, Dict[str, Any]]) -> None:
+        """벡터는 그대로 두고 포인트별 페이로드 필드만 갱신 (ID -> 바꿀 필드)"""
+        with self._lock:
+            for point_id, fields in updates.items():
+                row = self._id_to_row.get(point_id)
+                if row is None:
+                    continue
+                payload = {**self._payloads[row], **fields}
+                self._payloads[row] = payload
+                self._set_columns(row, payload)
+
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.update_payloads(updates)
+
+    def _select_payload(self, payload: Dict[str, Any], payload_fields: Optional[List[str]]) -> Dict[str, Any]:
+        """반환할 페이로드 필드 선택 (None이면 전체 페이로드, 저장된 딕셔너리가 수정되지 않도록 복사본 반환)"""
+        if payload_fields is None:
+            return dict(payload)
+        return {key: payload[key] for key in payload_fields if key in payload}
+
+    def _top_k(self, scores: np.ndarray, mask: np.ndarray, top_k: int, score_threshold: Optional[float],
+               payload_fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """점수 벡터에서 마스크를 통과한 상위 top_k 결과 생성 (lock 보유 상태에서 호출)"""
+        if score_threshold is not None:
+            mask = mask & (scores >= score_threshold)
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0 or top_k <= 0:
+            return []
+
+        candidate_scores = scores[candidates]
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top])]
+
+        return [
+            {
+                'id': self._ids[candidates[i]],
+                'score': float(candidate_scores[i]),
+                'metadata': self._select_payload(self._payloads[candidates[i]], payload_fields)
+            }
+            for i in top
+        ]
+
+    def search(self,
+               query_embedding: np.ndarray,
+               top_k: int = 5,
+               score_threshold: Optional[float] = None,
+               payload_fields: Optional[List[str]] = None,
+               filters: Optional[Any] = None,
+               search_params: Optional[models.SearchParams] = None,
+               hnsw_ef: Optional[int] = None,
+               exact: Optional[bool] = None,
+               indexed_only: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """쿼리 벡터와 유사한 벡터 검색 (행렬곱 한 번 + argpartition, 항상 전수 탐색이므로 HNSW 관련 인자는 무시)"""
+        return self.search_batch(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+                                 top_k, score_threshold, payload_fields, filters)[0]
+
+    async def search_async(self,
+                           query_embedding: np.ndarray,
+                           top_k: int = 5,
+                           score_threshold: Optional[float] = None,
+                           payload_fields: Optional[List[str]] = None,
+                           filters: Optional[Any] = None,
+                           search_params: Optional[models.SearchParams] = None,
+                           hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None,
+                           indexed_only: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """쿼리 벡터와 유사한 벡터 검색 (기본 실행기에서 실행해 이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.search, query_embedding, top_k, score_threshold, payload_fields, filters)
+        )
+
+    def search_batch(self,
+                     query_embeddings: np.ndarray,
+                     top_k: int = 5,
+                     score_threshold: Optional[float] = None,
+                     payload_fields: Optional[List[str]] = None,
+                     filters: Optional[Any] = None,
+                     search_params: Optional[models.SearchParams] = None,
+                     hnsw_ef: Optional[int] = None,
+                     exact: Optional[bool] = None,
+                     indexed_only: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리 벡터를 한 번의 행렬곱으로 검색"""
+        if len(query_embeddings) == 0:
+            return []
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            size = len(self._ids)
+            mask = self._filter_mask(build_filter(filters), size)
+            scores = queries @ self._vectors[:size].T
+            return [self._top_k(scores[i], mask, top_k, score_threshold, payload_fields) for i in range(len(queries))]
+
+    def retrieve_payloads(self, ids: List[Any], payload_fields: Optional[List[str]] = None) -> Dict[Any, Dict[str, Any]]:
+        """ID 목록의 페이로드를 한 번에 조회 (payload_fields가 없으면 전체 페이로드)"""
+        with self._lock:
+            return {
+                point_id: self._select_payload(self._payloads[self._id_to_row[point_id]], payload_fields)
+                for point_id in ids if point_id in self._id_to_row
+            }
+
+    async def retrieve_payloads_async(self, ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """ID 목록의 전체 페이로드를 한 번에 조회 (기본 실행기에서 실행해 이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.retrieve_payloads, ids)
+
+    def count(self) -> int:
+        """저장된 벡터 수 반환"""
+        with self._lock:
+            return len(self._id_to_row)
+
+    def count_table_points(self) -> int:
+        """테이블 행 청크(chunk_index가 있는 포인트) 수 반환"""
+        with self._lock:
+            return sum(1 for row in self._id_to_row.values() if self._payloads[row].get("chunk_index") is not None)
+
+    def delete_by_metadata(self, table: str, row_id: int):
+        """특정 테이블과 레코드 ID에 해당하는 모든 벡터 삭제"""
+        with self._lock:
+            mask = self._filter_mask(build_filter({"table": table, "row_id": row_id}), len(self._ids))
+            self.deleted_points += self._delete_rows(np.flatnonzero(mask))
+
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_by_metadata(table, row_id)
+
+    def get_row_ids(self, table: str) -> set:
+        """테이블 행을 청크로 인덱싱한 포인트의 row_id 집합 (chunk_index/row_id가 없는 포인트 제외)"""
+        with self._lock:
+            rows = np.flatnonzero(self._filter_mask(build_filter({"table": table}), len(self._ids)))
+            return {
+                self._payloads[row]["row_id"] for row in rows
+                if self._payloads[row].get("chunk_index") is not None and self._payloads[row].get("row_id") is not None
+            }
+
+    def delete_rows(self, table: str, row_ids: List[Any], batch_size: int = 1000) -> int:
+        """테이블의 여러 레코드에 해당하는 벡터를 한 번에 삭제 (batch_size는 인터페이스 호환용)"""
+        row_ids = list(row_ids)
+        if row_ids:
+            with self._lock:
+                mask = self._filter_mask(build_filter({"table": table, "row_id": row_ids}), len(self._ids))
+                self.deleted_points += self._delete_rows(np.flatnonzero(mask))
+
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_rows(table, row_ids)
+        return len(row_ids)
+
+    def delete_all(self):
+        """저장소의 모든 벡터 삭제"""
+        with self._lock:
+            self._alive[:] = False
+            self._ids = []
+            self._payloads = []
+            self._id_to_row = {}
+            self._reset_columns(len(self._vectors))
+        return True
+
+    def create_shadow(self, mirror_writes: bool = True) -> "NumpyVectorStore":
+        """재구축용 빈 저장소 생성 (mirror_writes면 재구축 중 실시간 쓰기도 함께 반영)"""
+        shadow = NumpyVectorStore(
+            collection_name=self.collection_name,
+            vector_size=self.vector_size,
+            initial_capacity=len(self._vectors)
+        )
+        if mirror_writes:
+            self._mirror = shadow
+        return shadow
+
+    def copy_non_table_points(self, target: "NumpyVectorStore") -> int:
+        """테이블 청크가 아닌 포인트(chunk_index가 없는 채팅 기록 등)를 ID, 벡터, 페이로드 그대로 대상 저장소에 복사"""
+        with self._lock:
+            rows = [row for row in self._id_to_row.values() if self._payloads[row].get("chunk_index") is None]
+            if not rows:
+                return 0
+            ids = [self._ids[row] for row in rows]
+            vectors = self._vectors[rows].copy()
+            metadatas = [dict(self._payloads[row]) for row in rows]
+        target.bulk_upsert(vectors, metadatas, ids=ids)
+        return len(ids)
+
+    def promote_shadow(self, shadow: "NumpyVectorStore", expected_count: Optional[int] = None, keep_old: bool = False) -> Dict[str, Any]:
+        """
+        섀도의 내용을 검증한 뒤 현재 저장소의 내용과 한 번에 교체 (keep_old는 인터페이스 호환용)
+
+        섀도는 DB 테이블로만 재구축되므로 교체 전에 테이블 청크가 아닌 포인트(채팅 기록)를 섀도로 복사한다.
+        검증은 테이블 청크 수로 하며, 재구축 중 미러링으로 삭제된 포인트만큼은 적어도 통과한다.
+        """
+        table_count = shadow.count_table_points()
+        if expected_count is not None and table_count < expected_count - shadow.deleted_points:
+            self.drop_shadow(shadow)
+            raise ValueError(f"Shadow has {table_count} table points, expected at least {expected_count} - {shadow.deleted_points} deleted during rebuild")
+
+        self.copy_non_table_points(shadow)
+        shadow_count = shadow.count()
+        previous = self.count()
+        with self._lock, shadow._lock:
+            self._mirror = None
+            for attribute in ("_vectors", "_alive", "_ids", "_payloads", "_id_to_row", "_columns"):
+                setattr(self, attribute, getattr(shadow, attribute))
+            self.deleted_points = 0
+        self.save()
+        return {"alias": self.collection_name, "collection": self.collection_name, "count": shadow_count, "previous": previous}
+
+    def migrate_to_alias(self) -> Dict[str, Any]:
+        """별칭 전환 (교체가 항상 원자적이므로 할 일 없음, 인터페이스 호환용)"""
+        return {"alias": self.collection_name, "collection": self.collection_name, "migrated": False}
+
+    def drop_shadow(self, shadow: "NumpyVectorStore") -> None:
+        """재구축 실패 시 섀도 폐기"""
+        if self._mirror is shadow:
+            self._mirror = None
+
+    def export_snapshot(self, directory: str, batch_size: int = 10000) -> Dict[str, Any]:
+        """살아 있는 행을 스냅샷 파일로 내보내기 (vectordb/snapshot.py 형식)"""
+        start_time = time.perf_counter()
+        with self._lock:
+            self._compact()
+            writer = SnapshotWriter(directory, self.collection_name, self.vector_size)
+            for begin in range(0, len(self._ids), batch_size):
+                end = min(begin + batch_size, len(self._ids))
+                writer.write(self._ids[begin:end], self._vectors[begin:end], self._payloads[begin:end])
+            count = writer.close()
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Exported {count} points from {self.collection_name} to {directory} ({elapsed:.2f}s)")
+        return {"count": count, "elapsed": elapsed, "points_per_second": count / elapsed if elapsed > 0 else 0.0}
+
+    def import_snapshot(self, directory: str, name: Optional[str] = None, batch_size: int = 10000) -> Dict[str, Any]:
+        """스냅샷을 대량 업서트 경로로 불러오기 (포인트 ID는 스냅샷 값 그대로 사용)"""
+        start_time = time.perf_counter()
+        header, batches = read_snapshot(directory, name or self.collection_name, batch_size)
+        if header["dim"] != self.vector_size:
+            raise ValueError(f"Snapshot dim {header['dim']} does not match store dim {self.vector_size}")
+
+        count = 0
+        for ids, vectors, payloads in batches:
+            count += self.bulk_upsert(vectors, payloads, ids=ids)["inserted"]
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Imported {count} points into {self.collection_name} from {directory} ({elapsed:.2f}s)")
+        return {"count": count, "elapsed": elapsed, "points_per_second": count / elapsed if elapsed > 0 else 0.0}
+
+    def save(self) -> Optional[Dict[str, Any]]:
+        """snapshot_dir에 스냅샷 저장 (snapshot_dir가 없으면 저장하지 않음)"""
+        if not self.snapshot_dir:
+            return None
+        return self.export_snapshot(self.snapshot_dir)
+
+    def load(self) -> int:
+        """snapshot_dir의 스냅샷을 불러와 현재 내용을 대체"""
+        self.delete_all()
+        return self.import_snapshot(self.snapshot_dir)["count"]
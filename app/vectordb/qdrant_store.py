@@ -1,82 +1,648 @@
 # vectorstore/qdrant_store.py
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Union
+from vectordb.snapshot import SnapshotWriter, read_snapshot
+import asyncio
+import hashlib
+import time
+import weakref
 import numpy as np
 import uuid
 
+# 필터 검색/삭제에 사용하는 페이로드 필드 인덱스
+PAYLOAD_INDEXES = {
+    "table": models.PayloadSchemaType.KEYWORD,
+    "row_id": models.PayloadSchemaType.INTEGER,
+    "user_id": models.PayloadSchemaType.INTEGER,
+    "session_id": models.PayloadSchemaType.KEYWORD,
+    "timestamp": models.PayloadSchemaType.FLOAT,
+    "chunk_index": models.PayloadSchemaType.INTEGER,
+}
+
+# Qdrant 기본 인덱싱 임계값 (KB, 섀도 빌드 중에는 0으로 꺼두었다가 교체 전에 복원)
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# 청크별 결정적 포인트 ID 생성을 위한 네임스페이스
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "vectordb.chatbot")
+
+def point_id_for(metadata: Dict[str, Any]) -> str:
+    """(table, row_id, chunk_index)로 결정적 포인트 ID 생성 (정보가 없으면 임의 ID)"""
+    table = metadata.get("table")
+    row_id = metadata.get("row_id")
+    chunk_index = metadata.get("chunk_index")
+    if table is None or row_id is None or chunk_index is None:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{table}:{row_id}:{chunk_index}"))
+
+def content_hash(text: str) -> str:
+    """청크 원문 텍스트의 해시 (재인덱싱 시 바뀌지 않은 청크를 건너뛰는 데 사용)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def build_filter(filters: Optional[Any]) -> Optional[models.Filter]:
+    """
+    딕셔너리 형태의 조건을 Qdrant 필터로 변환
+    
+    예: {"user_id": 3, "table": ["schedule", "habit"], "timestamp": {"gte": 1700000000}}
+        - 단일 값: 일치 조건 (MatchValue)
+        - 리스트: 하나라도 일치 (MatchAny)
+        - gt/gte/lt/lte 딕셔너리: 범위 조건 (Range)
+    models.Filter가 주어지면 그대로 반환한다.
+    """
+    if filters is None or isinstance(filters, models.Filter):
+        return filters
+    
+    conditions = []
+    for key, value in filters.items():
+        if isinstance(value, dict):
+            conditions.append(models.FieldCondition(key=key, range=models.Range(**value)))
+        elif isinstance(value, (list, tuple, set)):
+            conditions.append(models.FieldCondition(key=key, match=models.MatchAny(any=list(value))))
+        else:
+            conditions.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
+    
+    return models.Filter(must=conditions) if conditions else None
+
 class QdrantVectorStore:
-    def __init__(self, collection_name: str = "chatbot_vectors", vector_size: int = 384):
-        """Qdrant 벡터 저장소 초기화"""
-        self.client = QdrantClient(host="localhost", port=6333)
+    def __init__(self,
+                 collection_name: str = "chatbot_vectors",
+                 vector_size: int = 384,
+                 host: str = "localhost",
+                 port: int = 6333,
+                 grpc_port: int = 6334,
+                 prefer_grpc: bool = False,
+                 upsert_batch_size: int = 256,
+                 upsert_parallel: int = 4,
+                 quantization: Optional[str] = None,
+                 quantization_always_ram: bool = True,
+                 quantization_quantile: float = 0.99,
+                 search_oversampling: float = 2.0,
+                 search_rescore: bool = True,
+                 hnsw_m: int = 16,
+                 hnsw_ef_construct: int = 100,
+                 hnsw_ef: Optional[int] = None,
+                 exact: bool = False,
+                 indexed_only: bool = False,
+                 use_alias: bool = False):
+        """
+        Qdrant 벡터 저장소 초기화
+        
+        Args:
+            prefer_grpc: True면 REST 대신 gRPC로 통신 (대량 업서트 시 직렬화 비용 감소)
+            upsert_batch_size: bulk_upsert의 요청당 포인트 수
+            upsert_parallel: bulk_upsert에서 동시에 진행 중인 요청 수
+            quantization: None(float32), "scalar"(int8) 또는 "binary"
+                양자화 시 원본 벡터는 디스크(mmap)에 두고 양자화 벡터만 RAM에 유지
+            quantization_always_ram: 양자화 벡터를 항상 RAM에 유지
+            quantization_quantile: scalar 양자화 범위 계산에 사용할 분위수
+            search_oversampling: 양자화 검색 시 top_k의 몇 배를 후보로 뽑을지
+            search_rescore: 후보를 원본 벡터로 다시 점수 계산할지 여부
+            hnsw_m: 새 컬렉션 HNSW 그래프의 노드당 연결 수
+            hnsw_ef_construct: 새 컬렉션 인덱싱 시 탐색 폭
+            hnsw_ef: 검색 시 기본 탐색 폭 (None이면 Qdrant 기본값, 클수록 recall↑ 지연↑)
+            exact: 기본적으로 HNSW 대신 전수 탐색할지 여부
+            indexed_only: 기본적으로 아직 인덱싱되지 않은 세그먼트를 건너뛸지 여부
+            use_alias: 컬렉션이 없을 때 버전 컬렉션({이름}_v{시각})과 같은 이름의 별칭으로 생성
+                (재구축 시 별칭만 원자적으로 교체되도록, 서비스용 저장소에서 사용)
+        """
+        if quantization not in (None, "scalar", "binary"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        # 섀도 컬렉션을 같은 설정으로 만들기 위해 생성 인자 보관
+        self._options = {
+            key: value for key, value in locals().items()
+            if key not in ("self", "collection_name", "use_alias")
+        }
+        self.host = host
+        self.port = port
+        self.grpc_port = grpc_port
+        self.prefer_grpc = prefer_grpc
+        self.client = QdrantClient(host=host, port=port, grpc_port=grpc_port, prefer_grpc=prefer_grpc)
         self.collection_name = collection_name
         self.vector_size = vector_size
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_parallel = upsert_parallel
+        self.quantization = quantization
+        self.quantization_always_ram = quantization_always_ram
+        self.quantization_quantile = quantization_quantile
+        self.search_oversampling = search_oversampling
+        self.search_rescore = search_rescore
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.exact = exact
+        self.indexed_only = indexed_only
+        # 대량 업서트 요청을 동시에 보내기 위한 실행기
+        self._upsert_executor = ThreadPoolExecutor(max_workers=upsert_parallel, thread_name_prefix="qdrant-upsert")
+        
+        # 비동기 클라이언트는 이벤트 루프마다 하나씩 지연 생성
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncQdrantClient]" = weakref.WeakKeyDictionary()
+        
+        # 섀도 빌드 중 실시간 쓰기를 함께 반영할 저장소
+        self._mirror: Optional["QdrantVectorStore"] = None
+        # 섀도는 미러링으로 삭제된 포인트 수를 세어 교체 전 검증에 반영
+        self._track_deletes = False
+        self.deleted_points = 0
         
-        # 컬렉션이 존재하는지 확인하고 없으면 생성
+        # 컬렉션(또는 별칭)이 존재하는지 확인하고 없으면 생성
         collections = self.client.get_collections().collections
         collection_names = [collection.name for collection in collections]
         
-        if self.collection_name not in collection_names:
-            self._create_collection()
+        if self.collection_name not in collection_names and self._alias_target() is None:
+            if use_alias:
+                physical_name = f"{self.collection_name}_v{time.strftime('%Y%m%d%H%M%S')}"
+                self._create_collection(physical_name)
+                self.client.update_collection_aliases(change_aliases_operations=[models.CreateAliasOperation(
+                    create_alias=models.CreateAlias(collection_name=physical_name, alias_name=self.collection_name)
+                )])
+            else:
+                self._create_collection()
+        else:
+            # 기존 컬렉션에 누락된 페이로드 인덱스 추가 및 양자화 설정 반영 (마이그레이션)
+            self.migrate_payload_indexes()
+            self.migrate_quantization()
     
-    def _create_collection(self):
-        """HNSW 인덱스를 사용하는 새 컬렉션 생성"""
+    def _create_collection(self, collection_name: Optional[str] = None):
+        """HNSW 인덱스를 사용하는 새 컬렉션 생성 (collection_name이 없으면 self.collection_name)"""
         self.client.create_collection(
-            collection_name=self.collection_name,
+            collection_name=collection_name or self.collection_name,
             vectors_config=models.VectorParams(
                 size=self.vector_size,
                 distance=models.Distance.COSINE,
+                on_disk=self.quantization is not None  # 양자화 시 원본 벡터는 디스크에 보관
             ),
             hnsw_config=models.HnswConfigDiff(
-                m=16,                 # HNSW 그래프의 최대 연결 수
-                ef_construct=100,     # 인덱싱 품질 (높을수록 품질↑, 속도↓)
+                m=self.hnsw_m,                      # HNSW 그래프의 최대 연결 수
+                ef_construct=self.hnsw_ef_construct,  # 인덱싱 품질 (높을수록 품질↑, 속도↓)
                 full_scan_threshold=10000  # 전체 스캔 임계값
+            ),
+            quantization_config=self._quantization_config()
+        )
+        self.migrate_payload_indexes()
+    
+    def _quantization_config(self):
+        """설정에 맞는 양자화 설정 반환 (양자화하지 않으면 None)"""
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.quantization_quantile,
+                    always_ram=self.quantization_always_ram
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
             )
+        return None
+    
+    def _search_params(self,
+                       hnsw_ef: Optional[int] = None,
+                       exact: Optional[bool] = None,
+                       indexed_only: Optional[bool] = None) -> Optional[models.SearchParams]:
+        """
+        검색 파라미터 생성 (인자가 None이면 저장소 기본값 사용)
+        
+        양자화 컬렉션은 oversampling 후 원본 벡터로 rescore한다.
+        """
+        hnsw_ef = self.hnsw_ef if hnsw_ef is None else hnsw_ef
+        exact = self.exact if exact is None else exact
+        indexed_only = self.indexed_only if indexed_only is None else indexed_only
+        
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(
+                ignore=False,
+                rescore=self.search_rescore,
+                oversampling=self.search_oversampling
+            )
+        
+        if hnsw_ef is None and not exact and not indexed_only and quantization is None:
+            return None
+        return models.SearchParams(
+            hnsw_ef=hnsw_ef,
+            exact=exact,
+            indexed_only=indexed_only,
+            quantization=quantization
+        )
+    
+    def migrate_quantization(self) -> bool:
+        """
+        기존 컬렉션의 양자화 설정을 현재 설정과 맞춤
+        
+        양자화 벡터는 Qdrant 옵티마이저가 백그라운드에서 다시 만들며, 그동안에도 검색은 가능하다.
+        
+        Returns:
+            설정을 변경했으면 True
+        """
+        physical_name = self.physical_name()
+        collection_info = self.client.get_collection(physical_name)
+        current = collection_info.config.quantization_config
+        desired = self._quantization_config()
+        
+        if self.quantization == "scalar":
+            matches = isinstance(current, models.ScalarQuantization) and current.scalar.always_ram == self.quantization_always_ram
+        elif self.quantization == "binary":
+            matches = isinstance(current, models.BinaryQuantization) and current.binary.always_ram == self.quantization_always_ram
+        else:
+            matches = current is None
+        if matches:
+            return False
+        
+        self.client.update_collection(
+            collection_name=physical_name,
+            vectors_config={"": models.VectorParamsDiff(on_disk=self.quantization is not None)},
+            quantization_config=desired if desired is not None else models.Disabled.DISABLED
         )
+        print(f"Updated quantization of {physical_name}: {type(current).__name__ if current else None} -> {self.quantization}")
+        return True
     
-    def add_embeddings(self, embeddings: List[np.ndarray], metadatas: List[Dict[str, Any]]):
-        """임베딩 벡터와 메타데이터 추가"""
+    def migrate_payload_indexes(self) -> List[str]:
+        """
+        PAYLOAD_INDEXES 중 컬렉션에 없는 페이로드 인덱스 생성
+        
+        Returns:
+            새로 생성한 필드 이름 리스트
+        """
+        physical_name = self.physical_name()
+        collection_info = self.client.get_collection(physical_name)
+        existing = set((collection_info.payload_schema or {}).keys())
+        
+        created = []
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            self.client.create_payload_index(
+                collection_name=physical_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True
+            )
+            created.append(field_name)
+        
+        if created:
+            print(f"Created payload indexes on {physical_name}: {created}")
+        return created
+    
+    def add_embeddings(self, embeddings: Union[np.ndarray, List[np.ndarray]], metadatas: List[Dict[str, Any]]):
+        """
+        임베딩 벡터와 메타데이터 추가 (같은 청크는 같은 ID로 덮어쓰기)
+        
+        table/row_id/chunk_index가 있는 청크는 결정적 ID를 사용하므로 재인덱싱해도 중복되지 않고,
+        행의 마지막 청크가 포함된 경우 그 행에서 줄어든 나머지 청크를 함께 삭제한다.
+        """
         if len(embeddings) == 0:
-            return
+            return {"inserted": 0, "ids": []}
+        return self.bulk_upsert(np.asarray(embeddings, dtype=np.float32), metadatas)
+    
+    def bulk_upsert(self,
+                    vectors: np.ndarray,
+                    metadatas: List[Dict[str, Any]],
+                    batch_size: Optional[int] = None,
+                    parallel: Optional[int] = None,
+                    ids: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        (N, dim) float32 배열을 배치로 나눠 대량 업서트
         
-        # 각 임베딩에 대한 고유 ID 생성
-        ids = [str(uuid.uuid4()) for _ in range(len(embeddings))]
+        마지막 배치를 제외한 배치는 wait=False로 최대 parallel개까지 동시에 보내고,
+        모두 접수된 뒤 마지막 배치(남은 청크 삭제 포함)를 wait=True로 보내 일관성 장벽으로 사용한다.
+        Qdrant는 업데이트를 순서대로 적용하므로 반환 시점에는 모든 배치가 반영되어 있다.
+        ids를 주면 그대로 사용하고, 없으면 메타데이터로부터 결정적 ID를 생성한다.
         
-        # 점수 및 페이로드 준비
-        vectors = [embedding.tolist() for embedding in embeddings]
-        payloads = []
+        Returns:
+            inserted, ids, batches, elapsed(초), points_per_second
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(metadatas):
+            raise ValueError(f"vectors shape {vectors.shape} does not match {len(metadatas)} metadatas")
+        if vectors.shape[0] == 0:
+            return {"inserted": 0, "ids": [], "batches": 0, "elapsed": 0.0, "points_per_second": 0.0}
         
-        for i, metadata in enumerate(metadatas):
-            # 메타데이터에 원본 텍스트 추가
-            payloads.append({
-                **metadata,
-                "vector_id": ids[i]
-            })
+        batch_size = batch_size or self.upsert_batch_size
+        parallel = max(1, parallel or self.upsert_parallel)
+        start_time = time.perf_counter()
+        
+        # 각 임베딩에 대한 ID 생성 (청크 정보가 없으면 임의 ID)
+        if ids is None:
+            ids = [point_id_for(metadata) for metadata in metadatas]
+        payloads = [{**metadata, "vector_id": point_id} for metadata, point_id in zip(metadatas, ids)]
+        bounds = [(i, min(i + batch_size, len(ids))) for i in range(0, len(ids), batch_size)]
+        
+        # 마지막 배치 전까지는 응답을 기다리지 않고 최대 parallel개 요청을 유지
+        in_flight: List[Future] = []
+        for begin, end in bounds[:-1]:
+            if len(in_flight) >= parallel:
+                in_flight.pop(0).result()
+            in_flight.append(self._upsert_executor.submit(
+                self._send_batch, ids[begin:end], vectors[begin:end], payloads[begin:end], [], False
+            ))
+        for future in in_flight:
+            future.result()
+        
+        # 마지막 배치 + 남은 청크 삭제를 wait=True로 전송 (일관성 장벽)
+        begin, end = bounds[-1]
+        self._send_batch(ids[begin:end], vectors[begin:end], payloads[begin:end], self._trailing_chunk_deletes(metadatas), True)
         
-        # Qdrant에 데이터 추가
-        self.client.upsert(
+        # 섀도 빌드 중이면 같은 ID로 섀도 컬렉션에도 기록
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.bulk_upsert(vectors, metadatas, batch_size=batch_size, parallel=parallel, ids=ids)
+        
+        elapsed = time.perf_counter() - start_time
+        points_per_second = len(ids) / elapsed if elapsed > 0 else 0.0
+        print(f"Upserted {len(ids)} points in {len(bounds)} batches ({elapsed:.2f}s, {points_per_second:.0f} points/s)")
+        
+        return {
+            "inserted": len(ids),
+            "ids": ids,
+            "batches": len(bounds),
+            "elapsed": elapsed,
+            "points_per_second": points_per_second
+        }
+    
+    def _send_batch(self,
+                    ids: List[str],
+                    vectors: np.ndarray,
+                    payloads: List[Dict[str, Any]],
+                    extra_operations: List[Any],
+                    wait: bool) -> None:
+        """업서트 배치 하나와 추가 작업을 한 번의 요청으로 전송"""
+        operations = [
+            models.UpsertOperation(
+                upsert=models.PointsBatch(
+                    batch=models.Batch(
+                        ids=ids,
+                        # 연속 배열 슬라이스를 한 번에 변환
+                        vectors=vectors.tolist(),
+                        payloads=payloads
+                    )
+                )
+            )
+        ]
+        operations.extend(extra_operations)
+        self.client.batch_update_points(
             collection_name=self.collection_name,
-            points=models.Batch(
-                ids=ids,
-                vectors=vectors,
-                payloads=payloads
+            update_operations=operations,
+            wait=wait
+        )
+    
+    def _trailing_chunk_deletes(self, metadatas: List[Dict[str, Any]]) -> List[models.DeleteOperation]:
+        """행의 마지막 청크가 포함된 경우, chunk_index >= total_chunks인 이전 청크 삭제 작업 생성"""
+        operations = []
+        for metadata in metadatas:
+            total_chunks = metadata.get("total_chunks")
+            if total_chunks is None or metadata.get("chunk_index") != total_chunks - 1:
+                continue
+            if metadata.get("table") is None or metadata.get("row_id") is None:
+                continue
+            operations.append(
+                models.DeleteOperation(
+                    delete=models.FilterSelector(
+                        filter=models.Filter(
+                            must=[
+                                models.FieldCondition(key="table", match=models.MatchValue(value=metadata["table"])),
+                                models.FieldCondition(key="row_id", match=models.MatchValue(value=metadata["row_id"])),
+                                models.FieldCondition(key="chunk_index", range=models.Range(gte=total_chunks))
+                            ]
+                        )
+                    )
+                )
             )
+        return operations
+    
+    def delete_trailing_chunks(self, metadatas: List[Dict[str, Any]]) -> None:
+        """
+        업서트 없이 행의 줄어든 청크만 삭제 (마지막 청크가 바뀌지 않아 업서트를 건너뛴 경우)
+        
+        metadatas에는 각 행의 마지막 청크 메타데이터를 넣는다.
+        """
+        operations = self._trailing_chunk_deletes(metadatas)
+        if operations:
+            self.client.batch_update_points(
+                collection_name=self.collection_name,
+                update_operations=operations,
+                wait=True
+            )
+        
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_trailing_chunks(metadatas)
+    
+    def update_payloads(self, updates: Dict[Any, Dict[str, Any]]) -> None:
+        """벡터는 그대로 두고 포인트별 페이로드 필드만 갱신 (ID -> 바꿀 필드)"""
+        if not updates:
+            return
+        operations = [
+            models.SetPayloadOperation(set_payload=models.SetPayload(payload=payload, points=[point_id]))
+            for point_id, payload in updates.items()
+        ]
+        self.client.batch_update_points(
+            collection_name=self.collection_name,
+            update_operations=operations,
+            wait=True
         )
         
-        return {"inserted": len(ids), "ids": ids}
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.update_payloads(updates)
+    
+    def export_snapshot(self, directory: str, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        컬렉션의 모든 벡터와 페이로드를 스냅샷 파일로 내보내기 (vectordb/snapshot.py 형식)
+        
+        Returns:
+            count, elapsed(초), points_per_second
+        """
+        start_time = time.perf_counter()
+        # 벡터 차원은 실제 컬렉션 설정을 따름
+        dim = self.client.get_collection(self.physical_name()).config.params.vectors.size
+        writer = SnapshotWriter(directory, self.collection_name, dim)
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            if points:
+                writer.write(
+                    [point.id for point in points],
+                    np.asarray([point.vector for point in points], dtype=np.float32),
+                    [point.payload or {} for point in points]
+                )
+            if offset is None:
+                break
+        count = writer.close()
+        
+        elapsed = time.perf_counter() - start_time
+        print(f"Exported {count} points from {self.collection_name} to {directory} ({elapsed:.2f}s)")
+        return {"count": count, "elapsed": elapsed, "points_per_second": count / elapsed if elapsed > 0 else 0.0}
+    
+    def import_snapshot(self, directory: str, name: Optional[str] = None, batch_size: int = 10000) -> Dict[str, Any]:
+        """
+        스냅샷을 대량 업서트 경로로 불러오기 (임베딩 모델/번역 없이 재구축)
+        
+        포인트 ID는 스냅샷에 저장된 값을 그대로 사용한다.
+        
+        Args:
+            name: 스냅샷 이름 (None이면 컬렉션 이름)
+            batch_size: 한 번에 읽어 bulk_upsert로 넘길 포인트 수
+        """
+        start_time = time.perf_counter()
+        header, batches = read_snapshot(directory, name or self.collection_name, batch_size)
+        if header["dim"] != self.vector_size:
+            raise ValueError(f"Snapshot dim {header['dim']} does not match collection dim {self.vector_size}")
+        
+        count = 0
+        for ids, vectors, payloads in batches:
+            count += self.bulk_upsert(vectors, payloads, ids=ids)["inserted"]
+        
+        elapsed = time.perf_counter() - start_time
+        print(f"Imported {count} points into {self.collection_name} from {directory} ({elapsed:.2f}s)")
+        return {"count": count, "elapsed": elapsed, "points_per_second": count / elapsed if elapsed > 0 else 0.0}
+    
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """현재 이벤트 루프에 묶인 비동기 클라이언트 반환"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncQdrantClient(host=self.host, port=self.port, grpc_port=self.grpc_port, prefer_grpc=self.prefer_grpc)
+            self._async_clients[loop] = client
+        return client
+    
+    def _payload_selector(self, payload_fields: Optional[List[str]]):
+        """반환할 페이로드 필드 선택 (None이면 전체 페이로드)"""
+        if payload_fields is None:
+            return True
+        return models.PayloadSelectorInclude(include=payload_fields)
     
-    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
-        """쿼리 벡터와 유사한 벡터 검색"""
+    def search(self,
+               query_embedding: np.ndarray,
+               top_k: int = 5,
+               score_threshold: Optional[float] = None,
+               payload_fields: Optional[List[str]] = None,
+               filters: Optional[Any] = None,
+               search_params: Optional[models.SearchParams] = None,
+               hnsw_ef: Optional[int] = None,
+               exact: Optional[bool] = None,
+               indexed_only: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        쿼리 벡터와 유사한 벡터 검색
+        
+        Args:
+            query_embedding: 쿼리 벡터
+            top_k: 반환할 최대 결과 수
+            score_threshold: 이 점수 미만 결과는 서버에서 제외
+            payload_fields: 반환할 페이로드 필드 (None이면 전체 페이로드)
+            filters: 페이로드 조건 (build_filter 형식 또는 models.Filter), HNSW 탐색 중에 적용
+            search_params: 검색 파라미터 객체 (주어지면 아래 인자보다 우선)
+            hnsw_ef: HNSW 탐색 폭 (None이면 기본값)
+            exact: True면 전수 탐색 (정확도 기준선/소규모 필터 결과용)
+            indexed_only: True면 인덱싱이 끝나지 않은 세그먼트 제외 (대량 적재 중 지연 안정화)
+        """
         query_vector = query_embedding.tolist()
         
         # 검색 수행
         search_result = self.client.search(
             collection_name=self.collection_name,
             query_vector=query_vector,
-            limit=top_k
+            query_filter=build_filter(filters),
+            limit=top_k,
+            score_threshold=score_threshold,
+            with_payload=self._payload_selector(payload_fields),
+            search_params=search_params or self._search_params(hnsw_ef, exact, indexed_only)
+        )
+        
+        return self._format_hits(search_result)
+    
+    async def search_async(self,
+                           query_embedding: np.ndarray,
+                           top_k: int = 5,
+                           score_threshold: Optional[float] = None,
+                           payload_fields: Optional[List[str]] = None,
+                           filters: Optional[Any] = None,
+                           search_params: Optional[models.SearchParams] = None,
+                           hnsw_ef: Optional[int] = None,
+                           exact: Optional[bool] = None,
+                           indexed_only: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """쿼리 벡터와 유사한 벡터 검색 (이벤트 루프를 막지 않는 비동기 버전)"""
+        query_vector = query_embedding.tolist()
+        
+        search_result = await self._get_async_client().search(
+            collection_name=self.collection_name,
+            query_vector=query_vector,
+            query_filter=build_filter(filters),
+            limit=top_k,
+            score_threshold=score_threshold,
+            with_payload=self._payload_selector(payload_fields),
+            search_params=search_params or self._search_params(hnsw_ef, exact, indexed_only)
+        )
+        
+        return self._format_hits(search_result)
+    
+    def search_batch(self,
+                     query_embeddings: np.ndarray,
+                     top_k: int = 5,
+                     score_threshold: Optional[float] = None,
+                     payload_fields: Optional[List[str]] = None,
+                     filters: Optional[Any] = None,
+                     search_params: Optional[models.SearchParams] = None,
+                     hnsw_ef: Optional[int] = None,
+                     exact: Optional[bool] = None,
+                     indexed_only: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리 벡터를 한 번의 요청으로 검색"""
+        if len(query_embeddings) == 0:
+            return []
+        
+        query_filter = build_filter(filters)
+        search_params = search_params or self._search_params(hnsw_ef, exact, indexed_only)
+        requests = [
+            models.SearchRequest(
+                vector=query_embedding.tolist(),
+                filter=query_filter,
+                limit=top_k,
+                with_payload=self._payload_selector(payload_fields),
+                score_threshold=score_threshold,
+                params=search_params
+            )
+            for query_embedding in query_embeddings
+        ]
+        
+        batch_result = self.client.search_batch(
+            collection_name=self.collection_name,
+            requests=requests
         )
         
-        # 결과 정리
+        return [self._format_hits(search_result) for search_result in batch_result]
+    
+    def retrieve_payloads(self, ids: List[Any], payload_fields: Optional[List[str]] = None) -> Dict[Any, Dict[str, Any]]:
+        """ID 목록의 페이로드를 한 번에 조회 (payload_fields가 없으면 전체 페이로드)"""
+        if not ids:
+            return {}
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=ids,
+            with_payload=self._payload_selector(payload_fields),
+            with_vectors=False
+        )
+        return {point.id: point.payload for point in points}
+    
+    async def retrieve_payloads_async(self, ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """ID 목록의 전체 페이로드를 한 번에 조회 (비동기 버전)"""
+        if not ids:
+            return {}
+        points = await self._get_async_client().retrieve(
+            collection_name=self.collection_name,
+            ids=ids,
+            with_payload=True,
+            with_vectors=False
+        )
+        return {point.id: point.payload for point in points}
+    
+    def _format_hits(self, search_result) -> List[Dict[str, Any]]:
+        """검색 결과를 딕셔너리 리스트로 변환"""
         results = []
         for hit in search_result:
             results.append({
@@ -89,8 +655,24 @@ class QdrantVectorStore:
     
     def count(self) -> int:
         """저장된 벡터 수 반환"""
-        collection_info = self.client.get_collection(self.collection_name)
-        return collection_info.vectors_count
+        return self.client.count(collection_name=self.collection_name, exact=True).count
+    
+    def count_table_points(self) -> int:
+        """테이블 행 청크(chunk_index가 있는 포인트) 수 반환"""
+        return self.client.count(
+            collection_name=self.collection_name,
+            count_filter=models.Filter(
+                must_not=[models.IsEmptyCondition(is_empty=models.PayloadField(key="chunk_index"))]
+            ),
+            exact=True
+        ).count
+    
+    def _count_deletes(self, filter_obj: models.Filter) -> None:
+        """섀도이면 삭제될 포인트 수를 deleted_points에 누적"""
+        if self._track_deletes:
+            self.deleted_points += self.client.count(
+                collection_name=self.collection_name, count_filter=filter_obj, exact=True
+            ).count
     
     def delete_by_metadata(self, table: str, row_id: int):
         """특정 테이블과 레코드 ID에 해당하는 모든 벡터 삭제"""
@@ -107,11 +689,58 @@ class QdrantVectorStore:
             ]
         )
         
+        self._count_deletes(filter_obj)
         self.client.delete(
             collection_name=self.collection_name,
             points_selector=models.FilterSelector(filter=filter_obj)
         )
         
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_by_metadata(table, row_id)
+        
+    def get_row_ids(self, table: str, batch_size: int = 10000) -> set:
+        """
+        테이블 행을 청크로 인덱싱한 포인트의 row_id 집합 (row_id 페이로드만 스크롤)
+        
+        chunk_index가 없는 포인트(채팅 기록 등 같은 table 값을 쓰는 다른 데이터)와 row_id가 없는 포인트는 제외한다.
+        """
+        row_ids = set()
+        offset = None
+        scroll_filter = models.Filter(
+            must=[models.FieldCondition(key="table", match=models.MatchValue(value=table))],
+            must_not=[models.IsEmptyCondition(is_empty=models.PayloadField(key="chunk_index"))]
+        )
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=models.PayloadSelectorInclude(include=["row_id"]),
+                with_vectors=False
+            )
+            row_ids.update(point.payload["row_id"] for point in points if point.payload and point.payload.get("row_id") is not None)
+            if offset is None:
+                break
+        return row_ids
+    
+    def delete_rows(self, table: str, row_ids: List[Any], batch_size: int = 1000) -> int:
+        """테이블의 여러 레코드에 해당하는 벡터를 한 번에 삭제"""
+        row_ids = list(row_ids)
+        for i in range(0, len(row_ids), batch_size):
+            filter_obj = build_filter({"table": table, "row_id": row_ids[i:i+batch_size]})
+            self._count_deletes(filter_obj)
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=filter_obj)
+            )
+        
+        mirror = self._mirror
+        if mirror is not None:
+            mirror.delete_rows(table, row_ids, batch_size)
+        return len(row_ids)
+    
     def delete_all(self):
         """컬렉션의 모든 벡터 삭제"""
         try:
@@ -125,4 +754,178 @@ class QdrantVectorStore:
             return True
         except Exception as e:
             print(f"데이터 삭제 중 오류 발생: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _alias_target(self) -> Optional[str]:
+        """collection_name이 별칭이면 가리키는 컬렉션 이름, 아니면 None"""
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return None
+    
+    def physical_name(self) -> str:
+        """별칭을 해석한 실제 컬렉션 이름"""
+        return self._alias_target() or self.collection_name
+    
+    def _wait_until_green(self, collection_name: str, timeout: float = 3600) -> None:
+        """옵티마이저가 인덱싱을 마칠 때까지 대기"""
+        deadline = time.time() + timeout
+        while self.client.get_collection(collection_name).status != models.CollectionStatus.GREEN:
+            if time.time() > deadline:
+                raise TimeoutError(f"Collection {collection_name} was not indexed within {timeout}s")
+            time.sleep(1)
+    
+    def create_shadow(self, mirror_writes: bool = True) -> "QdrantVectorStore":
+        """
+        재구축용 섀도 컬렉션 생성 (blue/green)
+        
+        같은 설정의 버전 컬렉션({별칭}_v{시각})을 만들고, 적재 중에는 HNSW 인덱싱을 꺼서
+        최대 속도로 쓸 수 있게 한다. 서비스 중인 컬렉션과 세그먼트를 공유하지 않으므로 검색과 경합하지 않는다.
+        collection_name이 별칭이어야 교체가 원자적이므로, 별칭 도입 전의 실제 컬렉션이면 먼저 migrate_to_alias를 실행해야 한다.
+        
+        Args:
+            mirror_writes: 재구축 중 실시간 쓰기(채팅 기록 등)를 섀도에도 반영할지 여부
+        """
+        if self._alias_target() is None:
+            raise ValueError(f"{self.collection_name} is a collection, not an alias; run migrate_to_alias() once before rebuilding")
+        return self._new_shadow(mirror_writes)
+    
+    def _new_shadow(self, mirror_writes: bool) -> "QdrantVectorStore":
+        """인덱싱을 끈 버전 컬렉션 생성"""
+        shadow_name = f"{self.collection_name}_v{time.strftime('%Y%m%d%H%M%S')}"
+        shadow = QdrantVectorStore(collection_name=shadow_name, **self._options)
+        shadow.client.update_collection(
+            collection_name=shadow_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        shadow._track_deletes = True
+        if mirror_writes:
+            self._mirror = shadow
+        print(f"Created shadow collection {shadow_name}")
+        return shadow
+    
+    def _copy_points(self, target: "QdrantVectorStore", scroll_filter: Optional[models.Filter], batch_size: int = 1000) -> int:
+        """조건에 맞는 포인트를 ID, 벡터, 페이로드 그대로 대상 컬렉션에 복사"""
+        copied = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            if points:
+                target.client.upsert(
+                    collection_name=target.collection_name,
+                    points=[models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in points],
+                    wait=True
+                )
+                copied += len(points)
+            if offset is None:
+                break
+        return copied
+    
+    def copy_non_table_points(self, target: "QdrantVectorStore", batch_size: int = 1000) -> int:
+        """
+        테이블 청크가 아닌 포인트(chunk_index가 없는 채팅 기록 등)를 대상 컬렉션에 복사
+        
+        섀도는 DB 테이블로만 재구축되므로 교체 전에 옮기지 않으면 별칭 전환 시 사라진다.
+        """
+        scroll_filter = models.Filter(
+            must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="chunk_index"))]
+        )
+        return self._copy_points(target, scroll_filter, batch_size)
+    
+    def _finish_shadow(self, shadow: "QdrantVectorStore") -> None:
+        """섀도의 인덱싱을 다시 켜고 완료될 때까지 대기"""
+        shadow.client.update_collection(
+            collection_name=shadow.collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=DEFAULT_INDEXING_THRESHOLD)
+        )
+        self._wait_until_green(shadow.collection_name)
+    
+    def promote_shadow(self, shadow: "QdrantVectorStore", expected_count: Optional[int] = None, keep_old: bool = False) -> Dict[str, Any]:
+        """
+        섀도 컬렉션을 검증한 뒤 별칭을 원자적으로 교체하고 이전 컬렉션 정리
+        
+        인덱싱을 다시 켜고 완료될 때까지 기다린 뒤 한 번의 별칭 변경 요청으로 교체하므로
+        검색은 항상 완성된 인덱스를 사용한다. 교체 전에 테이블 청크가 아닌 포인트(채팅 기록)를 섀도로 복사하고,
+        그 이후의 쓰기는 미러링으로 반영된다.
+        
+        Args:
+            shadow: create_shadow로 만든 저장소
+            expected_count: 섀도에 최소한 있어야 할 테이블 청크 수 (재구축 중 미러링된 삭제만큼은 적어도 통과,
+                부족하면 교체하지 않고 섀도 삭제)
+            keep_old: 이전 컬렉션을 삭제하지 않음
+        """
+        table_count = shadow.count_table_points()
+        if expected_count is not None and table_count < expected_count - shadow.deleted_points:
+            self.drop_shadow(shadow)
+            raise ValueError(
+                f"Shadow {shadow.collection_name} has {table_count} table points, expected at least "
+                f"{expected_count} - {shadow.deleted_points} deleted during rebuild"
+            )
+        
+        # 재구축 대상이 아닌 포인트(채팅 기록) 복사
+        copied = self.copy_non_table_points(shadow)
+        print(f"Copied {copied} non-table points into {shadow.collection_name}")
+        
+        # 인덱싱 재개 후 완료 대기
+        self._finish_shadow(shadow)
+        
+        old_name = self._alias_target()
+        if old_name is None:
+            raise ValueError(f"{self.collection_name} is not an alias; run migrate_to_alias() first")
+        self.client.update_collection_aliases(change_aliases_operations=[
+            models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=self.collection_name)),
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=shadow.collection_name, alias_name=self.collection_name)
+            )
+        ])
+        self._mirror = None
+        
+        # 이전 컬렉션 정리
+        if not keep_old:
+            self.client.delete_collection(old_name)
+        
+        shadow_count = shadow.count()
+        print(f"Alias {self.collection_name} -> {shadow.collection_name} ({shadow_count} points), previous: {old_name}")
+        return {"alias": self.collection_name, "collection": shadow.collection_name, "count": shadow_count, "previous": old_name}
+    
+    def migrate_to_alias(self) -> Dict[str, Any]:
+        """
+        별칭 도입 전의 실제 컬렉션을 버전 컬렉션 + 같은 이름의 별칭으로 전환 (재구축과 분리된 최초 1회 단계)
+        
+        모든 포인트를 버전 컬렉션으로 복사하고(복사 중 쓰기는 미러링) 인덱싱이 끝난 뒤 전환한다.
+        Qdrant는 컬렉션 이름을 바꿀 수 없어 이전 컬렉션 삭제와 별칭 생성 사이에 잠깐 검색이 실패할 수 있으므로
+        트래픽이 적을 때 한 번만 실행한다. 이후의 재구축(promote_shadow)은 별칭만 교체하므로 공백이 없다.
+        """
+        current = self._alias_target()
+        if current is not None:
+            return {"alias": self.collection_name, "collection": current, "migrated": False}
+        
+        shadow = self._new_shadow(mirror_writes=True)
+        try:
+            copied = self._copy_points(shadow, None)
+            self._finish_shadow(shadow)
+        except Exception:
+            self.drop_shadow(shadow)
+            raise
+        
+        self.client.delete_collection(self.collection_name)
+        self.client.update_collection_aliases(change_aliases_operations=[models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=shadow.collection_name, alias_name=self.collection_name)
+        )])
+        self._mirror = None
+        print(f"Migrated {self.collection_name} to alias -> {shadow.collection_name} ({copied} points)")
+        return {"alias": self.collection_name, "collection": shadow.collection_name, "count": copied, "migrated": True}
+    
+    def drop_shadow(self, shadow: "QdrantVectorStore") -> None:
+        """재구축 실패 시 섀도 컬렉션 삭제"""
+        if self._mirror is shadow:
+            self._mirror = None
+        self.client.delete_collection(shadow.collection_name)
+        print(f"Dropped shadow collection {shadow.collection_name}")
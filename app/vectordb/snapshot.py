@@ -0,0 +1,118 @@
+# vectordb/snapshot.py
+# 벡터 저장소 스냅샷 파일 형식
+#
+#   {name}.npy      (N, dim) float32 벡터 (np.load(mmap_mode="r")로 복사 없이 열 수 있음)
+#   {name}.msgpack  헤더 {"version", "name", "count", "dim"} 뒤에 포인트마다 [id, payload]를 이어 붙인 스트림
+#
+# 두 파일의 i번째 행/포인트가 같은 포인트이며, 임시 파일에 쓴 뒤 교체하므로 중단되어도 이전 스냅샷이 남는다.
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+from cache.disk_cache import pack, iter_unpack
+
+SNAPSHOT_VERSION = 1
+
+def snapshot_paths(directory: str, name: str) -> Tuple[str, str]:
+    """(벡터 .npy, 페이로드 .msgpack) 경로"""
+    base = os.path.join(directory, name)
+    return f"{base}.npy", f"{base}.msgpack"
+
+def snapshot_exists(directory: str, name: str) -> bool:
+    return all(os.path.exists(path) for path in snapshot_paths(directory, name))
+
+class SnapshotWriter:
+    def __init__(self, directory: str, name: str, dim: int):
+        """
+        배치 단위로 스냅샷 기록 (전체 크기를 몰라도 되도록 벡터를 원시 파일에 이어 쓰고 close에서 .npy로 변환)
+
+        Args:
+            directory: 스냅샷 디렉터리
+            name: 스냅샷 이름 (보통 컬렉션 이름)
+            dim: 벡터 차원
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.dim = dim
+        self.count = 0
+        self.vectors_path, self.payloads_path = snapshot_paths(directory, name)
+        self._raw_path = self.vectors_path + ".raw"
+        self._raw = open(self._raw_path, "wb")
+        self._points = open(self.payloads_path + ".tmp", "wb")
+
+    def write(self, ids: List[Any], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """포인트 배치 기록"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim) or len(payloads) != len(ids):
+            raise ValueError(f"batch shape {vectors.shape} does not match {len(ids)} ids with dim {self.dim}")
+        self._raw.write(vectors.tobytes())
+        for point_id, payload in zip(ids, payloads):
+            self._points.write(pack([point_id, payload]))
+        self.count += len(ids)
+
+    def close(self) -> int:
+        """헤더를 붙여 최종 파일로 교체하고 기록한 포인트 수 반환"""
+        self._raw.close()
+        self._points.close()
+
+        # 벡터: .npy 헤더 뒤에 원시 바이트 복사
+        with open(self.vectors_path + ".tmp", "wb") as f:
+            np.lib.format.write_array_header_1_0(f, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                "fortran_order": False,
+                "shape": (self.count, self.dim)
+            })
+            with open(self._raw_path, "rb") as raw:
+                shutil.copyfileobj(raw, f, 16 * 1024 * 1024)
+        os.remove(self._raw_path)
+
+        # 페이로드: 헤더 뒤에 포인트 스트림 복사
+        with open(self.payloads_path + ".new", "wb") as f:
+            f.write(pack({"version": SNAPSHOT_VERSION, "name": self.name, "count": self.count, "dim": self.dim}))
+            with open(self.payloads_path + ".tmp", "rb") as points:
+                shutil.copyfileobj(points, f, 16 * 1024 * 1024)
+        os.remove(self.payloads_path + ".tmp")
+
+        os.replace(self.vectors_path + ".tmp", self.vectors_path)
+        os.replace(self.payloads_path + ".new", self.payloads_path)
+        return self.count
+
+def read_snapshot_header(directory: str, name: str) -> Dict[str, Any]:
+    """스냅샷 헤더만 읽기"""
+    with open(snapshot_paths(directory, name)[1], "rb") as f:
+        return next(iter_unpack(f))
+
+def read_snapshot(directory: str, name: str, batch_size: int = 1000) -> Tuple[Dict[str, Any], Iterator[Tuple[List[Any], np.ndarray, List[Dict[str, Any]]]]]:
+    """
+    스냅샷 열기
+
+    Returns:
+        (헤더, (ids, vectors, payloads) 배치 이터레이터) - vectors는 메모리 맵 슬라이스
+    """
+    vectors_path, payloads_path = snapshot_paths(directory, name)
+    vectors = np.load(vectors_path, mmap_mode="r")
+    f = open(payloads_path, "rb")
+    stream = iter_unpack(f)
+    header = next(stream)
+    if header.get("version") != SNAPSHOT_VERSION or vectors.shape != (header["count"], header["dim"]):
+        f.close()
+        raise ValueError(f"Snapshot {vectors_path} does not match header {header}")
+
+    def batches():
+        try:
+            offset = 0
+            ids: List[Any] = []
+            payloads: List[Dict[str, Any]] = []
+            for point_id, payload in stream:
+                ids.append(point_id)
+                payloads.append(payload)
+                if len(ids) == batch_size:
+                    yield ids, vectors[offset:offset + len(ids)], payloads
+                    offset += len(ids)
+                    ids, payloads = [], []
+            if ids:
+                yield ids, vectors[offset:offset + len(ids)], payloads
+        finally:
+            f.close()
+
+    return header, batches()